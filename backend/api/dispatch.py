@@ -0,0 +1,138 @@
+import os
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator
+from fastapi import HTTPException
+
+# Work classes: (workers, extra queued requests, Retry-After seconds when full).
+# Each class gets its own pool so a burst of TTS renders cannot starve URL fetches, etc.
+WORK_CLASS_DEFAULTS = {
+    "io": (16, 64, 2),
+    "llm": (8, 32, 10),
+    "tts": (2, 8, 30),
+    "model": (1, 1, 30),
+    # Streaming responses: each one holds a worker for the whole episode
+    "stream": (2, 2, 30),
+}
+
+class WorkPool:
+    """A bounded thread pool plus an admission semaphore covering running and queued calls."""
+
+    def __init__(self, name: str, workers: int, queue_limit: int, retry_after: int):
+        self.name = name
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-worker")
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_admit(self) -> bool:
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self._in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+        }
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+_POOLS = {
+    name: WorkPool(
+        name,
+        workers=_env_int(f"{name.upper()}_WORKERS", workers),
+        queue_limit=_env_int(f"{name.upper()}_QUEUE_LIMIT", queue_limit),
+        retry_after=_env_int(f"{name.upper()}_RETRY_AFTER", retry_after),
+    )
+    for name, (workers, queue_limit, retry_after) in WORK_CLASS_DEFAULTS.items()
+}
+
+def _admit(work_class: str) -> WorkPool:
+    pool = _POOLS[work_class]
+    if not pool.try_admit():
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server busy ({work_class} queue full), retry later",
+            headers={"Retry-After": str(pool.retry_after)},
+        )
+    return pool
+
+async def run_bounded(work_class: str, fn, *args, **kwargs):
+    """
+    Runs blocking `fn` on the pool for `work_class` without blocking the event loop.
+    Rejects immediately with 429 and Retry-After when the class is at capacity.
+    """
+    pool = _admit(work_class)
+
+    try:
+        future = pool.executor.submit(functools.partial(fn, *args, **kwargs))
+    except RuntimeError:
+        pool.release()
+        raise
+    # Release the slot when the work finishes, not when the awaiting request goes away
+    future.add_done_callback(lambda _: pool.release())
+    return await asyncio.wrap_future(future)
+
+def stream_bounded(work_class: str, iterator: Iterator) -> AsyncIterator:
+    """
+    Admits a streaming response now (429 and Retry-After when the class is full) and
+    returns an async iterator that pulls each item of blocking `iterator` on the class's
+    pool. The slot is held until the stream ends or the client goes away.
+    """
+    pool = _admit(work_class)
+    end = object()
+
+    def finish():
+        try:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+        finally:
+            pool.release()
+
+    async def pull():
+        pending = None
+        try:
+            while True:
+                pending = pool.executor.submit(next, iterator, end)
+                item = await asyncio.wrap_future(pending)
+                if item is end:
+                    return
+                yield item
+        finally:
+            # A pull already running on a worker cannot be cancelled; finish after it
+            if pending is not None and not pending.done() and release.detach():
+                pending.add_done_callback(lambda _: finish())
+            else:
+                release()
+
+    stream = pull()
+    # Runs finish() exactly once, also when the response is dropped before it starts streaming
+    release = weakref.finalize(stream, finish)
+    return stream
+
+def dispatch_stats() -> dict:
+    return {name: pool.stats() for name, pool in _POOLS.items()}
+
+def shutdown_dispatch():
+    for pool in _POOLS.values():
+        pool.executor.shutdown(wait=False, cancel_futures=True)
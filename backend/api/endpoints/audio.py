@@ -1,45 +1,162 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from backend.schemas import AudioRequest, AudioResponse, FinalAudioRequest, FinalAudioResponse, ScriptResponse
-from backend.utils.audio_synthesizer import batch_synthesize_audio
-from backend.utils.audio_processor import create_podcast
-from backend.utils.llm import unload_local_model
+from fastapi.responses import FileResponse, StreamingResponse
+from backend.schemas import AudioRequest, AudioResponse, FinalAudioRequest, FinalAudioResponse, EncodeJobResponse, SynthesisJobRequest, SynthesisJobResponse, ScriptResponse
+from backend.utils.audio_synthesizer import TEMP_DIR, batch_synthesize_audio, stream_synthesize_audio, remove_segment_dirs
+from backend.utils.audio_processor import create_podcast, wav_stream_header, pcm16_bytes
+from backend.utils.tts_pool import TTS_WORKERS
+from backend.utils.segment_cache import get_segment_cache
+from backend.utils.segment_store import create_segment_store, get_segment_store, release_segment_store
+from backend.utils.audio_encoder import OUTPUT_FORMATS, ENCODE_RETRY_AFTER, EncodeQueueFull, submit_encode, get_encode_job, media_type_for
+from backend.utils.synthesis_jobs import JobQueueFull, SYNTHESIS_JOB_RETRY_AFTER, submit_synthesis_job, get_synthesis_job
+from backend.api.dispatch import run_bounded, stream_bounded
 import os
+import uuid
 
 router = APIRouter()
 
 @router.post("/synthesize-audio", response_model=AudioResponse)
 async def synthesize_audio_segments(request: AudioRequest):
-    # Unload local LLM if needed to free VRAM for TTS
-    # In a real deployed scenario, LLM and TTS might be on different services or queues.
-    # For this local setup, we unload.
-    if request.provider == "local":
-        unload_local_model()
-
     try:
         # Reconstruct script dict from model
         script_dict = request.script.dict()
+
+        store_id, store = create_segment_store() if request.in_memory else (None, None)
         
-        audio_paths = batch_synthesize_audio(
-            script=script_dict,
-            unique_speakers=request.speaker_names,
-            speaker_genders=request.speaker_genders
-        )
+        try:
+            audio_paths = await run_bounded(
+                "tts",
+                batch_synthesize_audio,
+                script=script_dict,
+                unique_speakers=request.speaker_names,
+                speaker_genders=request.speaker_genders,
+                batched=request.batched,
+                workers=TTS_WORKERS,
+                store=store,
+                export_segments=request.export_segments if request.in_memory else None,
+                # Per-request directory so concurrent users do not overwrite each other's segments
+                output_dir=TEMP_DIR / uuid.uuid4().hex
+            )
+        except BaseException:
+            # Nobody gets the id of a failed or rejected render, so its store could never be released
+            if store_id:
+                release_segment_store(store_id)
+            raise
         
-        return {"audio_paths": audio_paths}
+        return {"audio_paths": audio_paths, "segment_store_id": store_id}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/jobs", response_model=SynthesisJobResponse, status_code=202)
+async def create_synthesis_job(request: SynthesisJobRequest):
+    """Queues the render and returns immediately; poll GET /jobs/{job_id} for progress."""
+    if request.output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported output format: {request.output_format}")
+
+    try:
+        job_id = submit_synthesis_job(
+            script=request.script.dict(),
+            unique_speakers=request.speaker_names,
+            speaker_genders=request.speaker_genders,
+            batched=request.batched,
+            workers=TTS_WORKERS,
+            in_memory=request.in_memory,
+            export_segments=request.export_segments,
+            create_final=request.create_podcast,
+            output_format=request.output_format
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(SYNTHESIS_JOB_RETRY_AFTER)})
+    return get_synthesis_job(job_id)
+
+@router.get("/jobs/{job_id}", response_model=SynthesisJobResponse)
+async def synthesis_job_status(job_id: str):
+    job = get_synthesis_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Synthesis job not found")
+    return job
+
+@router.post("/stream-podcast")
+async def stream_podcast(request: AudioRequest):
+    """Streams the podcast as a chunked 16-bit WAV while Kokoro is still synthesizing it."""
+    script_dict = request.script.dict()
+
+    def audio_stream():
+        yield wav_stream_header(24000)
+        for chunk in stream_synthesize_audio(
+            script_dict.get("dialogue", []),
+            unique_speakers=request.speaker_names,
+            speaker_genders=request.speaker_genders
+        ):
+            yield pcm16_bytes(chunk)
+
+    # Pulled on the bounded "stream" pool, so synthesis neither blocks the event loop nor runs unbounded
+    return StreamingResponse(stream_bounded("stream", audio_stream()), media_type="audio/wav")
+
 @router.post("/create-podcast", response_model=FinalAudioResponse)
 async def create_final_podcast(request: FinalAudioRequest):
+    if request.output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported output format: {request.output_format}")
+
+    store = None
+    if request.segment_store_id:
+        store = get_segment_store(request.segment_store_id)
+        if store is None:
+            raise HTTPException(status_code=404, detail="Segment store not found or expired")
+
+    def stitch():
+        # Per-request file name, like synthesis jobs, so concurrent requests and their encodes do not collide
+        path = create_podcast(
+            request.audio_paths,
+            output_filename=f"podcast_{uuid.uuid4().hex}.wav",
+            store=store,
+            streaming=request.streaming
+        )
+        # Return the WAV right away; the compressed copy is produced in the background
+        encode_job_id = None
+        if path and request.output_format != "wav":
+            try:
+                encode_job_id = submit_encode(path, request.output_format)
+            except EncodeQueueFull:
+                # Keep the segments so the client can retry the whole request
+                os.remove(path)
+                raise
+        # The segments live on only inside the final WAV
+        if path:
+            remove_segment_dirs(request.audio_paths)
+        return path, encode_job_id
+
     try:
-        final_path = create_podcast(request.audio_paths)
-        return {"final_audio_path": final_path}
+        final_path, encode_job_id = await run_bounded("io", stitch)
+        if request.segment_store_id:
+            release_segment_store(request.segment_store_id)
+
+        return {"final_audio_path": final_path, "encode_job_id": encode_job_id}
+    except HTTPException:
+        raise
+    except EncodeQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(ENCODE_RETRY_AFTER)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/download-podcast")
 async def download_podcast(path: str):
     if os.path.exists(path):
-        return FileResponse(path, media_type="audio/wav", filename="podcast.wav")
+        extension = os.path.splitext(path)[1] or ".wav"
+        return FileResponse(path, media_type=media_type_for(path), filename=f"podcast{extension}")
     raise HTTPException(status_code=404, detail="File not found")
+
+@router.get("/encoded-podcast/{job_id}", response_model=EncodeJobResponse)
+async def encoded_podcast_status(job_id: str):
+    job = get_encode_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Encode job not found")
+    return job
+
+@router.get("/cache-stats")
+async def segment_cache_stats():
+    cache = get_segment_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
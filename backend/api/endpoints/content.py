@@ -1,32 +1,45 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from typing import List
+from typing import List, Optional
 from backend.schemas import URLRequest, ContentResponse
 from backend.utils.content_extractor import (
-    extract_from_url,
+    extract_from_urls,
     extract_from_pdf,
     extract_from_docx,
     extract_from_text,
     aggregate_content
 )
+from backend.utils.url_cache import get_url_cache
+from backend.utils.pdf_extractor import word_budget_for_duration
+from backend.api.dispatch import run_bounded
 import shutil
 import os
 import tempfile
 
 router = APIRouter()
 
-@router.post("/extract-urls", response_model=ContentResponse)
-async def extract_urls(request: URLRequest):
-    aggregated_sources = []
-    for url in request.urls:
-        if url.strip():
-            result = extract_from_url(url)
-            aggregated_sources.append(result)
+def _extract_urls(urls: List[str], use_cache: bool = None) -> dict:
+    aggregated_sources = extract_from_urls([url for url in urls if url.strip()], use_cache=use_cache)
     
     final_content = aggregate_content(aggregated_sources)
     return final_content
 
+@router.post("/extract-urls", response_model=ContentResponse)
+async def extract_urls(request: URLRequest):
+    return await run_bounded("io", _extract_urls, request.urls, request.use_url_cache)
+
+@router.get("/url-cache-stats")
+async def url_cache_stats():
+    cache = get_url_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
 @router.post("/extract-files", response_model=ContentResponse)
-async def extract_files(files: List[UploadFile] = File(...)):
+async def extract_files(files: List[UploadFile] = File(...), duration: Optional[int] = Form(None)):
+    # With the episode duration, long PDFs stop being read once there is enough material
+    return await run_bounded("io", _extract_files, files, word_budget_for_duration(duration))
+
+def _extract_files(files: List[UploadFile], max_words: int = None) -> dict:
     aggregated_sources = []
     
     # Create a temporary directory to save uploaded files
@@ -61,7 +74,7 @@ async def extract_files(files: List[UploadFile] = File(...)):
                 # Check extension to call right function
                 if ext == "pdf":
                     # PyPDF2 usually takes a file object
-                    result = extract_from_pdf(f)
+                    result = extract_from_pdf(f, max_words=max_words)
                 elif ext == "docx":
                     result = extract_from_docx(f) # python-docx takes file-like object
                 elif ext in ["txt", "md"]:
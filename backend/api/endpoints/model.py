@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from backend.api.dispatch import run_bounded
+from backend.utils.model_residency import get_model_residency
 from backend.utils.llm import get_local_model_pipeline, unload_local_model, MODEL_LOCAL_3B, MODEL_LOCAL_1B, MODEL_LOCAL_QWEN_1_5B
 
 MODEL_MAPPING = {
@@ -17,18 +19,27 @@ class LoadModelRequest(BaseModel):
 async def load_model(request: LoadModelRequest):
     try:
         mapped_name = MODEL_MAPPING.get(request.model_name, request.model_name)
-        pipe = get_local_model_pipeline(mapped_name)
+        pipe = await run_bounded("model", get_local_model_pipeline, mapped_name)
         if pipe:
             return {"status": "success", "message": f"Model {request.model_name} loaded successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to load model")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/unload")
 async def unload_model():
     try:
-        result = unload_local_model()
+        result = await run_bounded("model", unload_local_model)
         return {"status": "success", "message": "Model unloaded", "nvidia_smi": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/residency")
+async def model_residency():
+    """Resident models, their measured footprints and the per-device budgets."""
+    return get_model_residency().stats()
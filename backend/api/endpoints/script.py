@@ -1,7 +1,12 @@
 from fastapi import APIRouter, HTTPException
-from backend.schemas import ScriptRequest, ScriptResponse, ScriptResponse
-from backend.utils.script_generator import generate_script
+from fastapi.responses import StreamingResponse
+from backend.schemas import ScriptRequest, ScriptResponse, ScriptResponse, StreamScriptRequest
+from backend.utils.script_generator import generate_script, get_speaker_config, stream_single_call_script, prefetch_turns, reduce_content_for_episode
+from backend.utils.audio_synthesizer import stream_synthesize_audio
+from backend.utils.audio_processor import wav_stream_header, pcm16_bytes
 from backend.utils.llm import PROVIDER_OPENAI, PROVIDER_GEMINI, PROVIDER_LOCAL, PROVIDER_GROQ, MODEL_GROQ_LLAMA_3_1_8B_INSTANT, MODEL_GEMINI_FLASH, GEMINI_MODELS
+from backend.utils.llm_cache import get_llm_cache
+from backend.api.dispatch import run_bounded, stream_bounded
 import os
 
 PROVIDER_MAPPING = {
@@ -13,14 +18,7 @@ PROVIDER_MAPPING = {
 
 router = APIRouter()
 
-@router.post("/generate-script", response_model=ScriptResponse)
-async def generate_podcast_script(request: ScriptRequest):
-    content = {
-        "combined_content": request.content,
-        "total_word_count": len(request.content.split()), # approximate count
-        "valid": True
-    }
-    
+def build_llm_config(request: ScriptRequest) -> dict:
     provider = PROVIDER_MAPPING.get(request.provider, request.provider)
     model_name = request.model_name
 
@@ -36,11 +34,23 @@ async def generate_podcast_script(request: ScriptRequest):
             print(f"Sanitizing Gemini model name: replaced '{model_name}' with '{MODEL_GEMINI_FLASH}' (Valid models: {GEMINI_MODELS})")
             model_name = MODEL_GEMINI_FLASH
 
-    llm_config = {
+    return {
         "provider": provider,
         "api_key": request.api_key,
-        "model_name": model_name
+        "model_name": model_name,
+        "use_cache": request.use_llm_cache,
+        "batch_size": request.local_batch_size
     }
+
+@router.post("/generate-script", response_model=ScriptResponse)
+async def generate_podcast_script(request: ScriptRequest):
+    content = {
+        "combined_content": request.content,
+        "total_word_count": len(request.content.split()), # approximate count
+        "valid": True
+    }
+    
+    llm_config = build_llm_config(request)
     
     # If local provider is used, we need to handle loading the pipeline or ensure it's loaded.
     # The original app loaded it into session_state. 
@@ -56,7 +66,9 @@ async def generate_podcast_script(request: ScriptRequest):
         pass
 
     try:
-        script = generate_script(
+        script = await run_bounded(
+            "llm",
+            generate_script,
             content_data=content,
             duration=request.duration,
             llm_config=llm_config,
@@ -64,7 +76,11 @@ async def generate_podcast_script(request: ScriptRequest):
             podcast_name=request.podcast_name,
             custom_speaker_names=request.speaker_names,
             tone=request.tone,
-            custom_instructions=request.custom_instructions
+            custom_instructions=request.custom_instructions,
+            concurrent_chunks=request.concurrent_chunks,
+            windowed_refinement=request.windowed_refinement,
+            intro_outro_from_topics=request.intro_outro_from_topics,
+            extractive_reduction=request.extractive_reduction
         )
         
         if "error" in script:
@@ -72,5 +88,45 @@ async def generate_podcast_script(request: ScriptRequest):
             
         return script
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream-podcast")
+async def stream_podcast_from_content(request: StreamScriptRequest):
+    """
+    Writes the script with a single streamed LLM call and synthesizes each turn as soon
+    as it is complete, returning a chunked 16-bit WAV. Audio starts after the first turn
+    instead of after the whole script, so latency is roughly max(LLM, TTS).
+    """
+    llm_config = build_llm_config(request)
+    speakers = get_speaker_config(request.num_speakers, request.speaker_names)
+    speaker_names = [s["name"] for s in speakers]
+
+    # The whole script comes from one call, so long content must be cut down to fit it
+    content = await run_bounded("llm", reduce_content_for_episode, request.content, request.duration, llm_config, enabled=request.extractive_reduction)
+
+    turns = prefetch_turns(stream_single_call_script(
+        content=content,
+        duration=request.duration,
+        llm_config=llm_config,
+        speakers=speakers,
+        tone=request.tone,
+        custom_instructions=request.custom_instructions
+    ))
+
+    def audio_stream():
+        yield wav_stream_header(24000)
+        for chunk in stream_synthesize_audio(turns, unique_speakers=speaker_names, speaker_genders=request.speaker_genders):
+            yield pcm16_bytes(chunk)
+
+    # Pulled on the bounded "stream" pool, so neither LLM nor TTS blocks the event loop or runs unbounded
+    return StreamingResponse(stream_bounded("stream", audio_stream()), media_type="audio/wav")
+
+@router.get("/cache-stats")
+async def llm_cache_stats():
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
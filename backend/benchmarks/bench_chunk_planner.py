@@ -0,0 +1,95 @@
+"""
+Chunking on large documents: the previous fixed word thresholds (single call up to 1200 words,
+3000-word chunks otherwise) against the token-aware planner, per provider profile.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_chunk_planner --words 5000 50000 200000 --duration 10
+
+Columns:
+    calls      LLM calls for the script (single call = 1; chunked = topic + dialogue per chunk,
+               plus stitch/refine and intro/outro)
+    max req    largest chunk request in tokens (chunk + prompt + reserved output)
+    limit      what one request may hold for that model
+    overflow   chunk requests above the limit
+Token counts use the planner's counter (tiktoken for OpenAI when installed, else the approximation).
+"""
+import argparse
+import math
+import os
+import random
+import re
+import sys
+import time
+
+# Import the planner module directly so the benchmark does not need the ML dependencies
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+from chunk_planner import (
+    CHUNK_OUTPUT_TOKENS, PROMPT_OVERHEAD_TOKENS, get_model_profile, get_token_counter, plan_chunks,
+)
+
+TARGETS = [
+    ("Groq", "llama-3.1-8b-instant"),
+    ("OpenAI", "gpt-4o-mini"),
+    ("Gemini", "gemini-3-flash-preview"),
+    ("Local LLM", "meta-llama/Llama-3.2-3B-Instruct"),
+]
+
+def make_document(words: int) -> str:
+    rng = random.Random(0)
+    vocabulary = ("the model context window token budget request latency provider "
+                  "podcast script dialogue speaker chunk output limit throughput").split()
+    sentences = []
+    count = 0
+    while count < words:
+        length = rng.randint(8, 30)
+        sentences.append(" ".join(rng.choice(vocabulary) for _ in range(length)).capitalize() + ".")
+        count += length
+    return " ".join(sentences)
+
+def legacy_chunks(text: str) -> list:
+    """The previous generate_script behaviour."""
+    if len(text.split()) <= 1200:
+        return [text]
+    chunks, current, current_words = [], [], 0
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        words = len(sentence.split())
+        if current_words + words > 3000 and current:
+            chunks.append(" ".join(current))
+            current, current_words = [sentence], words
+        else:
+            current.append(sentence)
+            current_words += words
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def describe(chunks: list, provider: str, model_name: str) -> tuple:
+    profile = get_model_profile(provider, model_name)
+    limit = min(profile["context_tokens"], profile.get("request_token_limit") or profile["context_tokens"])
+    output = min(profile["max_output_tokens"], CHUNK_OUTPUT_TOKENS)
+    requests = [tokens + PROMPT_OVERHEAD_TOKENS + output for tokens in get_token_counter(provider, model_name)(chunks)]
+    calls = 1 if len(chunks) == 1 else 2 * len(chunks) + 3
+    return calls, max(requests), limit, sum(r > limit for r in requests)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[5000, 50000, 200000])
+    parser.add_argument("--duration", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'words':>7} {'model':>34} {'approach':>8} {'calls':>6} {'max req':>8} {'limit':>8} {'overflow':>8} {'plan (ms)':>9}")
+    for words in args.words:
+        document = make_document(words)
+        for provider, model_name in TARGETS:
+            start = time.perf_counter()
+            plan = plan_chunks(document, provider, model_name, duration=args.duration)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            for approach, chunks, ms in (("legacy", legacy_chunks(document), None), ("planner", plan["chunks"], elapsed)):
+                calls, max_request, limit, overflow = describe(chunks, provider, model_name)
+                timing = f"{ms:>9.1f}" if ms is not None else f"{'-':>9}"
+                print(f"{words:>7} {model_name:>34} {approach:>8} {calls:>6} {max_request:>8} {limit:>8} {overflow:>8} {timing}")
+
+if __name__ == "__main__":
+    main()
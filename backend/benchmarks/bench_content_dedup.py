@@ -0,0 +1,96 @@
+"""
+Near-duplicate paragraph removal on multi-megabyte inputs: MinHash + LSH against an
+all-pairs Jaccard comparison of the same shingle sets.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_content_dedup --megabytes 1 4 16 --duplicate-rate 0.3
+
+Sources are synthetic articles where a share of the paragraphs repeat an earlier source's
+paragraph with a few words changed, as happens with syndicated news or mirrored docs.
+Columns:
+    paras      paragraphs in the input
+    planted    near-duplicates that were planted
+    found      paragraphs removed (recall = found among planted)
+    removed    words removed, as reported in sources_summary
+The all-pairs baseline is quadratic and only runs up to --pairs-limit paragraphs.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Import the dedup module directly so the benchmark does not need the extraction dependencies
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import content_dedup
+
+def make_sources(megabytes: float, duplicate_rate: float, seed: int = 0):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    target = int(megabytes * 1024 * 1024)
+    sources, pool, planted = [], [], 0
+    size = 0
+    while size < target:
+        paragraphs = []
+        for _ in range(rng.randint(10, 40)):
+            if pool and rng.random() < duplicate_rate:
+                words = rng.choice(pool).split()
+                for _ in range(rng.randint(0, 2)):
+                    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+                paragraphs.append(" ".join(words))
+                planted += 1
+            else:
+                paragraph = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(40, 150)))
+                paragraphs.append(paragraph)
+                pool.append(paragraph)
+        text = "\n\n".join(paragraphs)
+        sources.append(text)
+        size += len(text)
+    return sources, planted
+
+def all_pairs(paragraphs: list, threshold: float) -> set:
+    """Reference: compare every paragraph with every earlier kept one."""
+    shingles, spans = content_dedup._shingle_hashes(paragraphs)
+    kept, duplicates = [], set()
+    for i in range(len(paragraphs)):
+        if spans[i, 1] - spans[i, 0] < content_dedup.MIN_PARAGRAPH_WORDS - content_dedup.SHINGLE_WORDS + 1:
+            continue
+        current = set(shingles[spans[i, 0]:spans[i, 1]].tolist())
+        if any(len(current & other) >= threshold * len(current | other) for other in kept):
+            duplicates.add(i)
+        else:
+            kept.append(current)
+    return duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--threshold", type=float, default=content_dedup.DEDUP_THRESHOLD)
+    parser.add_argument("--pairs-limit", type=int, default=4000)
+    args = parser.parse_args()
+
+    print(f"{'MB':>6} {'paras':>7} {'planted':>8} {'approach':>9} {'found':>7} {'removed':>9} {'time (s)':>9}")
+    for megabytes in args.megabytes:
+        sources, planted = make_sources(megabytes, args.duplicate_rate)
+        paragraphs = [p for source in sources for p in content_dedup.split_paragraphs(source)[0]]
+
+        start = time.perf_counter()
+        results = content_dedup.deduplicate_sources(sources, args.threshold)
+        elapsed = time.perf_counter() - start
+        found = sum(r["removed_paragraphs"] for r in results)
+        removed = sum(r["removed_words"] for r in results)
+        print(f"{megabytes:>6} {len(paragraphs):>7} {planted:>8} {'minhash':>9} {found:>7} {removed:>9} {elapsed:>9.2f}")
+
+        if len(paragraphs) <= args.pairs_limit:
+            start = time.perf_counter()
+            duplicates = all_pairs(paragraphs, args.threshold)
+            elapsed = time.perf_counter() - start
+            removed = sum(len(paragraphs[i].split()) for i in duplicates)
+            print(f"{megabytes:>6} {len(paragraphs):>7} {planted:>8} {'all-pairs':>9} {len(duplicates):>7} {removed:>9} {elapsed:>9.2f}")
+        else:
+            print(f"{megabytes:>6} {len(paragraphs):>7} {planted:>8} {'all-pairs':>9} {'-':>7} {'-':>9} {'skipped':>9}")
+
+if __name__ == "__main__":
+    main()
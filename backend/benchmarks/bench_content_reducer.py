@@ -0,0 +1,72 @@
+"""
+LLM calls for long documents with and without the duration-aware extractive reducer.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_content_reducer --words 10000 40000 200000 --duration 5
+
+Columns:
+    kept       content words after reduction
+    calls      LLM calls generate_script would make (single call = 1; chunked = topic +
+               dialogue per chunk, plus stitch/refine and intro/outro)
+    reduce     time spent scoring and selecting sentences
+Token counts use the planner's counter (tiktoken for OpenAI when installed, else the approximation).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Import the modules directly so the benchmark does not need the ML dependencies
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+from chunk_planner import get_token_counter, plan_chunks, single_call_token_budget
+from content_reducer import reduce_for_duration
+
+TARGETS = [
+    ("Groq", "llama-3.1-8b-instant"),
+    ("OpenAI", "gpt-4o-mini"),
+    ("Gemini", "gemini-3-flash-preview"),
+    ("Local LLM", "meta-llama/Llama-3.2-3B-Instruct"),
+]
+
+def make_document(words: int) -> str:
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(3000)] + "the of and a to in is that for on with as".split() * 50
+    sentences = []
+    count = 0
+    while count < words:
+        length = rng.randint(8, 30)
+        sentences.append(" ".join(rng.choice(vocabulary) for _ in range(length)).capitalize() + ".")
+        count += length
+    return "\n\n--- Source: Synthetic ---\n" + " ".join(sentences)
+
+def calls(plan: dict) -> int:
+    return 1 if plan["mode"] == "single" else 2 * len(plan["chunks"]) + 3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[10000, 40000, 200000])
+    parser.add_argument("--duration", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'words':>7} {'model':>34} {'kept':>6} {'calls before':>12} {'calls after':>11} {'reduce (ms)':>11}")
+    for words in args.words:
+        document = make_document(words)
+        for provider, model_name in TARGETS:
+            before = plan_chunks(document, provider, model_name, duration=args.duration)
+
+            start = time.perf_counter()
+            reduction = reduce_for_duration(
+                document,
+                args.duration,
+                single_call_tokens=single_call_token_budget(provider, model_name, args.duration),
+                count_tokens=get_token_counter(provider, model_name),
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+
+            after = plan_chunks(reduction["content"], provider, model_name, duration=args.duration)
+            print(f"{words:>7} {model_name:>34} {reduction['kept_words']:>6} {calls(before):>12} {calls(after):>11} {elapsed:>11.1f}")
+
+if __name__ == "__main__":
+    main()
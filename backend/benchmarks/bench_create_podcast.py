@@ -0,0 +1,70 @@
+"""
+Peak RSS of create_podcast against episode length, in-memory vs streaming assembly.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_create_podcast --minutes 5 15 30 60
+
+Every measurement runs in a fresh subprocess so ru_maxrss reflects one assembly only.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SAMPLE_RATE = 24000
+SEGMENT_SECONDS = 20  # Roughly one dialogue turn
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def make_segments(directory: Path, minutes: int) -> list[str]:
+    import numpy as np
+    import soundfile as sf
+
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(minutes * 60 // SEGMENT_SECONDS):
+        path = directory / f"segment_{i}.wav"
+        audio = rng.uniform(-0.5, 0.5, SEGMENT_SECONDS * SAMPLE_RATE).astype(np.float32)
+        sf.write(str(path), audio, SAMPLE_RATE)
+        paths.append(str(path))
+    return paths
+
+def run_child(mode: str, segment_dir: str):
+    from backend.utils.audio_processor import create_podcast
+
+    paths = sorted(Path(segment_dir).glob("segment_*.wav"), key=lambda p: int(p.stem.split("_")[1]))
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    create_podcast([str(p) for p in paths], output_filename=f"bench_{mode}.wav", streaming=(mode == "streaming"))
+    elapsed = time.perf_counter() - start
+    print(f"{baseline:.1f} {_peak_rss_mb():.1f} {elapsed:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[5, 15, 30, 60])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SEGMENT_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    print(f"{'minutes':>8} {'mode':>10} {'peak RSS delta (MB)':>20} {'time (s)':>9}")
+    for minutes in args.minutes:
+        with tempfile.TemporaryDirectory() as segment_dir:
+            make_segments(Path(segment_dir), minutes)
+            for mode in ("in-memory", "streaming"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "backend.benchmarks.bench_create_podcast", "--child", mode, segment_dir],
+                    capture_output=True, text=True, check=True,
+                ).stdout.strip().splitlines()[-1]
+                baseline, peak, elapsed = (float(v) for v in output.split())
+                print(f"{minutes:>8} {mode:>10} {peak - baseline:>20.1f} {elapsed:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Dialogue extraction time on long LLM responses: the previous extract_json_from_response
+against the single-pass DialogueStreamParser.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_dialogue_parser --kb 50 200 1000
+
+Shapes measured per size:
+    array      well-formed JSON array (previous fast path)
+    objects    one object per line with prose around it (previous character-by-character fallback)
+    truncated  array cut off mid-turn (previous fallback after both decode attempts fail)
+    streamed   array arriving in --delta character pieces, as stream_llm delivers it; without an
+               incremental parser the whole prefix has to be re-extracted after every piece
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Import the parser module directly so the benchmark does not need the ML dependencies
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+from dialogue_parser import DialogueStreamParser, parse_dialogue
+
+def legacy_extract(response: str) -> list:
+    """extract_json_from_response as it was before the incremental parser."""
+    try:
+        start_idx = response.find('[')
+        end_idx = response.rfind(']')
+        if start_idx != -1:
+            try:
+                parsed, _ = json.JSONDecoder().raw_decode(response[start_idx:])
+                return parsed
+            except ValueError:
+                pass
+        if start_idx != -1 and end_idx != -1:
+            try:
+                return json.loads(response[start_idx:end_idx + 1])
+            except ValueError:
+                pass
+
+        objects = []
+        current_obj = ""
+        brace_count = 0
+        for line in response.strip().split('\n'):
+            for char in line:
+                if char == '{':
+                    brace_count += 1
+                elif char == '}':
+                    brace_count -= 1
+                current_obj += char
+                if brace_count == 0 and current_obj.strip():
+                    try:
+                        obj = json.loads(current_obj.strip())
+                        if isinstance(obj, dict) and 'speaker' in obj and 'text' in obj:
+                            objects.append(obj)
+                        current_obj = ""
+                    except ValueError:
+                        current_obj = ""
+        return objects
+    except Exception:
+        return []
+
+def make_turns(target_bytes: int) -> list:
+    sentence = "That is a great point about {latency}, and \"quoted\" ideas matter. "
+    turns = []
+    size = 0
+    while size < target_bytes:
+        turn = {"speaker": "Alex" if len(turns) % 2 == 0 else "Jordan", "text": sentence * 6}
+        turns.append(turn)
+        size += len(json.dumps(turn)) + 2
+    return turns
+
+def make_response(shape: str, turns: list) -> str:
+    if shape == "objects":
+        return "Here is the script:\n" + "\n".join(json.dumps(t) for t in turns) + "\nHope you enjoy it!"
+    response = "```json\n" + json.dumps(turns, indent=2) + "\n```"
+    if shape == "truncated":
+        return response[:-len(json.dumps(turns[-1])) // 2]
+    return response
+
+def legacy_stream(response: str, delta: int) -> list:
+    turns = []
+    for end in range(delta, len(response) + delta, delta):
+        turns = legacy_extract(response[:end])
+    return turns
+
+def stream_parse(response: str, delta: int) -> list:
+    parser = DialogueStreamParser()
+    turns = []
+    for i in range(0, len(response), delta):
+        turns.extend(parser.feed(response[i:i + delta]))
+    return turns + parser.finish()
+
+def best_of(fn, response: str, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(response)
+        best = min(best, time.perf_counter() - start)
+    return best, len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kb", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--delta", type=int, default=64)
+    parser.add_argument("--max-legacy-stream-kb", type=int, default=200, help="skip the quadratic legacy streamed run above this size")
+    args = parser.parse_args()
+
+    print(f"{'size (KB)':>9} {'shape':>10} {'legacy (ms)':>12} {'turns':>6} {'parser (ms)':>12} {'turns':>6}")
+    for kb in args.kb:
+        turns = make_turns(kb * 1024)
+        for shape in ("array", "objects", "truncated", "streamed"):
+            response = make_response("array" if shape == "streamed" else shape, turns)
+            if shape == "streamed":
+                legacy_fn = lambda r: legacy_stream(r, args.delta)
+                new_fn = lambda r: stream_parse(r, args.delta)
+            else:
+                legacy_fn, new_fn = legacy_extract, parse_dialogue
+
+            if shape == "streamed" and kb > args.max_legacy_stream_kb:
+                legacy = f"{'-':>12} {'-':>6}"
+            else:
+                legacy_time, legacy_turns = best_of(legacy_fn, response, 1 if shape == "streamed" else args.repeat)
+                legacy = f"{legacy_time * 1000:>12.1f} {legacy_turns:>6}"
+            new_time, new_turns = best_of(new_fn, response, args.repeat)
+            print(f"{len(response) // 1024:>9} {shape:>10} {legacy} {new_time * 1000:>12.1f} {new_turns:>6}")
+
+if __name__ == "__main__":
+    main()
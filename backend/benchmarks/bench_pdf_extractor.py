@@ -0,0 +1,102 @@
+"""
+PDF extraction on large synthetic documents: the previous single-threaded loop
+(`text += page.extract_text() + "\\n"`) against pdf_extractor with 1..N worker processes,
+and with an early stop at the word budget of a short episode.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_pdf_extractor --pages 100 500 --workers 1 2 4 --duration 5
+
+Parallel speedup needs as many free cores as workers; on a single core only the
+early stop helps.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Import the extractor module directly so the benchmark does not need the ML dependencies
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+from PyPDF2 import PdfReader
+import pdf_extractor
+
+def make_pdf(pages: int, lines_per_page: int = 40, words_per_line: int = 12) -> bytes:
+    """A minimal valid PDF with `pages` pages of Helvetica text; word i of page p is "p<p>w<i>"."""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for p in range(pages):
+        lines = [" ".join(f"p{p}w{i}" for i in range(l * words_per_line, (l + 1) * words_per_line)) for l in range(lines_per_page)]
+        stream = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        content_id, page_id = 4 + 2 * p, 5 + 2 * p
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream.encode() + b"\nendstream"
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(page_id)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kids).encode(), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for number in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[number]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def legacy_extract(path: str) -> str:
+    """The previous extract_from_pdf loop."""
+    text = ""
+    for page in PdfReader(path).pages:
+        text += page.extract_text() + "\n"
+    return text
+
+def use_workers(workers: int):
+    # The pool is a process-wide singleton; rebuild it at the requested size
+    if pdf_extractor._PDF_POOL is not None:
+        pdf_extractor._PDF_POOL.shutdown()
+        pdf_extractor._PDF_POOL = None
+    pdf_extractor.PDF_EXTRACT_WORKERS = workers
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'pages':>6} {'approach':>22} {'pages read':>10} {'words':>8} {'time (s)':>9}")
+    for pages in args.pages:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp:
+            temp.write(make_pdf(pages))
+        try:
+            start = time.perf_counter()
+            text = legacy_extract(temp.name)
+            print(f"{pages:>6} {'legacy':>22} {pages:>10} {len(text.split()):>8} {time.perf_counter() - start:>9.2f}")
+
+            for workers in args.workers:
+                use_workers(workers)
+                pdf_extractor.get_pdf_pool()  # start the processes outside the timing
+                start = time.perf_counter()
+                result = pdf_extractor.extract_pdf_text(temp.name, workers=workers)
+                elapsed = time.perf_counter() - start
+                assert result["text"] == text[:-1], "parallel output differs from the sequential loop"
+                print(f"{pages:>6} {f'{workers} worker(s)':>22} {result['pages_read']:>10} {result['word_count']:>8} {elapsed:>9.2f}")
+
+            budget = pdf_extractor.word_budget_for_duration(args.duration)
+            start = time.perf_counter()
+            result = pdf_extractor.extract_pdf_text(temp.name, max_words=budget, workers=args.workers[-1])
+            label = f"{args.duration} min early stop"
+            print(f"{pages:>6} {label:>22} {result['pages_read']:>10} {result['word_count']:>8} {time.perf_counter() - start:>9.2f}")
+        finally:
+            os.remove(temp.name)
+
+if __name__ == "__main__":
+    main()
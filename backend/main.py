@@ -1,13 +1,23 @@
 
 
+from dotenv import load_dotenv
+
+# The backend modules read their settings (URL_*, PDF_*, TTS_*, ...) when they are
+# imported, so .env has to be loaded before the first backend import below
+load_dotenv()
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from dotenv import load_dotenv
 from backend.api.endpoints import content, script, audio, model
-
-load_dotenv()
+from backend.api.dispatch import shutdown_dispatch, dispatch_stats
+from backend.utils.tts_pool import shutdown_tts_pool
+from backend.utils.audio_encoder import shutdown_encoder
+from backend.utils.synthesis_jobs import shutdown_synthesis_jobs
+from backend.utils.llm_clients import close_all_clients
+from backend.utils.warmup import WARMUP_ON_STARTUP, WARMUP_LOCAL_LLM, start_warmup_thread, get_readiness
 
 app = FastAPI(title="Synth-FM API", version="1.0.0")
 
@@ -28,6 +38,27 @@ app.include_router(model.router, prefix="/api/model", tags=["model"])
 # Serve generated audio files
 app.mount("/data", StaticFiles(directory="data/temp"), name="data")
 
+@app.on_event("startup")
+async def warm_up_models():
+    if WARMUP_ON_STARTUP:
+        local_llm = model.MODEL_MAPPING.get(WARMUP_LOCAL_LLM, WARMUP_LOCAL_LLM) if WARMUP_LOCAL_LLM else None
+        start_warmup_thread(local_llm)
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    shutdown_dispatch()
+    shutdown_synthesis_jobs()
+    shutdown_tts_pool()
+    shutdown_encoder()
+    close_all_clients()
+
 @app.get("/")
 async def root():
     return {"message": "Synth-FM Backend is running"}
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until the opt-in warm-up has finished, with per-model load state and timings."""
+    state = get_readiness()
+    state["queues"] = dispatch_stats()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
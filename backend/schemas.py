@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 
 class URLRequest(BaseModel):
     urls: List[str]
+    use_url_cache: Optional[bool] = None # None follows URL_CACHE_ENABLED; False always re-downloads and re-extracts
 
 class ContentResponse(BaseModel):
     combined_content: str
@@ -22,6 +23,15 @@ class ScriptRequest(BaseModel):
     model_name: str
     tone: Optional[str] = "Fun & Engaging"
     custom_instructions: Optional[str] = None
+    concurrent_chunks: bool = False # process chunks of large content in parallel
+    windowed_refinement: bool = False # refine the stitched script in parallel windows
+    intro_outro_from_topics: bool = False # write intro/outro from chunk topics, concurrently with refinement
+    use_llm_cache: Optional[bool] = None # None follows LLM_CACHE_ENABLED; False bypasses the cache for this request
+    local_batch_size: Optional[int] = None # prompts per batch for the local model; None uses LOCAL_LLM_BATCH_SIZE
+    extractive_reduction: Optional[bool] = None # trim long content to the episode length first; None follows CONTENT_REDUCTION_ENABLED
+
+class StreamScriptRequest(ScriptRequest):
+    speaker_genders: Optional[Dict[str, str]] = None
 
 class DialogueTurn(BaseModel):
     speaker: str
@@ -38,12 +48,41 @@ class AudioRequest(BaseModel):
     speaker_genders: Dict[str, str]
     provider: str # "local" or others for now
     model_name: Optional[str] = None
+    batched: bool = False # group turns by voice, several texts per Kokoro call; same model work as per-turn rendering
+    in_memory: bool = False # keep PCM in a segment store instead of per-turn WAV files
+    export_segments: bool = False # with in_memory, still write per-turn WAV files
 
 class AudioResponse(BaseModel):
     audio_paths: List[str]
+    segment_store_id: Optional[str] = None
     
 class FinalAudioRequest(BaseModel):
-    audio_paths: List[str]
+    audio_paths: List[str] = []
+    segment_store_id: Optional[str] = None
+    streaming: bool = True # append segments to the output one at a time instead of concatenating in memory
+    output_format: str = "wav" # "wav", "mp3", "opus" or "aac"; non-WAV formats are encoded in the background
 
 class FinalAudioResponse(BaseModel):
     final_audio_path: str
+    encode_job_id: Optional[str] = None
+
+class EncodeJobResponse(BaseModel):
+    job_id: str
+    status: str # "queued", "running", "completed" or "failed"
+    output_format: str
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+class SynthesisJobRequest(AudioRequest):
+    create_podcast: bool = True # stitch the final podcast once all turns are rendered
+    output_format: str = "wav"
+
+class SynthesisJobResponse(BaseModel):
+    job_id: str
+    status: str # "queued", "running", "completed" or "failed"
+    completed_turns: int = 0
+    total_turns: int = 0
+    audio_paths: List[str] = []
+    final_audio_path: Optional[str] = None
+    encode_job_id: Optional[str] = None
+    error: Optional[str] = None
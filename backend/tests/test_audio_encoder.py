@@ -0,0 +1,105 @@
+import sys
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from unittest.mock import patch
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import audio_encoder
+
+@contextmanager
+def gated_encoder(workers: int = 1, slots: int = 4, max_jobs: int = 256):
+    """An encoder whose encodes wait until the yielded event is set; `fail.txt` sources fail."""
+    gate = threading.Event()
+
+    def encode(wav_path, output_format):
+        gate.wait(5)
+        if wav_path == "fail.txt":
+            raise RuntimeError("ffmpeg failed")
+        return wav_path.replace(".wav", ".mp3")
+
+    audio_encoder.shutdown_encoder()
+    with patch.object(audio_encoder, "encode_audio", encode), \
+            patch.object(audio_encoder, "ENCODE_WORKERS", workers), \
+            patch.object(audio_encoder, "MAX_TRACKED_JOBS", max_jobs), \
+            patch.object(audio_encoder, "_ENCODE_SLOTS", threading.BoundedSemaphore(slots)), \
+            patch.object(audio_encoder, "_ENCODE_JOBS", OrderedDict()):
+        try:
+            yield gate
+        finally:
+            gate.set()
+            audio_encoder.shutdown_encoder()
+
+def wait_for(job_id: str, status: str):
+    deadline = time.monotonic() + 5
+    while audio_encoder.get_encode_job(job_id)["status"] != status:
+        assert time.monotonic() < deadline, audio_encoder.get_encode_job(job_id)
+        time.sleep(0.01)
+
+def test_jobs_complete_and_fail():
+    print("Testing background encodes...")
+    with gated_encoder() as gate:
+        ok = audio_encoder.submit_encode("a.wav", "mp3")
+        failed = audio_encoder.submit_encode("fail.txt", "mp3")
+        assert audio_encoder.get_encode_job(failed)["status"] == "queued"
+        gate.set()
+        wait_for(ok, "completed")
+        wait_for(failed, "failed")
+        assert audio_encoder.get_encode_job(ok)["output_path"] == "a.mp3"
+        assert audio_encoder.get_encode_job(failed)["error"] == "ffmpeg failed"
+    print("PASSED")
+
+def test_eviction_keeps_unfinished_jobs():
+    with gated_encoder(slots=10, max_jobs=3) as gate:
+        jobs = [audio_encoder.submit_encode(f"{i}.wav", "mp3") for i in range(5)]
+        # Nothing has finished, so nothing is forgotten even past MAX_TRACKED_JOBS
+        assert all(audio_encoder.get_encode_job(job_id) for job_id in jobs)
+        gate.set()
+        for job_id in jobs:
+            wait_for(job_id, "completed")
+
+        newer = audio_encoder.submit_encode("5.wav", "mp3")
+        # The oldest finished jobs make room; the new one is kept
+        assert [audio_encoder.get_encode_job(job_id) is not None for job_id in jobs] == [False, False, False, True, True]
+        wait_for(newer, "completed")
+
+def test_missing_record_is_ignored():
+    with gated_encoder():
+        audio_encoder._run_encode_job("unknown")
+
+def test_queue_limit():
+    with gated_encoder(slots=2) as gate:
+        audio_encoder.submit_encode("a.wav", "mp3")
+        audio_encoder.submit_encode("b.wav", "mp3")
+        try:
+            audio_encoder.submit_encode("c.wav", "mp3")
+            assert False, "expected EncodeQueueFull"
+        except audio_encoder.EncodeQueueFull:
+            pass
+
+        # block=True waits for a slot instead of failing
+        submitted = []
+        waiter = threading.Thread(target=lambda: submitted.append(audio_encoder.submit_encode("c.wav", "mp3", block=True)))
+        waiter.start()
+        time.sleep(0.1)
+        assert submitted == []
+        gate.set()
+        waiter.join(5)
+        wait_for(submitted[0], "completed")
+
+    try:
+        audio_encoder.submit_encode("a.wav", "flac")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_jobs_complete_and_fail()
+    test_eviction_keeps_unfinished_jobs()
+    test_missing_record_is_ignored()
+    test_queue_limit()
+    print("\nALL TESTS PASSED!")
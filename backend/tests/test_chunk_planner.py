@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import chunk_planner
+
+SENTENCE = "Context windows differ a lot between the models we support. "
+
+def request_tokens(chunk, provider, model_name):
+    return chunk_planner.get_token_counter(provider, model_name)([chunk])[0]
+
+def test_small_content_is_single_call():
+    plan = chunk_planner.plan_chunks(SENTENCE * 50, "OpenAI", "gpt-4o-mini", duration=5)
+    assert plan["mode"] == "single"
+    assert len(plan["chunks"]) == 1
+
+def test_chunks_respect_request_limit():
+    print("Testing chunk sizes against the Groq request limit...")
+    text = SENTENCE * 3000
+    plan = chunk_planner.plan_chunks(text, "Groq", "llama-3.1-8b-instant", duration=5)
+    assert plan["mode"] == "chunked"
+    assert all(request_tokens(chunk, "Groq", "llama-3.1-8b-instant") <= plan["chunk_token_budget"] for chunk in plan["chunks"])
+
+    # The same document fits a single request for a long-context model
+    assert chunk_planner.plan_chunks(text, "Gemini", "gemini-3-flash-preview", duration=5)["mode"] == "single"
+    print(f"{len(plan['chunks'])} chunks within {plan['chunk_token_budget']} tokens - PASSED")
+
+def test_chunks_are_balanced_and_lossless():
+    text = SENTENCE * 3000
+    plan = chunk_planner.plan_chunks(text, "Local LLM", duration=1)
+    sizes = [request_tokens(chunk, "Local LLM", None) for chunk in plan["chunks"]]
+    assert max(sizes) - min(sizes) <= 2 * request_tokens(SENTENCE, "Local LLM", None)
+    assert " ".join(plan["chunks"]).split() == text.split()
+
+def test_oversized_sentence_is_split():
+    text = "word " * 40000  # no sentence boundary at all
+    plan = chunk_planner.plan_chunks(text, "Groq", "llama-3.1-8b-instant", duration=5)
+    assert all(request_tokens(chunk, "Groq", "llama-3.1-8b-instant") <= plan["chunk_token_budget"] for chunk in plan["chunks"])
+    assert " ".join(plan["chunks"]).split() == text.split()
+
+def test_unknown_model_uses_provider_profile():
+    profile = chunk_planner.get_model_profile("OpenAI", "some-future-model")
+    assert profile["context_tokens"] == chunk_planner.PROVIDER_PROFILES["OpenAI"]["context_tokens"]
+
+if __name__ == "__main__":
+    test_small_content_is_single_call()
+    test_chunks_respect_request_limit()
+    test_chunks_are_balanced_and_lossless()
+    test_oversized_sentence_is_split()
+    test_unknown_model_uses_provider_profile()
+    print("\nALL TESTS PASSED!")
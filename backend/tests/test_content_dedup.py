@@ -0,0 +1,64 @@
+import sys
+import os
+import random
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import content_dedup
+
+VOCABULARY = ("model podcast script speaker source article paragraph token window budget "
+              "latency provider dialogue summary report market energy climate policy research").split()
+
+def paragraph(rng, words=60):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words)).capitalize() + "."
+
+def test_near_duplicates_across_sources_are_removed():
+    print("Testing near-duplicate removal across sources...")
+    rng = random.Random(0)
+    shared = paragraph(rng)
+    words = shared.split()
+    # Same wire story republished with one word changed
+    edited = " ".join(words[:30] + ["meanwhile"] + words[31:])
+    first = "\n\n".join([paragraph(rng), shared, paragraph(rng)])
+    second = "\n\n".join([paragraph(rng), edited, paragraph(rng)])
+
+    results = content_dedup.deduplicate_sources([first, second])
+    assert results[0]["content"] == first  # the first occurrence is kept untouched
+    assert results[0]["removed_paragraphs"] == 0
+    assert results[1]["removed_paragraphs"] == 1
+    assert results[1]["removed_words"] == len(edited.split())
+    assert edited not in results[1]["content"]
+    assert results[1]["word_count"] == len(second.split()) - len(edited.split())
+    print(f"Removed {results[1]['removed_words']} words - PASSED")
+
+def test_distinct_and_short_paragraphs_are_kept():
+    rng = random.Random(1)
+    text = "\n".join([paragraph(rng) for _ in range(50)] + ["Introduction"] * 3)
+    results = content_dedup.deduplicate_sources([text, text.replace("Introduction", "Summary")])
+    assert results[0]["content"] == text
+    # Everything long in the second copy is a repeat; the short headings are not dedup candidates
+    assert results[1]["removed_paragraphs"] == 50
+    assert results[1]["content"].split("\n") == ["Summary"] * 3
+
+def test_threshold_controls_similarity():
+    rng = random.Random(2)
+    base = paragraph(rng, 100).split()
+    # One changed word alters 5 of 96 shingles: Jaccard similarity ~0.9
+    variant = base[:50] + ["different"] + base[51:]
+    paragraphs = [" ".join(base), " ".join(variant)]
+    assert content_dedup.find_duplicate_paragraphs(paragraphs, threshold=0.95) == set()
+    assert content_dedup.find_duplicate_paragraphs(paragraphs, threshold=0.8) == {1}
+
+def test_single_newline_paragraphs_and_empty_input():
+    text = "first line with enough words to be a candidate paragraph here\nsecond"
+    assert content_dedup.split_paragraphs(text) == (text.split("\n"), "\n")
+    assert content_dedup.deduplicate_sources([]) == []
+    assert content_dedup.deduplicate_sources([""])[0]["word_count"] == 0
+
+if __name__ == "__main__":
+    test_near_duplicates_across_sources_are_removed()
+    test_distinct_and_short_paragraphs_are_kept()
+    test_threshold_controls_similarity()
+    test_single_newline_paragraphs_and_empty_input()
+    print("\nALL TESTS PASSED!")
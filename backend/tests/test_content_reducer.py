@@ -0,0 +1,75 @@
+import sys
+import os
+import random
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import content_reducer
+
+TOPIC = "solar panels battery storage grid energy prices households".split()
+
+def make_source(rng, sentences=400):
+    out = []
+    for i in range(sentences):
+        if i % 4 == 0:
+            # Off-topic noise: words nothing else in the document uses
+            out.append(" ".join(f"noise{rng.randint(0, 10**6)}" for _ in range(12)).capitalize() + ".")
+        else:
+            out.append(" ".join(rng.choice(TOPIC) for _ in range(12)).capitalize() + ".")
+    return " ".join(out)
+
+def count_tokens(texts):
+    return [len(text) // 4 for text in texts]
+
+def test_short_content_is_unchanged():
+    text = "\n\n--- Source: A ---\nA short article. Nothing to cut here."
+    result = content_reducer.reduce_content(text, max_words=1000)
+    assert result["content"] == text
+    assert not result["reduced"]
+
+def test_reduction_keeps_budget_order_and_sources():
+    print("Testing extractive reduction...")
+    rng = random.Random(0)
+    first, second = make_source(rng), make_source(rng, 200)
+    text = f"\n\n--- Source: First ---\n{first}\n\n--- Source: Second ---\n{second}"
+    result = content_reducer.reduce_content(text, max_words=1200)
+
+    assert result["reduced"]
+    assert result["original_words"] == 7200
+    assert result["kept_words"] <= 1200 + 2 * 4  # plus the two source headers
+    assert "--- Source: First ---" in result["content"] and "--- Source: Second ---" in result["content"]
+
+    # Kept sentences appear in their original order
+    body = result["content"].split("--- Source: Second ---\n")[1]
+    kept = [s for s in body.split(". ") if s]
+    positions = [second.index(s) for s in kept]
+    assert positions == sorted(positions)
+
+    # The centroid favours on-topic sentences over noise
+    assert result["content"].count("Noise") < len(kept) / 10
+    print(f"{result['original_words']} -> {result['kept_words']} words - PASSED")
+
+def test_token_budget_is_respected():
+    rng = random.Random(1)
+    text = make_source(rng)
+    result = content_reducer.reduce_content(text, max_words=10**6, max_tokens=500, count_tokens=count_tokens)
+    assert result["reduced"]
+    assert sum(count_tokens(content_reducer.split_sections(result["content"])[0]["sentences"])) <= 500
+
+def test_reduce_for_duration_ignores_tiny_call_budgets():
+    rng = random.Random(2)
+    text = make_source(rng, 1000)
+    # 1 minute keeps up to SOURCE_WORDS_PER_MINUTE words; a call budget this small is not used
+    result = content_reducer.reduce_for_duration(text, duration=1, single_call_tokens=50, count_tokens=count_tokens)
+    assert content_reducer.SOURCE_WORDS_PER_MINUTE - 12 <= result["kept_words"] <= content_reducer.SOURCE_WORDS_PER_MINUTE
+
+    result = content_reducer.reduce_for_duration(text, duration=1, single_call_tokens=1000, count_tokens=count_tokens)
+    assert sum(count_tokens(content_reducer.split_sections(result["content"])[0]["sentences"])) <= 1000
+
+if __name__ == "__main__":
+    test_short_content_is_unchanged()
+    test_reduction_keeps_budget_order_and_sources()
+    test_token_budget_is_respected()
+    test_reduce_for_duration_ignores_tiny_call_budgets()
+    print("\nALL TESTS PASSED!")
@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+import random
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+from dialogue_parser import DialogueStreamParser, parse_dialogue
+
+TURNS = [
+    {"speaker": "Alex", "text": 'She said "use {braces} wisely" \\ then left.'},
+    {"speaker": "Jordan", "text": "Closing } and opening { inside a string."},
+]
+
+def feed_in_pieces(response, max_piece=7):
+    parser = DialogueStreamParser()
+    turns = []
+    i = 0
+    while i < len(response):
+        size = random.randint(1, max_piece)
+        turns.extend(parser.feed(response[i:i + size]))
+        i += size
+    return turns + parser.finish()
+
+def test_response_shapes():
+    print("Testing array, object-per-line and wrapper responses...")
+    shapes = [
+        "Here is your script:\n```json\n" + json.dumps(TURNS, indent=2) + "\n```",
+        "Sure {thing}!\n" + "\n".join(json.dumps(t) for t in TURNS) + "\nDone.",
+        json.dumps({"title": "Ep 1", "dialogue": TURNS}),
+    ]
+    for response in shapes:
+        assert parse_dialogue(response) == TURNS
+        assert feed_in_pieces(response) == TURNS
+    print("All shapes parsed - PASSED")
+
+def test_truncated_output():
+    response = json.dumps(TURNS)
+    cut_in_text = response[:response.rindex("inside") + 3]
+    assert parse_dialogue(cut_in_text) == [TURNS[0], {"speaker": "Jordan", "text": "Closing } and opening { ins"}]
+
+    cut_in_key = response[:response.rindex('"text"') + 3]
+    assert parse_dialogue(cut_in_key) == [TURNS[0]]
+
+    cut_after_escape = '[{"speaker": "Alex", "text": "line\\'
+    assert feed_in_pieces(cut_after_escape, max_piece=1) == [{"speaker": "Alex", "text": "line"}]
+
+def test_turns_emitted_as_they_close():
+    parser = DialogueStreamParser()
+    response = json.dumps(TURNS)
+    first_end = response.index("\"}") + 2
+    assert parser.feed(response[:first_end - 1]) == []
+    assert parser.feed(response[first_end - 1:first_end]) == [TURNS[0]]
+    assert parser.feed(response[first_end:]) == [TURNS[1]]
+    assert parser.finish() == []
+
+def test_no_dialogue():
+    assert parse_dialogue("I cannot help with that.") == []
+    assert parse_dialogue('[1, 2, {"not": "a turn"}]') == []
+
+if __name__ == "__main__":
+    test_response_shapes()
+    test_truncated_output()
+    test_turns_emitted_as_they_close()
+    test_no_dialogue()
+    print("\nALL TESTS PASSED!")
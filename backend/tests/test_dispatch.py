@@ -0,0 +1,154 @@
+import sys
+import os
+import gc
+import time
+import asyncio
+import threading
+from unittest.mock import patch
+from fastapi import HTTPException
+
+# Repository root, to import the API layer the way the server does
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.api import dispatch
+
+def small_pools(workers: int = 1, queue_limit: int = 1, retry_after: int = 7):
+    pool = dispatch.WorkPool("test", workers=workers, queue_limit=queue_limit, retry_after=retry_after)
+    return pool, patch.dict(dispatch._POOLS, {"test": pool})
+
+def expect_429(call, retry_after: str):
+    try:
+        call()
+    except HTTPException as e:
+        assert e.status_code == 429
+        assert e.headers == {"Retry-After": retry_after}
+        return
+    assert False, "expected a 429"
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_run_bounded_rejects_when_saturated():
+    print("Testing bounded dispatch...")
+    pool, pools = small_pools()
+    gate = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(dispatch.run_bounded("test", gate.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        # One running plus one queued fills the class
+        assert dispatch.dispatch_stats()["test"] == {"workers": 1, "queue_limit": 1, "in_flight": 2, "queued": 1}
+        try:
+            await dispatch.run_bounded("test", lambda: "never")
+            assert False, "expected a 429"
+        except HTTPException as e:
+            assert e.status_code == 429 and e.headers == {"Retry-After": "7"}
+
+        gate.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert await dispatch.run_bounded("test", lambda: "admitted") == "admitted"
+        # A caller that gives up does not free the slot until its work has finished
+        gate.clear()
+        waiting = asyncio.ensure_future(dispatch.run_bounded("test", gate.wait, 5))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.sleep(0.05)
+        assert pool.stats()["in_flight"] == 1
+        gate.set()
+
+    with pools:
+        asyncio.run(scenario())
+        wait_until(lambda: pool.stats()["in_flight"] == 0)
+    pool.executor.shutdown()
+    print("PASSED")
+
+class Chunks:
+    """A blocking iterator of `count` chunks that records whether it was closed."""
+
+    def __init__(self, count: int, delay: float = 0):
+        self.remaining = count
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        time.sleep(self.delay)
+        if self.remaining == 0:
+            raise StopIteration
+        self.remaining -= 1
+        return b"chunk"
+
+    def close(self):
+        self.closed = True
+
+def test_stream_bounded_admission_and_full_read():
+    pool, pools = small_pools(workers=1, queue_limit=0, retry_after=30)
+
+    async def read(stream):
+        return [item async for item in stream]
+
+    with pools:
+        chunks = Chunks(3)
+        stream = dispatch.stream_bounded("test", chunks)
+        # The slot is taken when the response is created, before it streams
+        expect_429(lambda: dispatch.stream_bounded("test", Chunks(1)), "30")
+        assert asyncio.run(read(stream)) == [b"chunk"] * 3
+        assert chunks.closed and pool.stats()["in_flight"] == 0
+    pool.executor.shutdown()
+
+def test_stream_bounded_releases_on_disconnect():
+    pool, pools = small_pools(workers=2, queue_limit=0)
+
+    async def read_one_then_disconnect(stream):
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+    async def disconnect_during_pull(stream):
+        consumer = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        # The client goes away while a worker is still producing the next chunk
+        consumer.cancel()
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            pass
+        await stream.aclose()
+
+    with pools:
+        chunks = Chunks(10)
+        asyncio.run(read_one_then_disconnect(dispatch.stream_bounded("test", chunks)))
+        assert chunks.closed and pool.stats()["in_flight"] == 0
+
+        # A response dropped before it started streaming still gives its slot back
+        chunks = Chunks(10)
+        stream = dispatch.stream_bounded("test", chunks)
+        assert pool.stats()["in_flight"] == 1
+        del stream
+        gc.collect()
+        assert chunks.closed and pool.stats()["in_flight"] == 0
+
+        # A pull in flight finishes on its worker first; the slot is released after it
+        chunks = Chunks(10, delay=0.3)
+        asyncio.run(disconnect_during_pull(dispatch.stream_bounded("test", chunks)))
+        wait_until(lambda: pool.stats()["in_flight"] == 0)
+        assert chunks.closed
+
+        # Every slot is free again
+        streams = [dispatch.stream_bounded("test", Chunks(1)) for _ in range(2)]
+        expect_429(lambda: dispatch.stream_bounded("test", Chunks(1)), "7")
+        del streams
+        gc.collect()
+        assert pool.stats()["in_flight"] == 0
+    pool.executor.shutdown()
+
+if __name__ == "__main__":
+    test_run_bounded_rejects_when_saturated()
+    test_stream_bounded_admission_and_full_read()
+    test_stream_bounded_releases_on_disconnect()
+    print("\nALL TESTS PASSED!")
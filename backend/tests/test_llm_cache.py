@@ -0,0 +1,140 @@
+import sys
+import os
+import time
+import types
+import sqlite3
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Register backend/utils as the `utils` package without running its __init__, so
+# llm's relative imports resolve without the package init overhead
+utils_package = types.ModuleType("utils")
+utils_package.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils'))]
+sys.modules.setdefault("utils", utils_package)
+
+# Provider SDKs are not needed for cache logic; mock only the ones that are not installed
+for name in ("dotenv", "groq", "google", "google.genai", "openai"):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = MagicMock()
+
+from utils import llm, llm_cache
+
+MESSAGES = [
+    {"role": "system", "content": "You are a podcast writer."},
+    {"role": "user", "content": "Write about:\n            tides"},
+]
+
+def make_cache(**kwargs):
+    path = os.path.join(tempfile.mkdtemp(), "llm.sqlite3")
+    return llm_cache.LLMResponseCache(path=path, **kwargs)
+
+def test_key_normalization():
+    print("Testing cache keys...")
+    key = llm_cache.make_cache_key("Groq", "llama", MESSAGES, {"temperature": 0.7})
+    # Prompt templates are indented f-strings: whitespace alone does not change the key
+    reindented = [dict(m, content="  " + m["content"].replace("\n            ", " ") + "\n") for m in MESSAGES]
+    assert llm_cache.make_cache_key("Groq", "llama", reindented, {"temperature": 0.7}) == key
+
+    changed = [
+        llm_cache.make_cache_key("OpenAI", "llama", MESSAGES, {"temperature": 0.7}),
+        llm_cache.make_cache_key("Groq", "other", MESSAGES, {"temperature": 0.7}),
+        llm_cache.make_cache_key("Groq", "llama", MESSAGES, {"temperature": 0.2}),
+        llm_cache.make_cache_key("Groq", "llama", MESSAGES[:1] + [{"role": "user", "content": "Write about: waves"}], {"temperature": 0.7}),
+        llm_cache.make_cache_key("Groq", "llama", [{"role": "assistant", "content": m["content"]} for m in MESSAGES], {"temperature": 0.7}),
+    ]
+    assert key not in changed and len(set(changed)) == len(changed)
+    print("PASSED")
+
+def test_ttl_and_size_limits():
+    cache = make_cache(ttl_seconds=0.2)
+    cache.put("old", "reply")
+    assert cache.get("old") == "reply"
+    time.sleep(0.3)
+    assert cache.get("old") is None
+
+    cache = make_cache(max_entries=2)
+    for key in "abc":
+        cache.put(key, "reply")
+        time.sleep(0.01)
+    assert cache.get("a") is None and cache.stats()["entries"] == 2
+
+    # 1000-byte replies against a 2500-byte budget: the least recently used goes first
+    cache = make_cache(max_bytes=2500)
+    cache.put("1", "x" * 1000)
+    time.sleep(0.01)
+    cache.put("2", "x" * 1000)
+    time.sleep(0.01)
+    cache.get("1")
+    time.sleep(0.01)
+    cache.put("3", "x" * 1000)
+    assert cache.get("2") is None
+    assert cache.get("1") is not None and cache.get("3") is not None
+
+def test_databases_without_size_column_are_migrated():
+    path = os.path.join(tempfile.mkdtemp(), "llm.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)")
+    conn.execute("INSERT INTO responses VALUES ('k', 'héllo', ?, ?)", (time.time(), time.time()))
+    conn.commit()
+    conn.close()
+
+    cache = llm_cache.LLMResponseCache(path=path)
+    assert cache.get("k") == "héllo"
+    assert cache._conn.execute("SELECT size FROM responses").fetchone()[0] == len("héllo".encode("utf-8"))
+
+def counting_provider():
+    calls = []
+
+    def query(messages, provider, model_name, api_key=None, local_pipeline=None):
+        calls.append(messages[-1]["content"])
+        return f"reply to {messages[-1]['content']}"
+    return calls, query
+
+def test_query_llm_uses_and_bypasses_the_cache():
+    cache = make_cache()
+    calls, query = counting_provider()
+    with patch.object(llm_cache, "_LLM_CACHE", cache), patch.object(llm_cache, "LLM_CACHE_ENABLED", True), \
+            patch.object(llm, "_query_provider", query):
+        first = llm.query_llm(MESSAGES, llm.PROVIDER_GROQ, "llama")
+        assert llm.query_llm(MESSAGES, llm.PROVIDER_GROQ, "llama") == first
+        assert len(calls) == 1
+
+        # use_cache=False neither reads nor writes the cache
+        assert llm.query_llm(MESSAGES, llm.PROVIDER_GROQ, "llama", use_cache=False) == first
+        llm.query_llm([{"role": "user", "content": "uncached"}], llm.PROVIDER_GROQ, "llama", use_cache=False)
+        assert len(calls) == 3 and cache.stats()["entries"] == 1
+
+    with patch.object(llm_cache, "_LLM_CACHE", cache), patch.object(llm_cache, "LLM_CACHE_ENABLED", False), \
+            patch.object(llm, "_query_provider", query):
+        # Disabled by default, but use_cache=True opts a call in
+        llm.query_llm(MESSAGES, llm.PROVIDER_GROQ, "llama")
+        assert len(calls) == 4
+        llm.query_llm(MESSAGES, llm.PROVIDER_GROQ, "llama", use_cache=True)
+        assert len(calls) == 4
+
+def test_query_llm_batch_reuses_cached_entries():
+    cache = make_cache()
+    calls, query = counting_provider()
+    prompts = [[{"role": "user", "content": f"prompt {i}"}] for i in range(4)]
+    with patch.object(llm_cache, "_LLM_CACHE", cache), patch.object(llm_cache, "LLM_CACHE_ENABLED", True), \
+            patch.object(llm, "_query_provider", query):
+        llm.query_llm(prompts[1], llm.PROVIDER_GROQ, "llama")
+        assert calls == ["prompt 1"]
+
+        replies = llm.query_llm_batch(prompts, llm.PROVIDER_GROQ, "llama")
+        assert replies == [f"reply to prompt {i}" for i in range(4)]
+        assert calls == ["prompt 1", "prompt 0", "prompt 2", "prompt 3"]
+
+        # A repeated batch is answered entirely from the cache
+        assert llm.query_llm_batch(prompts, llm.PROVIDER_GROQ, "llama") == replies
+        assert len(calls) == 4
+
+if __name__ == "__main__":
+    test_key_normalization()
+    test_ttl_and_size_limits()
+    test_databases_without_size_column_are_migrated()
+    test_query_llm_uses_and_bypasses_the_cache()
+    test_query_llm_batch_reuses_cached_entries()
+    print("\nALL TESTS PASSED!")
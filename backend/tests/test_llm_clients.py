@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import llm_clients
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Stub provider: answers 429 (with Retry-After), then 503, then a completion."""
+    responses = []
+    calls = 0
+
+    def do_POST(self):
+        FlakyHandler.calls += 1
+        status, headers, body = FlakyHandler.responses.pop(0)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+def start_stub_server():
+    server = HTTPServer(("127.0.0.1", 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def post(url):
+    request = urllib.request.Request(url, data=b"{}", method="POST")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+def test_retries_against_stub_server():
+    print("Testing retry policy against a local stub server...")
+    FlakyHandler.calls = 0
+    FlakyHandler.responses = [
+        (429, {"Retry-After": "0.25"}, {"error": "rate limited"}),
+        (503, {}, {"error": "unavailable"}),
+        (200, {}, {"choices": [{"message": {"content": "ok"}}]}),
+    ]
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    delays = []
+    try:
+        result = llm_clients.call_with_retries(lambda: post(url), max_retries=3, base_delay=0.1, max_delay=1, sleep=delays.append)
+    finally:
+        server.shutdown()
+
+    assert result["choices"][0]["message"]["content"] == "ok"
+    assert FlakyHandler.calls == 3
+    # First delay honours Retry-After, second is jittered backoff within the cap
+    assert delays[0] == 0.25
+    assert 0 <= delays[1] <= 0.2
+    print(f"Retried with delays {delays} - PASSED")
+
+def test_non_retryable_error_is_raised():
+    FlakyHandler.calls = 0
+    FlakyHandler.responses = [(401, {}, {"error": "bad key"})]
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    try:
+        llm_clients.call_with_retries(lambda: post(url), max_retries=3, sleep=lambda _: None)
+        assert False, "Expected HTTPError"
+    except urllib.error.HTTPError as e:
+        assert e.code == 401
+    finally:
+        server.shutdown()
+
+    assert FlakyHandler.calls == 1
+
+def test_client_registry_reuses_and_evicts():
+    class FakeClient:
+        closed = False
+        def close(self):
+            self.closed = True
+
+    llm_clients.close_all_clients()
+    first = llm_clients.get_client("OpenAI", "key-a", lambda key: FakeClient())
+    again = llm_clients.get_client("OpenAI", "key-a", lambda key: FakeClient())
+    other = llm_clients.get_client("OpenAI", "key-b", lambda key: FakeClient())
+
+    assert first is again
+    assert first is not other
+
+    llm_clients.evict_idle_clients(max_idle=-1)
+    assert first.closed and other.closed
+    assert llm_clients.get_client("OpenAI", "key-a", lambda key: FakeClient()) is not first
+    llm_clients.close_all_clients()
+
+if __name__ == "__main__":
+    test_retries_against_stub_server()
+    test_non_retryable_error_is_raised()
+    test_client_registry_reuses_and_evicts()
+    print("\nALL TESTS PASSED!")
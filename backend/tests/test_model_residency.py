@@ -0,0 +1,99 @@
+import sys
+import os
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import model_residency
+
+MB = 2**20
+
+class FakeModel:
+    def __init__(self, name, footprint):
+        self.name = name
+        self.footprint = footprint
+
+def make_residency(budget_mb):
+    return model_residency.ModelResidency(
+        budgets={"cuda": budget_mb * MB},
+        measure=lambda model: model.footprint,
+        free_memory=lambda: None,
+    )
+
+def loader(name, size_mb, loads):
+    def load():
+        loads.append(name)
+        return FakeModel(name, {"cuda": size_mb * MB})
+    return load
+
+def test_models_stay_coresident_when_they_fit():
+    print("Testing co-residency within the budget...")
+    residency = make_residency(1000)
+    loads = []
+    llm = residency.acquire("llm:small", loader("llm:small", 600, loads))
+    tts = residency.acquire("kokoro", loader("kokoro", 300, loads))
+
+    # Back-to-back episodes reuse both models without reloading
+    assert residency.acquire("llm:small", loader("llm:small", 600, loads)) is llm
+    assert residency.acquire("kokoro", loader("kokoro", 300, loads)) is tts
+    assert loads == ["llm:small", "kokoro"]
+    assert residency.stats()["usage_mb"] == {"cuda": 900}
+    print("Both models resident, loaded once - PASSED")
+
+def test_lru_eviction_when_budget_exceeded():
+    residency = make_residency(1000)
+    loads, unloaded = [], []
+    residency.acquire("llm:a", loader("llm:a", 500, loads), unloader=lambda m: unloaded.append(m.name))
+    residency.acquire("kokoro", loader("kokoro", 300, loads))
+    residency.acquire("llm:a", loader("llm:a", 500, loads))  # llm:a is now most recently used
+
+    # Needs 500 MB: kokoro is the least recently used, so it goes first
+    residency.acquire("llm:b", loader("llm:b", 500, loads), unloader=lambda m: unloaded.append(m.name))
+    resident = [entry["key"] for entry in residency.stats()["resident"]]
+    assert resident == ["llm:a", "llm:b"]
+
+    # Reloading kokoro uses its remembered footprint to make room up front
+    residency.acquire("kokoro", loader("kokoro", 300, loads))
+    assert unloaded == ["llm:a"]
+    assert [entry["key"] for entry in residency.stats()["resident"]] == ["llm:b", "kokoro"]
+    assert residency.evictions == 2
+
+def test_oversized_model_is_kept_alone():
+    residency = make_residency(1000)
+    loads = []
+    residency.acquire("kokoro", loader("kokoro", 300, loads))
+    residency.acquire("llm:huge", loader("llm:huge", 1200, loads))
+    assert [entry["key"] for entry in residency.stats()["resident"]] == ["llm:huge"]
+
+def test_evict_by_prefix_and_make_room():
+    residency = make_residency(1000)
+    loads = []
+    residency.acquire("llm:a", loader("llm:a", 300, loads))
+    residency.acquire("llm:b", loader("llm:b", 300, loads))
+    residency.acquire("kokoro", loader("kokoro", 300, loads))
+
+    assert residency.make_room({"cuda": 200 * MB}) == 1
+    assert residency.evict(lambda key: key.startswith("llm:")) == 1
+    assert [entry["key"] for entry in residency.stats()["resident"]] == ["kokoro"]
+
+def test_measure_footprint_of_torch_module():
+    try:
+        import torch
+    except ImportError:
+        print("torch not installed - SKIPPED")
+        return
+
+    module = torch.nn.Linear(256, 256)  # 256*256 + 256 float32 parameters
+    assert model_residency.measure_footprint(module) == {"cpu": (256 * 256 + 256) * 4}
+
+    class Pipeline:
+        model = module
+    assert model_residency.measure_footprint(Pipeline()) == {"cpu": (256 * 256 + 256) * 4}
+
+if __name__ == "__main__":
+    test_models_stay_coresident_when_they_fit()
+    test_lru_eviction_when_budget_exceeded()
+    test_oversized_model_is_kept_alone()
+    test_evict_by_prefix_and_make_room()
+    test_measure_footprint_of_torch_module()
+    print("\nALL TESTS PASSED!")
@@ -0,0 +1,105 @@
+import sys
+import os
+import io
+import tempfile
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+# Repository root, to import the extractor the way the server does
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pdf_extractor
+from bench_pdf_extractor import make_pdf, legacy_extract
+
+WORDS_PER_PAGE = 40 * 12
+
+def write_pdf(pages):
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp:
+        temp.write(make_pdf(pages))
+    return temp.name
+
+def test_parallel_ranges_join_in_order():
+    print("Testing parallel page-range extraction...")
+    pdf_extractor.PDF_PARALLEL_MIN_PAGES = 4
+    pdf_extractor.PDF_PAGES_PER_TASK = 3
+    path = write_pdf(20)
+    try:
+        result = pdf_extractor.extract_pdf_text(path, workers=2)
+        assert result["text"] == legacy_extract(path)[:-1]
+        assert result["pages_read"] == result["total_pages"] == 20
+        assert result["word_count"] == 20 * WORDS_PER_PAGE
+        assert not result["truncated"]
+        print(f"{result['pages_read']} pages in order - PASSED")
+    finally:
+        os.remove(path)
+
+def test_page_limit_and_early_stop():
+    pdf_extractor.PDF_PARALLEL_MIN_PAGES = 4
+    pdf_extractor.PDF_PAGES_PER_TASK = 3
+    path = write_pdf(30)
+    try:
+        limited = pdf_extractor.extract_pdf_text(path, max_pages=5, workers=2)
+        assert limited["pages_read"] == 5 and limited["truncated"]
+        assert limited["text"].split()[-1] == f"p4w{WORDS_PER_PAGE - 1}"
+
+        # Stops on the page that reaches the budget
+        stopped = pdf_extractor.extract_pdf_text(path, max_words=3 * WORDS_PER_PAGE + 1, workers=2)
+        assert stopped["pages_read"] == 4
+        assert stopped["word_count"] == 4 * WORDS_PER_PAGE
+        assert pdf_extractor.word_budget_for_duration(5) == 5 * pdf_extractor.PDF_WORDS_PER_MINUTE
+        assert pdf_extractor.word_budget_for_duration(None) is None
+    finally:
+        os.remove(path)
+
+def test_file_object_without_path():
+    data = io.BytesIO(make_pdf(2))
+    data.name = "upload.pdf"  # like an upload: a name but no file on disk
+    result = pdf_extractor.extract_pdf_text(data, workers=1)
+    assert result["pages_read"] == 2
+    assert result["text"].split()[0] == "p0w0"
+
+def _worker_modules():
+    return sorted(sys.modules)
+
+def test_pool_through_package_import():
+    # The server imports backend.utils.pdf_extractor, so spawned workers import the
+    # backend.utils package too; it must not drag in the LLM and TTS stacks
+    from backend.utils import pdf_extractor as package_extractor
+
+    package_extractor.PDF_PARALLEL_MIN_PAGES = 4
+    package_extractor.PDF_PAGES_PER_TASK = 3
+    package_extractor.PDF_EXTRACT_WORKERS = 1
+    path = write_pdf(8)
+    try:
+        result = package_extractor.extract_pdf_text(path, workers=2)
+        assert result["text"] == legacy_extract(path)[:-1]
+        # One worker, so it is the same process that just extracted the ranges
+        loaded = package_extractor.get_pdf_pool().submit(_worker_modules).result()
+        assert "backend.utils.pdf_extractor" in loaded
+        for heavy in ("backend.utils.llm", "backend.utils.script_generator", "backend.utils.audio_synthesizer", "transformers", "torch"):
+            assert heavy not in loaded, heavy
+    finally:
+        os.remove(path)
+        package_extractor._PDF_POOL.shutdown()
+        package_extractor._PDF_POOL = None
+
+def test_worker_reader_follows_file_changes():
+    path = write_pdf(2)
+    try:
+        assert pdf_extractor._extract_range(path, 0, 1)[1][0].split()[0] == "p0w0"
+        # The same path now holds a different document, as reused temp upload names do
+        with open(path, "wb") as f:
+            f.write(make_pdf(3).replace(b"(p0w", b"(q0w"))
+        _, texts = pdf_extractor._extract_range(path, 0, 3)
+        assert texts[0].split()[0] == "q0w0" and texts[2].split()[0] == "p2w0"
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    test_parallel_ranges_join_in_order()
+    test_page_limit_and_early_stop()
+    test_file_object_without_path()
+    test_pool_through_package_import()
+    test_worker_reader_follows_file_changes()
+    print("\nALL TESTS PASSED!")
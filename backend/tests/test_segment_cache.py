@@ -0,0 +1,117 @@
+import io
+import sys
+import os
+import tempfile
+import threading
+import numpy as np
+from contextlib import redirect_stdout
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import segment_cache
+
+def audio(value: float, samples: int = 100):
+    return np.full(samples, value, dtype=np.float32)
+
+def entry_size() -> int:
+    cache = segment_cache.SegmentCache(cache_dir=tempfile.mkdtemp())
+    cache.put("probe", audio(0))
+    return cache.stats()["size_bytes"]
+
+def test_keys():
+    print("Testing segment cache...")
+    key = segment_cache.make_segment_key("Hello there.", "af_bella")
+    assert segment_cache.make_segment_key("Hello there.", "af_bella", 1.0) == key
+    assert len({
+        key,
+        segment_cache.make_segment_key("Hello there!", "af_bella"),
+        segment_cache.make_segment_key("Hello there.", "am_adam"),
+        segment_cache.make_segment_key("Hello there.", "af_bella", 1.2),
+    }) == 4
+    print("PASSED")
+
+def test_hits_and_misses():
+    cache = segment_cache.SegmentCache(cache_dir=tempfile.mkdtemp())
+    assert cache.get("a") is None
+    cache.put("a", audio(0.5))
+    assert np.array_equal(cache.get("a"), audio(0.5))
+    assert cache.get("a").dtype == np.float32
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 1)
+    assert stats["hit_rate"] == 0.5
+
+    # A file that vanished or was corrupted counts as a miss and is forgotten
+    (cache.cache_dir / "a.npy").write_bytes(b"not numpy")
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 3 and cache.stats()["entries"] == 0
+
+def test_lru_byte_eviction():
+    size = entry_size()
+    cache = segment_cache.SegmentCache(cache_dir=tempfile.mkdtemp(), max_bytes=3 * size)
+    for key in "abc":
+        cache.put(key, audio(0))
+    cache.get("a")  # now b is the least recently used
+    cache.put("d", audio(0))
+    assert cache.get("b") is None and not (cache.cache_dir / "b.npy").exists()
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.stats()["size_bytes"] == 3 * size
+
+    # Re-putting a key replaces its size instead of counting it twice
+    cache.put("a", audio(0))
+    assert cache.stats()["size_bytes"] == 3 * size and cache.stats()["entries"] == 3
+
+def test_index_reloads_after_restart():
+    cache_dir = tempfile.mkdtemp()
+    size = entry_size()
+    cache = segment_cache.SegmentCache(cache_dir=cache_dir, max_bytes=10 * size)
+    for i, key in enumerate("abc"):
+        cache.put(key, audio(i))
+    # Recency survives through file mtimes: make a the most recently used
+    for age, key in enumerate("acb"):
+        os.utime(cache.cache_dir / f"{key}.npy", (1000 - age, 1000 - age))
+
+    reloaded = segment_cache.SegmentCache(cache_dir=cache_dir, max_bytes=10 * size)
+    assert reloaded.stats()["entries"] == 3 and reloaded.stats()["size_bytes"] == 3 * size
+    assert np.array_equal(reloaded.get("c"), audio(2))
+
+    # A smaller budget on restart evicts the least recently used entries first
+    shrunk = segment_cache.SegmentCache(cache_dir=cache_dir, max_bytes=2 * size)
+    assert shrunk.get("b") is None
+    assert shrunk.get("a") is not None
+
+def test_concurrent_writers_of_one_key():
+    cache = segment_cache.SegmentCache(cache_dir=tempfile.mkdtemp())
+    errors = []
+
+    def write(value):
+        try:
+            for _ in range(20):
+                cache.put("same", audio(value, 5000))
+        except Exception as e:
+            errors.append(e)
+
+    # put() reports failed writes instead of raising, so watch its output too
+    output = io.StringIO()
+    with redirect_stdout(output):
+        threads = [threading.Thread(target=write, args=(value,)) for value in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == [] and "Error writing" not in output.getvalue(), output.getvalue()
+    stored = cache.get("same")
+    # One writer's array, whole
+    assert stored is not None and len(set(stored.tolist())) == 1
+    assert [path.name for path in cache.cache_dir.iterdir()] == ["same.npy"]
+    assert cache.stats()["entries"] == 1
+
+if __name__ == "__main__":
+    test_keys()
+    test_hits_and_misses()
+    test_lru_byte_eviction()
+    test_index_reloads_after_restart()
+    test_concurrent_writers_of_one_key()
+    print("\nALL TESTS PASSED!")
@@ -0,0 +1,65 @@
+import sys
+import os
+import time
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+# soundfile is only needed for export_segments, which these tests do not cover
+with patch.dict(sys.modules, {"soundfile": MagicMock()}):
+    import segment_store
+
+def test_combined_in_order_and_out_of_order():
+    print("Testing SegmentStore assembly...")
+    store = segment_store.SegmentStore(sample_rate=10, initial_seconds=1)
+    store.append(0, "Alex", np.full(4, 0.0))
+    store.append(1, "Bailey", np.full(20, 1.0))  # grows the buffer
+    assert np.shares_memory(store.combined(), store._buffer)
+    assert store.combined().tolist() == [0.0] * 4 + [1.0] * 20
+
+    out_of_order = segment_store.SegmentStore(sample_rate=10, initial_seconds=1)
+    out_of_order.append(1, "Bailey", [1.0, 1.0])
+    out_of_order.append(0, "Alex", [0.0])
+    assert out_of_order.combined().tolist() == [0.0, 1.0, 1.0]
+    print("PASSED")
+
+def test_duplicate_index_replaces_earlier_turn():
+    store = segment_store.SegmentStore(sample_rate=10, initial_seconds=1)
+    store.append(0, "Alex", [0.0, 0.0])
+    store.append(1, "Bailey", [1.0])
+    store.append(1, "Bailey", [2.0, 2.0])  # a retried render of the same turn
+    assert len(store) == 2
+    assert store.get(1).tolist() == [2.0, 2.0]
+    # The stale samples stay in the buffer but must not leak into the episode
+    assert store.combined().tolist() == [0.0, 0.0, 2.0, 2.0]
+
+def test_registry_idle_ttl_and_byte_budget(monkeypatch):
+    monkeypatch.setattr(segment_store, "_STORES", {})
+    monkeypatch.setattr(segment_store, "SEGMENT_STORE_IDLE_SECONDS", 0.1)
+    old_id, _ = segment_store.create_segment_store()
+    time.sleep(0.2)
+    new_id, _ = segment_store.create_segment_store()
+    assert segment_store.get_segment_store(old_id) is None
+    assert segment_store.get_segment_store(new_id) is not None
+
+    # Each store starts with 60 s at 24 kHz of float32, about 5.5 MB
+    monkeypatch.setattr(segment_store, "_STORES", {})
+    monkeypatch.setattr(segment_store, "SEGMENT_STORE_IDLE_SECONDS", 900)
+    monkeypatch.setattr(segment_store, "SEGMENT_STORE_MAX_MB", 12)
+    first_id, first = segment_store.create_segment_store()
+    second_id, _ = segment_store.create_segment_store()
+    first.append(0, "Alex", [0.0])  # still being rendered into, so it counts as recently used
+    third_id, _ = segment_store.create_segment_store()
+    assert segment_store.get_segment_store(second_id) is None
+    assert segment_store.get_segment_store(first_id) is first
+    assert segment_store.get_segment_store(third_id) is not None
+
+if __name__ == "__main__":
+    test_combined_in_order_and_out_of_order()
+    test_duplicate_index_replaces_earlier_turn()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_registry_idle_ttl_and_byte_budget(monkeypatch)
+    print("\nALL TESTS PASSED!")
@@ -0,0 +1,171 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+
+# Repository root, to import the API layer the way the server does
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Audio libraries are not needed for job bookkeeping; mock only the ones that are not installed
+for name in ("soundfile", "kokoro"):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = MagicMock()
+
+from backend.schemas import SynthesisJobRequest
+from backend.utils import synthesis_jobs
+from backend.api.endpoints import audio
+
+SCRIPT = {"title": "Test", "dialogue": [{"speaker": "Alice", "text": f"Turn {i}"} for i in range(3)]}
+
+class FakeRender:
+    """Stands in for batch_synthesize_audio: writes one file per turn and reports progress."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, script, output_dir, progress_callback, **kwargs):
+        turns = script["dialogue"]
+        paths = []
+        for done, turn in enumerate(turns, start=1):
+            if done == len(turns):
+                # Hold the last turn so the test can look at a running job
+                self.gate.wait(5)
+            if self.fail:
+                raise RuntimeError("kokoro failed")
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            path = Path(output_dir) / f"segment_{done - 1}.wav"
+            path.write_bytes(b"RIFF")
+            paths.append(str(path))
+            progress_callback(done, len(turns))
+        return paths
+
+def fake_create_podcast(audio_paths, output_filename, store=None):
+    path = Path(tempfile.mkdtemp()) / output_filename
+    path.write_bytes(b"RIFF" + b"".join(Path(p).read_bytes() for p in audio_paths))
+    return str(path)
+
+@contextmanager
+def job_runner(render: FakeRender, slots: int = 10, max_jobs: int = 256):
+    synthesis_jobs.shutdown_synthesis_jobs()
+    with patch.object(synthesis_jobs, "batch_synthesize_audio", render), \
+            patch.object(synthesis_jobs, "create_podcast", fake_create_podcast), \
+            patch.object(synthesis_jobs, "JOBS_DIR", Path(tempfile.mkdtemp())), \
+            patch.object(synthesis_jobs, "MAX_TRACKED_JOBS", max_jobs), \
+            patch.object(synthesis_jobs, "_JOB_SLOTS", threading.BoundedSemaphore(slots)), \
+            patch.object(synthesis_jobs, "_JOBS", OrderedDict()):
+        try:
+            yield
+        finally:
+            render.gate.set()
+            synthesis_jobs.shutdown_synthesis_jobs()
+
+def wait_for(job_id: str, condition):
+    deadline = time.monotonic() + 5
+    while not condition(synthesis_jobs.get_synthesis_job(job_id)):
+        assert time.monotonic() < deadline, synthesis_jobs.get_synthesis_job(job_id)
+        time.sleep(0.01)
+    return synthesis_jobs.get_synthesis_job(job_id)
+
+def test_progress_and_cleanup():
+    print("Testing synthesis jobs...")
+    render = FakeRender()
+    render.gate.clear()
+    with job_runner(render):
+        job_id = synthesis_jobs.submit_synthesis_job(SCRIPT, ["Alice"])
+        job = wait_for(job_id, lambda job: job["completed_turns"] == 2)
+        assert job["status"] == "running" and job["total_turns"] == 3
+        output_dir = synthesis_jobs.JOBS_DIR / job_id
+        assert len(list(output_dir.iterdir())) == 2
+
+        render.gate.set()
+        job = wait_for(job_id, lambda job: job["status"] == "completed")
+        assert job["completed_turns"] == 3 and job["finished_at"] >= job["started_at"]
+        assert Path(job["final_audio_path"]).name == f"podcast_{job_id}.wav"
+        # The segments live on only inside the final WAV
+        assert job["audio_paths"] == [] and not output_dir.exists()
+    print("PASSED")
+
+def test_segments_kept_without_final_podcast():
+    with job_runner(FakeRender()):
+        job_id = synthesis_jobs.submit_synthesis_job(SCRIPT, ["Alice"], create_final=False)
+        job = wait_for(job_id, lambda job: job["status"] == "completed")
+        assert job["final_audio_path"] is None
+        assert [Path(path).name for path in job["audio_paths"]] == ["segment_0.wav", "segment_1.wav", "segment_2.wav"]
+        assert all(Path(path).exists() for path in job["audio_paths"])
+
+def test_failed_job_and_eviction_cleanup():
+    with job_runner(FakeRender(fail=True), max_jobs=1):
+        failed_id = synthesis_jobs.submit_synthesis_job(SCRIPT, ["Alice"])
+        job = wait_for(failed_id, lambda job: job["status"] == "failed")
+        assert job["error"] == "kokoro failed"
+        failed_dir = synthesis_jobs.JOBS_DIR / failed_id
+        failed_dir.mkdir(parents=True, exist_ok=True)
+
+        # A newer job pushes the finished one out, and its directory goes with it
+        newer_id = synthesis_jobs.submit_synthesis_job(SCRIPT, ["Alice"])
+        assert synthesis_jobs.get_synthesis_job(failed_id) is None
+        assert not failed_dir.exists()
+        wait_for(newer_id, lambda job: job["status"] == "failed")
+
+def test_job_evicted_while_running_removes_its_directory():
+    render = FakeRender()
+    render.gate.clear()
+    with job_runner(render, max_jobs=1):
+        running_id = synthesis_jobs.submit_synthesis_job(SCRIPT, ["Alice"], create_final=False)
+        wait_for(running_id, lambda job: job["completed_turns"] == 2)
+        synthesis_jobs.submit_synthesis_job(SCRIPT, ["Alice"], create_final=False)
+        assert synthesis_jobs.get_synthesis_job(running_id) is None
+
+        render.gate.set()
+        output_dir = synthesis_jobs.JOBS_DIR / running_id
+        deadline = time.monotonic() + 5
+        while output_dir.exists():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+def test_full_queue_is_rejected_with_429():
+    render = FakeRender()
+    render.gate.clear()
+    request = SynthesisJobRequest(
+        script=SCRIPT,
+        speaker_names=["Alice"],
+        speaker_genders={"Alice": "Female"},
+        provider="local",
+    )
+    with job_runner(render, slots=1):
+        accepted = asyncio.run(audio.create_synthesis_job(request))
+        assert accepted["status"] in ("queued", "running")
+        try:
+            asyncio.run(audio.create_synthesis_job(request))
+            assert False, "expected a 429"
+        except HTTPException as e:
+            assert e.status_code == 429
+            assert e.headers == {"Retry-After": str(synthesis_jobs.SYNTHESIS_JOB_RETRY_AFTER)}
+
+        # The slot comes back once the running job finishes
+        render.gate.set()
+        wait_for(accepted["job_id"], lambda job: job["status"] == "completed")
+        deadline = time.monotonic() + 5
+        while not synthesis_jobs._JOB_SLOTS.acquire(blocking=False):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        synthesis_jobs._JOB_SLOTS.release()
+
+if __name__ == "__main__":
+    test_progress_and_cleanup()
+    test_segments_kept_without_final_podcast()
+    test_failed_job_and_eviction_cleanup()
+    test_job_evicted_while_running_removes_its_directory()
+    test_full_queue_is_rejected_with_429()
+    print("\nALL TESTS PASSED!")
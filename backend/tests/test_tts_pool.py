@@ -0,0 +1,135 @@
+import sys
+import os
+import time
+import types
+import random
+import tempfile
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+# Register backend/utils as the `utils` package without running its __init__, so
+# tts_pool's relative imports resolve without the package init overhead
+utils_package = types.ModuleType("utils")
+utils_package.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils'))]
+sys.modules.setdefault("utils", utils_package)
+
+from utils import tts_pool, segment_cache
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+def make_turns(count: int):
+    voices = ["af_bella", "am_adam"]
+    return [(i, f"S{i % 2}", f"turn {i}", voices[i % 2]) for i in range(count)]
+
+def fake_audio(segment_index: int):
+    return np.full(10, segment_index, dtype=np.float32)
+
+def fake_render_turn(rendered):
+    def render(segment_index, text, voice_id):
+        rendered.append(segment_index)
+        # Finish out of order, as pool workers do
+        time.sleep(random.uniform(0, 0.02))
+        return [(segment_index, fake_audio(segment_index))]
+    return render
+
+def run_pool(turns, cache, render_turn, **kwargs):
+    executor = ThreadPoolExecutor(max_workers=3)
+    try:
+        with patch.object(tts_pool, "get_segment_cache", lambda: cache), \
+                patch.object(tts_pool, "get_tts_pool", lambda *args: executor), \
+                patch.object(tts_pool, "_render_turn", render_turn):
+            return list(tts_pool.pool_render_turns(turns, workers=3, **kwargs))
+    finally:
+        executor.shutdown()
+
+def test_worker_import_is_light():
+    print("Testing TTS pool imports...")
+    # What a spawned worker imports before its initializer runs
+    code = (
+        "import sys; import backend.utils.tts_pool; "
+        "print(','.join(m for m in ('backend.utils.llm', 'backend.utils.script_generator', "
+        "'backend.utils.content_extractor', 'transformers', 'torch') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "", result.stdout
+    print("PASSED")
+
+def test_cache_hits_are_served_in_the_parent():
+    cache = segment_cache.SegmentCache(cache_dir=tempfile.mkdtemp(), max_bytes=10 * 1024 * 1024)
+    turns = make_turns(6)
+    for segment_index, _, text, voice_id in turns[:3]:
+        cache.put(segment_cache.make_segment_key(text, voice_id), fake_audio(segment_index))
+
+    rendered = []
+    results = run_pool(turns, cache, fake_render_turn(rendered))
+    # Only the misses reach the workers, and the parent stores what they render
+    assert sorted(rendered) == [3, 4, 5]
+    assert sorted(index for index, _ in results) == list(range(6))
+    assert cache.stats()["entries"] == 6
+
+    rendered.clear()
+    results = run_pool(turns, cache, fake_render_turn(rendered))
+    assert rendered == [] and len(results) == 6
+
+def test_results_keep_their_segment_index():
+    rendered = []
+    results = run_pool(make_turns(20), None, fake_render_turn(rendered))
+    # Completion order is arbitrary; each audio still belongs to its segment index
+    assert sorted(index for index, _ in results) == list(range(20))
+    for segment_index, audio in results:
+        assert np.all(audio == segment_index)
+
+    groups = []
+
+    def render_group(turns, voice_id, batch_size):
+        groups.append((voice_id, [index for index, _, _ in turns]))
+        return [(index, fake_audio(index)) for index, _, _ in turns]
+
+    with patch.object(tts_pool, "_render_group", render_group):
+        results = run_pool(make_turns(10), None, None, batched=True, batch_size=3)
+    assert sorted(groups) == [("af_bella", [0, 2, 4]), ("af_bella", [6, 8]), ("am_adam", [1, 3, 5]), ("am_adam", [7, 9])]
+    assert sorted(index for index, _ in results) == list(range(10))
+
+def test_failed_task_skips_only_its_turns():
+    def render_turn(segment_index, text, voice_id):
+        if segment_index == 2:
+            raise RuntimeError("worker died")
+        return [(segment_index, fake_audio(segment_index))]
+
+    results = run_pool(make_turns(5), None, render_turn)
+    assert sorted(index for index, _ in results) == [0, 1, 3, 4]
+
+def test_pool_is_reused_and_shut_down():
+    started = []
+
+    def fake_executor(**kwargs):
+        executor = MagicMock()
+        started.append((kwargs["max_workers"], kwargs["initargs"], executor))
+        return executor
+
+    with patch.object(tts_pool, "ProcessPoolExecutor", fake_executor):
+        first = tts_pool.get_tts_pool(2, 1)
+        assert tts_pool.get_tts_pool(2, 1) is first and len(started) == 1
+
+        # A new configuration replaces the running pool
+        second = tts_pool.get_tts_pool(3, 2)
+        first.shutdown.assert_called_once_with(wait=True, cancel_futures=True)
+        assert started[-1][:2] == (3, (2,))
+
+        tts_pool.shutdown_tts_pool()
+        second.shutdown.assert_called_once_with(wait=True, cancel_futures=True)
+        assert tts_pool._TTS_POOL is None and tts_pool._TTS_POOL_CONFIG is None
+        # Shutting down twice is harmless, and the next call starts a fresh pool
+        tts_pool.shutdown_tts_pool()
+        assert tts_pool.get_tts_pool(2, 1) is started[-1][2]
+        tts_pool.shutdown_tts_pool()
+
+if __name__ == "__main__":
+    test_worker_import_is_light()
+    test_cache_hits_are_served_in_the_parent()
+    test_results_keep_their_segment_index()
+    test_failed_task_skips_only_its_turns()
+    test_pool_is_reused_and_shut_down()
+    print("\nALL TESTS PASSED!")
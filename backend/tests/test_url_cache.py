@@ -0,0 +1,153 @@
+import sys
+import os
+import time
+import types
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Register backend/utils as the `utils` package without running its __init__, so
+# content_extractor's relative imports resolve without the package init overhead
+utils_package = types.ModuleType("utils")
+utils_package.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils'))]
+sys.modules.setdefault("utils", utils_package)
+
+from utils import content_extractor, url_cache
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    """Serves one article, with an ETag and Last-Modified unless `validators` is off; answers 304 when they match."""
+    version = "v1"
+    last_modified = "Mon, 05 Oct 2026 10:00:00 GMT"
+    validators = True
+    full_responses = 0
+    not_modified = 0
+
+    def do_GET(self):
+        cls = type(self)
+        etag = f'"{cls.version}"'
+        if cls.validators and (self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == cls.last_modified):
+            cls.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        cls.full_responses += 1
+        body = f"<html><title>Article {cls.version}</title><body>Text {cls.version}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if cls.validators:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", cls.last_modified)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def make_cache(**kwargs):
+    path = os.path.join(tempfile.mkdtemp(), "urls.sqlite3")
+    return url_cache.URLContentCache(path=path, **kwargs)
+
+def fake_extract(html, **kwargs):
+    """Stands in for trafilatura.extract, which discards pages this short."""
+    fake_extract.calls += 1
+    return html.split("<body>")[1].split("<")[0]
+
+@contextmanager
+def article_server(**attributes):
+    """Runs ArticleHandler on a free port; extract_from_url uses a fresh cache and the fake extractor."""
+    handler = type("Handler", (ArticleHandler,), {"full_responses": 0, "not_modified": 0, **attributes})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache = make_cache()
+    fake_extract.calls = 0
+    try:
+        with patch.object(content_extractor, "get_url_cache", lambda force=False: cache), \
+                patch.object(content_extractor.trafilatura, "extract", fake_extract):
+            yield handler, cache, f"http://127.0.0.1:{server.server_address[1]}/article"
+    finally:
+        server.shutdown()
+
+def extract(url):
+    result = content_extractor.extract_from_url(url, time.monotonic() + 5)
+    assert result["success"], result["error"]
+    return result["title"], result["content"]
+
+def test_conditional_revalidation_against_server():
+    print("Testing conditional GET revalidation...")
+    with article_server() as (handler, cache, url):
+        assert extract(url + "#comments") == ("Article v1", "Text v1")
+        assert extract(url + "#comments") == ("Article v1", "Text v1")
+        assert extract(url) == ("Article v1", "Text v1")  # fragments share an entry
+        assert (handler.full_responses, handler.not_modified, fake_extract.calls) == (1, 2, 1)
+
+        # A changed page is downloaded and extracted again, title included
+        handler.version = "v2"
+        handler.last_modified = "Tue, 06 Oct 2026 10:00:00 GMT"
+        assert extract(url) == ("Article v2", "Text v2")
+        assert (handler.full_responses, fake_extract.calls) == (2, 2)
+        stats = cache.stats()
+        assert (stats["misses"], stats["revalidated"], stats["entries"]) == (2, 2, 1)
+        print(f"2 downloads, {handler.not_modified} revalidations - PASSED")
+
+def test_unchanged_body_without_validators():
+    # No ETag or Last-Modified: the page is downloaded each time, but an identical body skips extraction
+    with article_server(validators=False) as (handler, cache, url):
+        assert extract(url) == ("Article v1", "Text v1")
+        assert extract(url) == ("Article v1", "Text v1")
+        assert (handler.full_responses, handler.not_modified, fake_extract.calls) == (2, 0, 1)
+
+        handler.version = "v2"
+        assert extract(url) == ("Article v2", "Text v2")
+        assert fake_extract.calls == 2
+        stats = cache.stats()
+        assert (stats["misses"], stats["revalidated"]) == (2, 1)
+
+    # With the cache turned off every request is extracted
+    with article_server() as (handler, cache, url):
+        for _ in range(2):
+            result = content_extractor.extract_from_url(url, time.monotonic() + 5, use_cache=False)
+            assert (result["title"], result["content"]) == ("Article v1", "Text v1")
+        assert (handler.full_responses, fake_extract.calls, cache.stats()["entries"]) == (2, 2, 0)
+
+def test_fresh_window_skips_the_server():
+    cache = make_cache(fresh_seconds=60)
+    cache.put("http://example.com/a", "hash", "A", "content")
+    entry = cache.get("http://example.com/a")
+    assert entry["fresh"] and entry["content"] == "content"
+    assert make_cache(fresh_seconds=0).get("http://example.com/a") is None  # separate database
+
+def test_ttl_and_size_limits():
+    cache = make_cache(ttl_seconds=0.2)
+    cache.put("http://example.com/old", "hash", "Old", "text")
+    time.sleep(0.3)
+    assert cache.get("http://example.com/old") is None
+
+    cache = make_cache(max_entries=2)
+    for name in "abc":
+        cache.put(f"http://example.com/{name}", "hash", name, "text")
+        time.sleep(0.01)
+    assert cache.get("http://example.com/a") is None
+    assert cache.stats()["entries"] == 2
+
+    # 1000-byte entries against a 2500-byte budget: the least recently used goes first
+    cache = make_cache(max_bytes=2500)
+    cache.put("http://example.com/1", "hash", "", "x" * 1000)
+    time.sleep(0.01)
+    cache.put("http://example.com/2", "hash", "", "x" * 1000)
+    time.sleep(0.01)
+    cache.get("http://example.com/1")
+    time.sleep(0.01)
+    cache.put("http://example.com/3", "hash", "", "x" * 1000)
+    assert cache.get("http://example.com/2") is None
+    assert cache.get("http://example.com/1") is not None and cache.get("http://example.com/3") is not None
+
+if __name__ == "__main__":
+    test_conditional_revalidation_against_server()
+    test_unchanged_body_without_validators()
+    test_fresh_window_skips_the_server()
+    test_ttl_and_size_limits()
+    print("\nALL TESTS PASSED!")
@@ -0,0 +1,147 @@
+import sys
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend/utils to sys.path to import directly without package init overhead
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
+
+import url_fetcher
+
+class Handler(BaseHTTPRequestHandler):
+    """/sleep/<seconds>/<tag> answers after a delay; /trickle sends one byte per 0.2s."""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            parts = self.path.strip("/").split("/")
+            if parts[0] == "sleep":
+                time.sleep(float(parts[1]))
+                body = f"<html><title>{parts[2]}</title><body>page {parts[2]} ✓</body></html>".encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif parts[0] == "legacy":
+                # cp1252 pages declaring their charset only in the markup, or not at all
+                meta = {
+                    "meta": '<meta charset="windows-1252">',
+                    "http-equiv": '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">',
+                    "none": "",
+                }[parts[1]]
+                body = f"<html><head>{meta}<title>Café</title></head><body>{'Crème brûlée, déjà vu. ' * 20}</body></html>".encode("cp1252")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif parts[0] == "trickle":
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.end_headers()
+                for _ in range(50):
+                    self.wfile.write(b"x")
+                    self.wfile.flush()
+                    time.sleep(0.2)
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    # A handler class per server keeps the concurrency counters separate
+    handler = type("CountingHandler", (Handler,), {"active": 0, "peak": 0, "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+def fetch_html(url, deadline):
+    return url_fetcher.fetch_url(url, deadline).html
+
+def test_results_keep_input_order_and_per_host_limit():
+    print("Testing concurrent fetching with per-host limits...")
+    server, handler, base = start_server()
+    try:
+        urls = [f"{base}/sleep/{delay}/{i}" for i, delay in enumerate([0.3, 0.1, 0.3, 0.1])]
+        start = time.monotonic()
+        pages = url_fetcher.map_until_deadline(fetch_html, urls, time.monotonic() + 10)
+        elapsed = time.monotonic() - start
+
+        assert [page.split("<title>")[1].split("<")[0] for page in pages] == ["0", "1", "2", "3"]
+        assert "✓" in pages[0]  # UTF-8 body without a charset header
+        assert handler.peak == url_fetcher.URL_PER_HOST_LIMIT
+        assert elapsed < 0.8  # sequential would take 0.8s
+        print(f"4 URLs in {elapsed:.2f}s, peak {handler.peak} per host - PASSED")
+    finally:
+        server.shutdown()
+
+def test_meta_charset_and_legacy_pages():
+    server, _, base = start_server()
+    try:
+        for declaration in ("meta", "http-equiv", "none"):
+            page = url_fetcher.fetch_url(f"{base}/legacy/{declaration}", time.monotonic() + 5).html
+            assert "<title>Café</title>" in page and "Crème brûlée" in page, declaration
+    finally:
+        server.shutdown()
+
+def test_hosts_are_fetched_in_parallel():
+    servers = [start_server() for _ in range(3)]
+    try:
+        urls = [f"{base}/sleep/0.3/{i}" for i, (_, _, base) in enumerate(servers)]
+        start = time.monotonic()
+        pages = url_fetcher.map_until_deadline(fetch_html, urls, time.monotonic() + 10)
+        assert time.monotonic() - start < 0.6
+        assert all(pages)
+    finally:
+        for server, _, _ in servers:
+            server.shutdown()
+
+def test_deadline_bounds_slow_hosts():
+    server, _, base = start_server()
+    try:
+        urls = [f"{base}/sleep/0.05/fast", f"{base}/sleep/5/slow", f"{base}/trickle"]
+        start = time.monotonic()
+        pages = url_fetcher.map_until_deadline(fetch_html, urls, time.monotonic() + 0.8)
+        assert time.monotonic() - start < 1.5
+        assert "fast" in pages[0]
+        assert pages[1] is None and pages[2] is None
+
+        # A trickling body is cut off at the deadline even though each read is within the read timeout
+        try:
+            url_fetcher.fetch_url(f"{base}/trickle", time.monotonic() + 0.5)
+            assert False, "expected FetchTimeout"
+        except url_fetcher.FetchTimeout:
+            pass
+    finally:
+        server.shutdown()
+
+def test_http_errors_are_returned():
+    server, _, base = start_server()
+    try:
+        response = url_fetcher.fetch_url(f"{base}/missing", time.monotonic() + 5)
+        assert response.status_code == 404
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_results_keep_input_order_and_per_host_limit()
+    test_meta_charset_and_legacy_pages()
+    test_hosts_are_fetched_in_parallel()
+    test_deadline_bounds_slow_hosts()
+    test_http_errors_are_returned()
+    print("\nALL TESTS PASSED!")
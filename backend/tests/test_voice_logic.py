@@ -1,24 +1,32 @@
 
 import sys
 import os
+import time
+import types
+import threading
 from unittest.mock import MagicMock, patch
 
-# Mock dependencies that might not be present or needed for logic testing
-sys.modules["soundfile"] = MagicMock()
-sys.modules["kokoro"] = MagicMock()
-sys.modules["numpy"] = MagicMock()
-sys.modules["torch"] = MagicMock()
+# Register backend/utils as the `utils` package without running its __init__, so the
+# module's relative imports resolve without the package init overhead
+utils_package = types.ModuleType("utils")
+utils_package.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils'))]
 
-# Add backend/utils to sys.path to import directly without package init overhead
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils')))
-
-import audio_synthesizer
+# Mock dependencies that might not be present or needed for logic testing.
+# patch.dict restores sys.modules afterwards, so other test modules still get the real packages.
+with patch.dict(sys.modules, {
+    "soundfile": MagicMock(),
+    "kokoro": MagicMock(),
+    "numpy": MagicMock(),
+    "torch": MagicMock(),
+    "utils": utils_package,
+}):
+    from utils import audio_synthesizer
 
 def test_voice_assignment():
     print("Testing Voice Assignment Logic...")
     
     # Mock the synthesizer to avoid actual audio generation and tracking calls
-    with patch('utils.audio_synthesizer.synthesize_segment_kokoro') as mock_synthesize:
+    with patch.object(audio_synthesizer, 'synthesize_segment_kokoro') as mock_synthesize:
         mock_synthesize.return_value = "/tmp/dummy.wav"
         
         # Test Case 1: Single Female
@@ -97,5 +105,72 @@ def test_voice_assignment():
         
     print("\nALL TESTS PASSED!")
 
+def test_batched_progress_reaches_total_when_a_group_fails():
+    print("Testing batched progress with a failing voice group...")
+    script = {"dialogue": [
+        {"speaker": "Alice", "text": "Hi"},
+        {"speaker": "Bob", "text": "Yo"},
+        {"speaker": "Alice", "text": "Bye"}
+    ]}
+    progress = []
+    with patch.object(audio_synthesizer, 'get_segment_cache', return_value=None), \
+            patch.object(audio_synthesizer, 'get_kokoro_pipeline', side_effect=RuntimeError("no model")):
+        paths = audio_synthesizer.batch_synthesize_audio(
+            script, ["Alice", "Bob"], {"Alice": "Female", "Bob": "Male"},
+            batched=True, progress_callback=lambda done, total: progress.append((done, total))
+        )
+    assert paths == []
+    assert progress[-1] == (3, 3), progress
+    print("PASSED")
+
+class ConcurrencyTrackingPipeline:
+    """Stands in for KPipeline and records how many threads are inside it at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.005)
+        with self._lock:
+            self.active -= 1
+
+    def load_voice(self, voice_id):
+        self._enter()
+        return voice_id
+
+    def __call__(self, text, voice=None, speed=1):
+        for _ in range(3):
+            self._enter()
+            yield "graphemes", "phonemes", [0.0]
+
+def test_in_process_kokoro_calls_take_turns():
+    print("Testing concurrent in-process Kokoro calls...")
+    pipeline = ConcurrencyTrackingPipeline()
+    streamed = []
+
+    def stream():
+        streamed.extend(audio_synthesizer.stream_synthesize_audio([{"speaker": "Alice", "text": "Hi"}] * 3, ["Alice"]))
+
+    workers = [threading.Thread(target=audio_synthesizer.render_segment_kokoro, args=("Hello", "af_bella")) for _ in range(4)]
+    workers += [threading.Thread(target=stream) for _ in range(2)]
+    with patch.object(audio_synthesizer, 'get_segment_cache', return_value=None), \
+            patch.object(audio_synthesizer, 'get_kokoro_pipeline', return_value=pipeline):
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    # The request, stream and job threads share one pipeline: only one may be inside it
+    assert pipeline.peak == 1, pipeline.peak
+    assert len(streamed) == 2 * 3 * 3
+    print("PASSED")
+
 if __name__ == "__main__":
     test_voice_assignment()
+    test_batched_progress_reaches_total_when_a_group_fails()
+    test_in_process_kokoro_calls_take_turns()
@@ -0,0 +1,177 @@
+import sys
+import os
+import json
+import time
+import types
+import random
+import threading
+from unittest.mock import MagicMock, patch
+
+# Register backend/utils as the `utils` package without running its __init__, so
+# script_generator's relative imports resolve without the package init overhead
+utils_package = types.ModuleType("utils")
+utils_package.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils'))]
+sys.modules.setdefault("utils", utils_package)
+
+# Provider SDKs are not needed here; mock only the ones that are not installed
+for name in ("dotenv", "groq", "google", "google.genai", "openai"):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = MagicMock()
+
+from utils import script_generator
+
+SPEAKERS = script_generator.get_speaker_config(2)
+LLM_CONFIG = {"provider": "Stub"}
+
+def make_dialogue(turns: int):
+    return [{"speaker": SPEAKERS[i % 2]["name"], "text": f"t{i}"} for i in range(turns)]
+
+def parse_section(prompt: str, start: str, end: str):
+    section = prompt.split(start)[1].split(end)[0]
+    return [
+        {"speaker": line.split(": ", 1)[0], "text": line.split(": ", 1)[1]}
+        for line in (raw.strip() for raw in section.strip().splitlines())
+        if ": " in line
+    ]
+
+class StubLLM:
+    """Answers refine prompts with the section marked "r" and seam prompts with both sides marked "s"."""
+
+    def __init__(self, window_overrides=None):
+        self.window_overrides = window_overrides or {}
+        self.refine_calls = 0
+        self.seam_calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        if "SECTION (rewrite this):" in prompt:
+            turns = parse_section(prompt, "SECTION (rewrite this):", "FOLLOWING CONTEXT")
+            with self._lock:
+                self.refine_calls += 1
+            override = self.window_overrides.get(turns[0]["text"])
+            if override is not None:
+                return json.dumps(override)
+            return json.dumps([dict(turn, text=turn["text"] + "r") for turn in turns])
+
+        left = parse_section(prompt, "END OF FIRST SECTION:", "START OF NEXT SECTION:")
+        right = parse_section(prompt, "START OF NEXT SECTION:", "**Output")
+        with self._lock:
+            self.seam_calls.append(([t["text"] for t in left], [t["text"] for t in right]))
+        return json.dumps([dict(turn, text=turn["text"] + "s") for turn in left + right])
+
+def run_windowed(dialogue, stub, **kwargs):
+    with patch.object(script_generator, "query_llm", stub):
+        result = script_generator.stitch_and_refine_windowed([dialogue], LLM_CONFIG, SPEAKERS, **kwargs)
+    return [turn["text"] for turn in result]
+
+def test_short_last_window_is_merged():
+    print("Testing windowed refinement...")
+    stub = StubLLM()
+    # 26 turns in windows of 12: the trailing 2 turns join the second window
+    texts = run_windowed(make_dialogue(26), stub, window_size=12, overlap=2)
+    assert stub.refine_calls == 2
+    assert stub.seam_calls == [(["t10r", "t11r"], ["t12r", "t13r"])]
+    expected = [f"t{i}r" for i in range(26)]
+    for i in (10, 11, 12, 13):
+        expected[i] += "s"
+    assert texts == expected
+    print(f"{len(texts)} turns, 1 seam - PASSED")
+
+def test_every_turn_kept_once_across_seams():
+    stub = StubLLM()
+    texts = run_windowed(make_dialogue(40), stub, window_size=8, overlap=2)
+    assert [text.rstrip("rs") for text in texts] == [f"t{i}" for i in range(40)]
+    assert stub.refine_calls == 5 and len(stub.seam_calls) == 4
+
+def test_single_turn_window_skips_its_seams():
+    # The middle window comes back as one turn: it gives no turns to either seam
+    stub = StubLLM(window_overrides={"t4": [{"speaker": "Alex", "text": "merged"}]})
+    texts = run_windowed(make_dialogue(12), stub, window_size=4, overlap=2)
+    assert stub.seam_calls == []
+    assert texts == ["t0r", "t1r", "t2r", "t3r", "merged", "t8r", "t9r", "t10r", "t11r"]
+
+def test_empty_window_and_empty_seam_side():
+    stub = StubLLM()
+    refine_window = script_generator.refine_window
+
+    def refine_or_drop(window, *args):
+        # A window that refines to nothing (only reachable if refine_window returns [])
+        return [] if window[0]["text"] == "t4" else refine_window(window, *args)
+
+    with patch.object(script_generator, "refine_window", refine_or_drop):
+        texts = run_windowed(make_dialogue(16), stub, window_size=4, overlap=2)
+    # Seams next to the empty window have an empty side and are not sent to the model.
+    # Windows of 4 turns cap the overlap at 1, so the last seam joins one turn from each side.
+    assert stub.seam_calls == [(["t11r"], ["t12r"])]
+    assert texts == ["t0r", "t1r", "t2r", "t3r", "t8r", "t9r", "t10r", "t11rs", "t12rs", "t13r", "t14r", "t15r"]
+
+def test_single_window_and_no_overlap():
+    stub = StubLLM()
+    assert run_windowed(make_dialogue(5), stub, window_size=12) == [f"t{i}r" for i in range(5)]
+    assert stub.seam_calls == []
+    texts = run_windowed(make_dialogue(10), stub, window_size=4, overlap=0)
+    assert texts == [f"t{i}r" for i in range(10)] and stub.seam_calls == []
+
+def track_concurrency(fn):
+    """Wraps `fn` to record the peak number of calls running at once."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def wrapped(item):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        try:
+            time.sleep(random.uniform(0.01, 0.03))
+            return fn(item)
+        finally:
+            with lock:
+                state["active"] -= 1
+    return wrapped, state
+
+def test_map_with_provider_limit_order_and_limit():
+    with patch.dict(script_generator.PROVIDER_CONCURRENCY, {"LimitStub": 3}):
+        square, state = track_concurrency(lambda x: x * x)
+        assert script_generator.map_with_provider_limit(square, list(range(20)), "LimitStub") == [x * x for x in range(20)]
+        assert state["peak"] == 3
+
+        # The limit is shared by every caller in the process, not per call
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(script_generator.map_with_provider_limit(square, list(range(10)), "LimitStub")))
+            for _ in range(3)
+        ]
+        state["peak"] = 0
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert state["peak"] <= 3
+        assert results == [[x * x for x in range(10)]] * 3
+    assert script_generator.map_with_provider_limit(square, [], "LimitStub") == []
+
+def test_process_chunks_concurrently_keeps_chunk_order():
+    def process_chunk(chunk, llm_config, speakers, tone, custom_instructions):
+        return f"topic {chunk}", [{"speaker": "Alex", "text": chunk}]
+
+    slow_process_chunk, state = track_concurrency(lambda args: process_chunk(*args))
+    with patch.dict(script_generator.PROVIDER_CONCURRENCY, {"ChunkStub": 2}), \
+            patch.object(script_generator, "process_chunk", lambda *args: slow_process_chunk(args)):
+        chunks = [f"c{i}" for i in range(9)]
+        results = script_generator.process_chunks_concurrently(chunks, {"provider": "ChunkStub"}, SPEAKERS)
+    assert [topic for topic, _ in results] == [f"topic c{i}" for i in range(9)]
+    assert [dialogue[0]["text"] for _, dialogue in results] == chunks
+    assert state["peak"] == 2
+
+if __name__ == "__main__":
+    test_short_last_window_is_merged()
+    test_every_turn_kept_once_across_seams()
+    test_single_turn_window_skips_its_seams()
+    test_empty_window_and_empty_seam_side()
+    test_single_window_and_no_overlap()
+    test_map_with_provider_limit_order_and_limit()
+    test_process_chunks_concurrently_keeps_chunk_order()
+    print("\nALL TESTS PASSED!")
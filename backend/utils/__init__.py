@@ -1,10 +1,23 @@
-from .content_extractor import (
-    extract_from_url,
-    extract_from_pdf,
-    extract_from_docx,
-    extract_from_text,
-    aggregate_content
-)
-from .script_generator import generate_script
-from .audio_synthesizer import batch_synthesize_audio
-from .audio_processor import create_podcast
+import importlib
+
+# Re-exports resolve on first access, so importing one module of this package (as the
+# PDF and TTS worker processes do) does not load the LLM and TTS stacks behind the others
+_EXPORTS = {
+    "extract_from_url": "content_extractor",
+    "extract_from_urls": "content_extractor",
+    "extract_from_pdf": "content_extractor",
+    "extract_from_docx": "content_extractor",
+    "extract_from_text": "content_extractor",
+    "aggregate_content": "content_extractor",
+    "generate_script": "script_generator",
+    "batch_synthesize_audio": "audio_synthesizer",
+    "create_podcast": "audio_processor",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -0,0 +1,127 @@
+import os
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Target formats for the final podcast; bitrates are tuned for speech
+OUTPUT_FORMATS = {
+    "wav": {"extension": "wav", "media_type": "audio/wav"},
+    "mp3": {"extension": "mp3", "media_type": "audio/mpeg", "format": "mp3", "bitrate": "64k"},
+    "opus": {"extension": "ogg", "media_type": "audio/ogg", "format": "ogg", "codec": "libopus", "bitrate": "32k"},
+    "aac": {"extension": "m4a", "media_type": "audio/mp4", "format": "ipod", "codec": "aac", "bitrate": "64k"},
+}
+
+# ffmpeg does the heavy lifting in a subprocess, so a small thread pool is enough
+ENCODE_WORKERS = int(os.getenv("ENCODE_WORKERS", "2"))
+# Encodes allowed to wait for a worker; beyond that submissions are rejected
+ENCODE_QUEUE_LIMIT = int(os.getenv("ENCODE_QUEUE_LIMIT", "8"))
+ENCODE_RETRY_AFTER = int(os.getenv("ENCODE_RETRY_AFTER", "30"))
+MAX_TRACKED_JOBS = 256
+
+_ENCODER = None
+_ENCODER_LOCK = threading.Lock()
+_ENCODE_JOBS = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+# Covers running and queued encodes, like the API's admission semaphores
+_ENCODE_SLOTS = threading.BoundedSemaphore(ENCODE_WORKERS + ENCODE_QUEUE_LIMIT)
+
+class EncodeQueueFull(RuntimeError):
+    """Raised by submit_encode when every encoder is busy and the queue is full."""
+
+def media_type_for(path: str) -> str:
+    """Returns the Content-Type for a podcast file based on its extension."""
+    extension = Path(path).suffix.lstrip(".").lower()
+    for spec in OUTPUT_FORMATS.values():
+        if spec["extension"] == extension:
+            return spec["media_type"]
+    return "application/octet-stream"
+
+def encode_audio(wav_path: str, output_format: str) -> str:
+    """Encodes a WAV file into `output_format` next to it and returns the new path (Sync)."""
+    from pydub import AudioSegment
+
+    spec = OUTPUT_FORMATS[output_format]
+    if output_format == "wav":
+        return wav_path
+
+    output_path = Path(wav_path).with_suffix(f".{spec['extension']}")
+    export_args = {"format": spec["format"], "bitrate": spec["bitrate"]}
+    if "codec" in spec:
+        export_args["codec"] = spec["codec"]
+
+    AudioSegment.from_wav(wav_path).export(str(output_path), **export_args)
+    return str(output_path)
+
+def _get_encoder() -> ThreadPoolExecutor:
+    global _ENCODER
+    if _ENCODER is None:
+        with _ENCODER_LOCK:
+            if _ENCODER is None:
+                _ENCODER = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="encoder")
+    return _ENCODER
+
+def _run_encode_job(job_id: str):
+    with _JOBS_LOCK:
+        job = _ENCODE_JOBS.get(job_id)
+        if job is None:
+            return
+        job["status"] = "running"
+
+    try:
+        output_path = encode_audio(job["source_path"], job["output_format"])
+        update = {"status": "completed", "output_path": output_path}
+    except Exception as e:
+        print(f"Error encoding podcast to {job['output_format']}: {e}")
+        update = {"status": "failed", "error": str(e)}
+
+    with _JOBS_LOCK:
+        job.update(update)
+
+def submit_encode(wav_path: str, output_format: str, block: bool = False) -> str:
+    """
+    Queues a background encode of `wav_path` and returns its job id.
+    Raises EncodeQueueFull when ENCODE_WORKERS encodes are running and ENCODE_QUEUE_LIMIT
+    are waiting, unless `block` is set, in which case it waits for a slot.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if not _ENCODE_SLOTS.acquire(blocking=block):
+        raise EncodeQueueFull("Too many encodes queued, retry later")
+
+    job_id = uuid.uuid4().hex
+    with _JOBS_LOCK:
+        _ENCODE_JOBS[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "output_format": output_format,
+            "source_path": wav_path,
+            "output_path": None,
+            "error": None,
+        }
+        # Forget the oldest finished jobs; queued and running ones stay until they finish
+        finished = [old_id for old_id, job in _ENCODE_JOBS.items() if job["status"] in ("completed", "failed")]
+        for old_id in finished[:max(0, len(_ENCODE_JOBS) - MAX_TRACKED_JOBS)]:
+            del _ENCODE_JOBS[old_id]
+
+    try:
+        future = _get_encoder().submit(_run_encode_job, job_id)
+    except RuntimeError:
+        _ENCODE_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _ENCODE_SLOTS.release())
+    return job_id
+
+def get_encode_job(job_id: str):
+    """Returns a snapshot of an encode job, or None if it is unknown."""
+    with _JOBS_LOCK:
+        job = _ENCODE_JOBS.get(job_id)
+        return dict(job) if job else None
+
+def shutdown_encoder():
+    global _ENCODER
+    with _ENCODER_LOCK:
+        if _ENCODER is not None:
+            _ENCODER.shutdown(wait=False, cancel_futures=True)
+        _ENCODER = None
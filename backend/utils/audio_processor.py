@@ -1,39 +1,115 @@
+import struct
 import numpy as np
 import soundfile as sf
 from pathlib import Path
+from .segment_store import SegmentStore
 
 OUTPUT_DIR = Path("data/output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def create_podcast(audio_segments: list[str], output_filename: str = "final_podcast.wav") -> str:
+# Frames copied per read/write when streaming a segment file into the output
+STREAM_BLOCK_FRAMES = 65536
+
+def resample_audio(audio, source_rate: int, target_rate: int):
+    """Linear-interpolation resampler for the occasional segment at a foreign sample rate."""
+    if source_rate == target_rate or not len(audio):
+        return audio
+    duration = len(audio) / source_rate
+    target_length = max(1, int(round(duration * target_rate)))
+    source_times = np.arange(len(audio)) / source_rate
+    target_times = np.arange(target_length) / target_rate
+    return np.interp(target_times, source_times, audio).astype(np.float32)
+
+def _to_mono(audio):
+    return audio.mean(axis=1, dtype=np.float32) if audio.ndim > 1 else audio
+
+def _stream_podcast_to_file(audio_segments: list[str], output_path: Path, store: SegmentStore = None) -> str:
     """
-    Stitches audio segments using numpy and soundfile.
+    Appends segments to the output one at a time, so at most one segment is held in memory.
+    The first segment fixes the output sample rate; later segments are converted to it.
     """
-    if not audio_segments:
+    output = None
+    written = 0
+    try:
+        if store is not None:
+            output = sf.SoundFile(str(output_path), "w", samplerate=store.sample_rate, channels=1, subtype="PCM_16")
+            for segment in store.iter_segments():
+                output.write(segment)
+                written += 1
+        else:
+            for segment_path in audio_segments:
+                try:
+                    with sf.SoundFile(segment_path) as segment:
+                        if output is None:
+                            output = sf.SoundFile(str(output_path), "w", samplerate=segment.samplerate, channels=1, subtype="PCM_16")
+
+                        if segment.samplerate == output.samplerate:
+                            # Same rate: copy block by block without decoding the whole segment
+                            for block in segment.blocks(blocksize=STREAM_BLOCK_FRAMES, dtype="float32"):
+                                output.write(_to_mono(block))
+                        else:
+                            print(f"Resampling segment {segment_path} from {segment.samplerate} Hz to {output.samplerate} Hz")
+                            data = _to_mono(segment.read(dtype="float32"))
+                            output.write(resample_audio(data, segment.samplerate, output.samplerate))
+                    written += 1
+                except Exception as e:
+                    print(f"Error processing segment {segment_path}: {e}")
+    except Exception as e:
+        print(f"Error exporting podcast: {e}")
         return None
-        
-    all_audio = []
-    sample_rate = 24000 # Default for Kokoro
-    
-    for segment_path in audio_segments:
-        try:
-            data, sr = sf.read(segment_path)
-            all_audio.append(data)
-            sample_rate = sr # Keep the last one, assuming all same
-        except Exception as e:
-            print(f"Error processing segment {segment_path}: {e}")
-            
-    if not all_audio:
+    finally:
+        if output is not None:
+            output.close()
+
+    if not written:
+        if output is not None:
+            output_path.unlink(missing_ok=True)
         return None
-        
-    # Concatenate all segments
-    combined = np.concatenate(all_audio)
-    
+    return str(output_path)
+
+def create_podcast(audio_segments: list[str], output_filename: str = "final_podcast.wav", store: SegmentStore = None, streaming: bool = True) -> str:
+    """
+    Stitches audio segments using numpy and soundfile.
+    With a `store`, the episode is sliced from its in-memory buffer and `audio_segments` is ignored.
+    With `streaming` (the default) segments are appended to the open output one by one;
+    otherwise they are concatenated in memory first.
+    """
     # Ensure output_filename ends with .wav for consistency with our new implementation
     if not output_filename.endswith(".wav"):
         output_filename = output_filename.rsplit(".", 1)[0] + ".wav"
         
     output_path = OUTPUT_DIR / output_filename
+
+    if streaming:
+        if store is None and not audio_segments:
+            return None
+        return _stream_podcast_to_file(audio_segments, output_path, store)
+
+    if store is not None:
+        if not len(store):
+            return None
+        combined = store.combined()
+        sample_rate = store.sample_rate
+    else:
+        if not audio_segments:
+            return None
+            
+        all_audio = []
+        sample_rate = 24000 # Default for Kokoro
+        
+        for segment_path in audio_segments:
+            try:
+                data, sr = sf.read(segment_path, dtype="float32")
+                all_audio.append(data)
+                sample_rate = sr # Keep the last one, assuming all same
+            except Exception as e:
+                print(f"Error processing segment {segment_path}: {e}")
+                
+        if not all_audio:
+            return None
+            
+        # Concatenate all segments
+        combined = np.concatenate(all_audio)
     
     # Export as WAV
     try:
@@ -43,3 +119,23 @@ def create_podcast(audio_segments: list[str], output_filename: str = "final_podc
         print(f"Error exporting podcast: {e}")
         return None
 
+def wav_stream_header(sample_rate: int = 24000, channels: int = 1) -> bytes:
+    """
+    Builds a 16-bit PCM WAV header for a stream of unknown length.
+    The RIFF and data sizes are set to the maximum, which players treat as "read until EOF".
+    """
+    bits_per_sample = 16
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    unknown_size = 0xFFFFFFFF
+
+    return (
+        b"RIFF" + struct.pack("<I", unknown_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", unknown_size)
+    )
+
+def pcm16_bytes(audio) -> bytes:
+    """Converts float audio in [-1, 1] to little-endian 16-bit PCM bytes."""
+    samples = np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0)
+    return (samples * 32767).astype("<i2").tobytes()
@@ -1,22 +1,66 @@
 import os
+import re
+import shutil
+import threading
 import numpy as np
 import soundfile as sf
 from kokoro import KPipeline
 import torch
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from .segment_cache import get_segment_cache, make_segment_key
+from .segment_store import SegmentStore
+from .model_residency import get_model_residency
 
 TEMP_DIR = Path("data/temp")
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
-# Global pipeline cache to avoid reloading
-_KOKORO_PIPELINE = None
+# Kokoro-82M in fp32, used to make room before the first load and for pool workers' copies
+KOKORO_FOOTPRINT_BYTES = 82_000_000 * 4
+
+def _kokoro_device() -> str:
+    return "cuda" if torch.cuda.is_available() else "cpu"
 
 def get_kokoro_pipeline():
-    global _KOKORO_PIPELINE
-    if _KOKORO_PIPELINE is None:
+    # Resident alongside local LLMs while both fit the memory budget; reloaded if evicted
+    return get_model_residency().acquire(
+        "kokoro",
         # lang_code='a' is for American English
-        _KOKORO_PIPELINE = KPipeline(lang_code='a')
-    return _KOKORO_PIPELINE
+        lambda: KPipeline(lang_code='a'),
+        estimate={_kokoro_device(): KOKORO_FOOTPRINT_BYTES},
+    )
+
+# The tts, stream and job threads of this process share one KPipeline, which is not
+# documented as thread-safe, so calls into it take turns. Pool workers each own a
+# pipeline and run one task at a time, so the lock never contends there.
+KOKORO_LOCK = threading.Lock()
+_NO_RESULT = object()
+
+def kokoro_results(pipeline, text, **kwargs) -> Iterator:
+    """
+    Iterates Kokoro's results for `text` (a string or a list of strings), computing each
+    one under KOKORO_LOCK. The lock is released between results, so a stream can forward
+    audio while other requests render.
+    """
+    with KOKORO_LOCK:
+        results = pipeline(text, **kwargs)
+    while True:
+        with KOKORO_LOCK:
+            result = next(results, _NO_RESULT)
+        if result is _NO_RESULT:
+            return
+        yield result
+
+def prepare_tts(workers: int = 0):
+    """
+    Makes sure TTS has memory before a render: loads Kokoro in-process, or, when rendering
+    in `workers` pool processes, evicts idle models to leave room for their Kokoro copies.
+    """
+    if workers <= 0:
+        get_kokoro_pipeline()
+        return
+    footprint = get_model_residency().known_footprint("kokoro") or {_kokoro_device(): KOKORO_FOOTPRINT_BYTES}
+    get_model_residency().make_room({device: size * workers for device, size in footprint.items()})
 
 # Default voices for dynamic mapping (Expanded for variety)
 # Explicitly separated voice lists
@@ -26,43 +70,173 @@ MALE_VOICES = ["am_adam", "am_michael", "bm_george", "bm_lewis"]
 # Combined list for backwards compatibility or fallbacks if needed
 VOICE_LIST = FEMALE_VOICES + MALE_VOICES
 
-def synthesize_segment_kokoro(segment_index: int, speaker: str, text: str, voice_id: str) -> str:
-    """Synthesize a single audio segment using Kokoro TTS (Sync)."""
-    try:
-        pipeline = get_kokoro_pipeline()
+def save_segment_audio(segment_index: int, speaker: str, audio, output_dir: Path = TEMP_DIR) -> str:
+    """Writes one rendered turn to `output_dir` (TEMP_DIR by default) and returns its path."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    file_path = output_dir / f"segment_{segment_index}_{speaker}.wav"
+    
+    # Save as WAV (24khz is default for Kokoro)
+    sf.write(str(file_path), audio, 24000)
+    return str(file_path)
+
+def remove_segment_dirs(audio_paths: list[str]):
+    """
+    Deletes the per-request TEMP_DIR/<hex id> directories holding `audio_paths` once they
+    are no longer needed. Files directly in TEMP_DIR and paths elsewhere are left alone.
+    """
+    temp_root = TEMP_DIR.resolve()
+    for directory in {Path(path).resolve().parent for path in audio_paths}:
+        if directory.parent == temp_root and re.fullmatch(r"[0-9a-f]{32}", directory.name):
+            shutil.rmtree(directory, ignore_errors=True)
+
+def render_segment_kokoro(text: str, voice_id: str, speed: float = 1):
+    """Renders one turn to float32 PCM, consulting the segment cache first. Returns None if Kokoro produced nothing."""
+    cache = get_segment_cache()
+    cache_key = make_segment_key(text, voice_id, speed) if cache else None
+    cached_audio = cache.get(cache_key) if cache else None
+    if cached_audio is not None:
+        return cached_audio
+
+    pipeline = get_kokoro_pipeline()
+    
+    # Kokoro returns a generator
+    generator = kokoro_results(pipeline, text, voice=voice_id, speed=speed)
+    
+    all_audio = []
+    for _, _, audio in generator:
+        if audio is not None:
+            all_audio.append(audio)
         
-        # Kokoro returns a generator
-        generator = pipeline(text, voice=voice_id, speed=1)
+    if not all_audio:
+        return None
         
-        all_audio = []
-        for _, _, audio in generator:
-            if audio is not None:
-                all_audio.append(audio)
-            
-        if not all_audio:
+    final_audio = np.concatenate(all_audio).astype(np.float32, copy=False)
+    if cache:
+        cache.put(cache_key, final_audio)
+    return final_audio
+
+def synthesize_segment_kokoro(segment_index: int, speaker: str, text: str, voice_id: str, speed: float = 1, output_dir: Path = TEMP_DIR) -> str:
+    """Synthesize a single audio segment using Kokoro TTS (Sync)."""
+    try:
+        final_audio = render_segment_kokoro(text, voice_id, speed)
+        if final_audio is None:
             return None
-            
-        final_audio = np.concatenate(all_audio)
-        
-        file_path = TEMP_DIR / f"segment_{segment_index}_{speaker}.wav"
-        
-        # Save as WAV (24khz is default for Kokoro)
-        sf.write(str(file_path), final_audio, 24000)
-        return str(file_path)
+        return save_segment_audio(segment_index, speaker, final_audio, output_dir)
         
     except Exception as e:
         print(f"Error synthesizing segment {segment_index} (Kokoro): {e}")
         return None
 
-def batch_synthesize_audio(script: dict, unique_speakers: list[str], speaker_genders: dict[str, str] = None) -> list[str]:
-    """Process all dialogue segments sequentially for Kokoro."""
-    dialogue = script.get("dialogue", [])
-    results = []
-    
+def render_voice_group_kokoro(turns: list[tuple[int, str, str]], voice_id: str, batch_size: int = 8, speed: float = 1) -> Iterator[tuple[int, object]]:
+    """
+    Renders several turns that share a voice, passing `batch_size` texts per Kokoro call.
+    This is grouping, not tensor batching: Kokoro still runs g2p and inference text by text,
+    so it renders no faster than per-turn calls; only the voice pack is loaded once per group.
+    `turns` holds (segment_index, speaker, text) tuples; yields (segment_index, audio) as each
+    group completes. Turns that fail are not yielded.
+    """
+    # Serve unchanged turns from the segment cache; only the rest are rendered
+    cache = get_segment_cache()
+    pending = []
+    for segment_index, speaker, text in turns:
+        cached_audio = cache.get(make_segment_key(text, voice_id, speed)) if cache else None
+        if cached_audio is not None:
+            yield segment_index, cached_audio
+        else:
+            pending.append((segment_index, speaker, text))
+
+    if not pending:
+        return
+
+    try:
+        pipeline = get_kokoro_pipeline()
+        # Resolve the voice pack once for the whole group instead of per turn
+        with KOKORO_LOCK:
+            voice_pack = pipeline.load_voice(voice_id)
+    except Exception as e:
+        print(f"Error preparing voice group {voice_id} (Kokoro): {e}")
+        return
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        # Kokoro accepts a list of texts and tags every result with its text_index, so a
+        # batch shares one generator and voice pack; each text is still processed on its own.
+        texts = [" ".join(text.split()) for _, _, text in batch]
+        batch_audio = [[] for _ in batch]
+
+        try:
+            with torch.inference_mode():
+                for result in kokoro_results(pipeline, texts, voice=voice_pack, speed=speed):
+                    text_index = getattr(result, "text_index", None)
+                    if text_index is None:
+                        # Older Kokoro releases do not report text_index; fall back to per-turn calls
+                        raise LookupError("Kokoro result has no text_index")
+                    if result.audio is not None:
+                        batch_audio[text_index].append(result.audio)
+        except LookupError:
+            for segment_index, _, text in batch:
+                try:
+                    audio = render_segment_kokoro(text, voice_id, speed)
+                except Exception as e:
+                    print(f"Error synthesizing segment {segment_index} (Kokoro): {e}")
+                    continue
+                if audio is not None:
+                    yield segment_index, audio
+            continue
+        except Exception as e:
+            print(f"Error synthesizing batch for voice {voice_id} (Kokoro): {e}")
+            continue
+
+        for (segment_index, _, text), chunks in zip(batch, batch_audio):
+            if not chunks:
+                continue
+            final_audio = np.concatenate(chunks).astype(np.float32, copy=False)
+            if cache:
+                cache.put(make_segment_key(text, voice_id, speed), final_audio)
+            yield segment_index, final_audio
+
+def stream_synthesize_audio(dialogue: Iterable[dict], unique_speakers: list[str], speaker_genders: dict[str, str] = None, speed: float = 1) -> Iterator:
+    """
+    Yields float32 audio chunks in script order as soon as Kokoro produces them.
+    `dialogue` may be any iterable of turns, so callers can feed turns while they are still being written.
+    """
+    voice_mapping = assign_voices(unique_speakers, speaker_genders)
+    cache = get_segment_cache()
+
+    for i, turn in enumerate(dialogue):
+        speaker = turn.get("speaker")
+        text = turn.get("text")
+        if not text or not text.strip():
+            continue
+        voice_id = voice_mapping.get(speaker, VOICE_LIST[0])
+
+        cache_key = make_segment_key(text, voice_id, speed) if cache else None
+        cached_audio = cache.get(cache_key) if cache else None
+        if cached_audio is not None:
+            yield cached_audio
+            continue
+
+        try:
+            pipeline = get_kokoro_pipeline()
+            turn_audio = []
+            # Kokoro yields one chunk per sentence group; forward each immediately
+            for _, _, audio in kokoro_results(pipeline, text, voice=voice_id, speed=speed):
+                if audio is None:
+                    continue
+                chunk = np.asarray(audio, dtype=np.float32)
+                turn_audio.append(chunk)
+                yield chunk
+            if cache and turn_audio:
+                cache.put(cache_key, np.concatenate(turn_audio))
+        except Exception as e:
+            print(f"Error streaming segment {i} (Kokoro): {e}")
+
+def assign_voices(unique_speakers: list[str], speaker_genders: dict[str, str] = None) -> dict[str, str]:
+    """Map each speaker name to a Kokoro voice_id of the requested gender."""
     # Create a mapping from speaker name to voice_id ensuring uniqueness
     voice_mapping = {}
     used_voices = set()
-    
     for name in unique_speakers:
         gender = speaker_genders.get(name, "Female") if speaker_genders else "Female"
         
@@ -95,17 +269,97 @@ def batch_synthesize_audio(script: dict, unique_speakers: list[str], speaker_gen
                 
         voice_mapping[name] = voice_id
         used_voices.add(voice_id)
-    
-    for i, turn in enumerate(dialogue):
-        speaker = turn.get("speaker")
-        text = turn.get("text")
-        voice_id = voice_mapping.get(speaker, VOICE_LIST[0])
-        
-        path = synthesize_segment_kokoro(i, speaker, text, voice_id)
-        if path:
-            results.append(path)
-            
-    return results
 
+    return voice_mapping
+
+def batch_synthesize_audio(script: dict, unique_speakers: list[str], speaker_genders: dict[str, str] = None, batched: bool = False, batch_size: int = 8, workers: int = 0, store: SegmentStore = None, export_segments: bool = None, output_dir: Path = TEMP_DIR, progress_callback: Callable[[int, int], None] = None) -> list[str]:
+    """
+    Process all dialogue segments for Kokoro.
+    By default turns are rendered sequentially; with `batched=True` turns are grouped
+    by voice and passed to Kokoro `batch_size` texts per call (the same model work as
+    per-turn rendering, see render_voice_group_kokoro), still returning paths in script order.
+    With `workers` > 0 the turns are fanned out to the TTS process pool instead.
+
+    With a `store`, rendered PCM is appended to that SegmentStore and per-turn WAV files
+    are only written when `export_segments` is set (it defaults to True without a store).
+    Segment files go to `output_dir`; give each job its own directory so concurrent
+    episodes do not overwrite each other. `progress_callback(done, total)` is called per turn.
+    """
+    if export_segments is None:
+        export_segments = store is None
+
+    dialogue = script.get("dialogue", [])
+    voice_mapping = assign_voices(unique_speakers, speaker_genders)
+
+    turns = [
+        (i, turn.get("speaker"), turn.get("text"), voice_mapping.get(turn.get("speaker"), VOICE_LIST[0]))
+        for i, turn in enumerate(dialogue)
+        if turn.get("text") and turn.get("text").strip()
+    ]
+    speakers_by_index = {i: speaker for i, speaker, _, _ in turns}
+    paths = {}
+    rendered = set()
+    done = 0
+
+    def report_progress():
+        nonlocal done
+        done += 1
+        if progress_callback:
+            progress_callback(done, len(turns))
+
+    def collect(segment_index: int, audio):
+        speaker = speakers_by_index[segment_index]
+        if store is not None:
+            store.append(segment_index, speaker, audio)
+        if export_segments:
+            paths[segment_index] = save_segment_audio(segment_index, speaker, audio, output_dir)
+        rendered.add(segment_index)
+        report_progress()
 
+    def skip_missing(indices):
+        # Turns that failed or produced no audio still count, so progress reaches the total
+        for segment_index in indices:
+            if segment_index not in rendered:
+                rendered.add(segment_index)
+                report_progress()
+
+    if workers > 0:
+        # Imported lazily so the in-thread paths never touch multiprocessing
+        from .tts_pool import pool_render_turns
+
+        # Pool workers hold their own Kokoro copies, invisible to this process's residency manager
+        prepare_tts(workers)
+        for segment_index, audio in pool_render_turns(turns, workers=workers, batched=batched, batch_size=batch_size):
+            collect(segment_index, audio)
+        skip_missing(speakers_by_index)
+
+    elif batched:
+        groups = {}
+        for i, speaker, text, voice_id in turns:
+            groups.setdefault(voice_id, []).append((i, speaker, text))
+
+        for voice_id, group in groups.items():
+            for segment_index, audio in render_voice_group_kokoro(group, voice_id, batch_size):
+                collect(segment_index, audio)
+            skip_missing(i for i, _, _ in group)
+
+    else:
+        for i, speaker, text, voice_id in turns:
+            if store is None:
+                path = synthesize_segment_kokoro(i, speaker, text, voice_id, output_dir=output_dir)
+                if path:
+                    paths[i] = path
+                report_progress()
+                continue
+
+            try:
+                audio = render_segment_kokoro(text, voice_id)
+            except Exception as e:
+                print(f"Error synthesizing segment {i} (Kokoro): {e}")
+                audio = None
+            if audio is not None:
+                collect(i, audio)
+            else:
+                report_progress()
 
+    return [paths[i] for i in sorted(paths)]
@@ -0,0 +1,147 @@
+import os
+import re
+import math
+from typing import Callable, Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # optional: exact OpenAI token counts
+    tiktoken = None
+
+# Context/output limits per model. `request_token_limit` caps a single request below the
+# context window (e.g. Groq's tokens-per-minute quota rejects anything larger outright).
+# Keys are the provider names from llm.py; kept as literals so this module stays dependency-free.
+PROVIDER_PROFILES = {
+    "OpenAI": {"context_tokens": 128000, "max_output_tokens": 16384},
+    "Gemini": {"context_tokens": 1048576, "max_output_tokens": 65536},
+    "Groq": {"context_tokens": 131072, "max_output_tokens": 1024, "request_token_limit": int(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))},
+    # Local models are bounded by memory for the KV cache, not by their nominal window
+    "Local LLM": {"context_tokens": int(os.getenv("LOCAL_LLM_CONTEXT_TOKENS", "8192")), "max_output_tokens": 4096},
+}
+
+MODEL_PROFILES = {
+    "gpt-4o": {"context_tokens": 128000, "max_output_tokens": 16384},
+    "gpt-4o-mini": {"context_tokens": 128000, "max_output_tokens": 16384},
+    "gpt-4.1": {"context_tokens": 1047576, "max_output_tokens": 32768},
+    "gpt-4.1-mini": {"context_tokens": 1047576, "max_output_tokens": 32768},
+    "gemini-3-flash-preview": {"context_tokens": 1048576, "max_output_tokens": 65536},
+    "gemini-3-pro-preview": {"context_tokens": 1048576, "max_output_tokens": 65536},
+    # Output is capped by max_completion_tokens in llm.SAMPLING_PARAMS
+    "llama-3.1-8b-instant": PROVIDER_PROFILES["Groq"],
+}
+
+DEFAULT_PROFILE = {"context_tokens": 8192, "max_output_tokens": 2048}
+
+# Rough English ratio used when no tokenizer is available; errs on the side of more tokens
+CHARS_PER_TOKEN = 3.6
+
+WORDS_PER_MINUTE = 200
+# Spoken word plus its share of the {"speaker": ..., "text": ...} JSON around each turn
+TOKENS_PER_DIALOGUE_WORD = 1.6
+# generate_chunk_dialogue asks for 350-500 words per chunk
+CHUNK_DIALOGUE_WORDS = 425
+CHUNK_OUTPUT_TOKENS = 1024
+# Prompt template and speaker descriptions around the content
+PROMPT_OVERHEAD_TOKENS = 600
+# Never split content into chunks smaller than this just to reach the target length
+MIN_CHUNK_TOKENS = 600
+
+def get_model_profile(provider: str, model_name: str = None) -> Dict:
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(PROVIDER_PROFILES.get(provider, {}))
+    profile.update(MODEL_PROFILES.get(model_name or "", {}))
+    return profile
+
+def get_token_counter(provider: str, model_name: str = None, tokenizer=None) -> Callable[[List[str]], List[int]]:
+    """
+    Returns a batch token counter for the target model: the local pipeline's tokenizer,
+    tiktoken for OpenAI models when installed, otherwise a character-based approximation.
+    """
+    if tokenizer is not None:
+        return lambda texts: [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]] if texts else []
+
+    if provider == "OpenAI" and tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name or "")
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return lambda texts: [len(ids) for ids in encoding.encode_ordinary_batch(texts)]
+
+    return lambda texts: [math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts]
+
+def _split_oversized(sentence: str, tokens: int, budget: int) -> List[str]:
+    # Extracted PDFs can contain "sentences" thousands of words long; cut them on whitespace
+    words = sentence.split()
+    pieces = math.ceil(tokens / budget)
+    per_piece = math.ceil(len(words) / pieces)
+    return [" ".join(words[i:i + per_piece]) for i in range(0, len(words), per_piece)]
+
+def _pack(sentences: List[str], counts: List[int], target: int, budget: int) -> List[str]:
+    """Greedy packing that closes a chunk at whichever side of `target` is closer."""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence, tokens in zip(sentences, counts):
+        if current:
+            overshoot = current_tokens + tokens - target
+            if current_tokens + tokens > budget or (overshoot > 0 and overshoot > target - current_tokens):
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def single_call_token_budget(provider: str, model_name: str = None, duration: int = 5, prompt_tokens: int = PROMPT_OVERHEAD_TOKENS) -> int:
+    """Content tokens that still fit a single request alongside the prompt and the expected script."""
+    profile = get_model_profile(provider, model_name)
+    window = min(profile["context_tokens"], profile.get("request_token_limit") or profile["context_tokens"])
+    single_output = min(profile["max_output_tokens"], math.ceil(duration * WORDS_PER_MINUTE * TOKENS_PER_DIALOGUE_WORD))
+    return window - prompt_tokens - single_output
+
+def plan_chunks(text: str, provider: str, model_name: str = None, duration: int = 5, tokenizer=None, prompt_tokens: int = PROMPT_OVERHEAD_TOKENS) -> Dict:
+    """
+    Decides between a single call and chunked generation from the model's real limits.
+
+    Single call when content, prompt and the expected script all fit one request.
+    Otherwise the content is split into as few, evenly sized chunks as the request size allows,
+    but into enough chunks that the per-chunk dialogues add up to the target duration.
+    """
+    profile = get_model_profile(provider, model_name)
+    count_tokens = get_token_counter(provider, model_name, tokenizer)
+    window = min(profile["context_tokens"], profile.get("request_token_limit") or profile["context_tokens"])
+
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+    counts = count_tokens(sentences)
+    total_tokens = sum(counts)
+
+    target_words = duration * WORDS_PER_MINUTE
+    single_budget = single_call_token_budget(provider, model_name, duration, prompt_tokens)
+    plan = {
+        "provider": provider,
+        "model_name": model_name,
+        "profile": profile,
+        "total_tokens": total_tokens,
+    }
+
+    if total_tokens <= single_budget:
+        return {**plan, "mode": "single", "chunks": [text] if text.strip() else [], "chunk_token_budget": single_budget}
+
+    budget = max(MIN_CHUNK_TOKENS, window - prompt_tokens - min(profile["max_output_tokens"], CHUNK_OUTPUT_TOKENS))
+
+    if any(tokens > budget for tokens in counts):
+        split_sentences = []
+        for sentence, tokens in zip(sentences, counts):
+            split_sentences.extend(_split_oversized(sentence, tokens, budget) if tokens > budget else [sentence])
+        sentences = split_sentences
+        counts = count_tokens(sentences)
+        total_tokens = sum(counts)
+
+    num_chunks = max(
+        math.ceil(total_tokens / budget),
+        min(math.ceil(target_words / CHUNK_DIALOGUE_WORDS), total_tokens // MIN_CHUNK_TOKENS),
+    )
+    chunks = _pack(sentences, counts, math.ceil(total_tokens / num_chunks), budget)
+    return {**plan, "total_tokens": total_tokens, "mode": "chunked", "chunks": chunks, "chunk_token_budget": budget}
@@ -0,0 +1,173 @@
+import os
+import re
+import numpy as np
+
+# Drop paragraphs that repeat earlier ones (e.g. several articles covering the same story)
+DEDUP_ENABLED = os.getenv("CONTENT_DEDUP_ENABLED", "1") == "1"
+# Jaccard similarity of word 5-gram sets above which a paragraph counts as a duplicate
+DEDUP_THRESHOLD = float(os.getenv("CONTENT_DEDUP_THRESHOLD", "0.8"))
+
+SHINGLE_WORDS = 5
+# Shorter paragraphs (headings, captions) are always kept
+MIN_PARAGRAPH_WORDS = 8
+
+# 16 bands of 8 rows: pairs above ~0.7 similarity almost always share a band
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Multiply-shift hashing: the top 32 bits of (a * h + b) mod 2**64, with odd a.
+# Avoids a 64-bit modulo, which dominates the cost of MinHash in NumPy.
+_rng = np.random.default_rng(1)
+_PERM_A = (_rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64) << np.uint64(1)
+_SHIFT = np.uint64(32)
+# Multipliers that combine consecutive word hashes into a shingle hash
+_SHINGLE_MULTIPLIERS = [np.uint64(m) for m in (1, 0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)]
+
+_WORD_RE = re.compile(r"\w+")
+_BLOCK_SHINGLES = 50000  # rows per MinHash block, bounds the signature matrix to ~50 MB
+
+def split_paragraphs(text: str):
+    """Splits on blank lines, or on single newlines for text without any (e.g. trafilatura output)."""
+    separator = "\n\n" if re.search(r"\n\s*\n", text) else "\n"
+    blocks = re.split(r"\n\s*\n", text) if separator == "\n\n" else text.split("\n")
+    return [block.strip() for block in blocks if block.strip()], separator
+
+def _shingle_hashes(paragraphs: list):
+    """Hashed word 5-grams of every paragraph, concatenated, plus each paragraph's [start, end) offsets."""
+    word_hashes = []
+    offsets = [0]
+    for paragraph in paragraphs:
+        words = _WORD_RE.findall(paragraph.lower())
+        word_hashes.extend(hash(word) & 0xFFFFFFFF for word in words)
+        offsets.append(len(word_hashes))
+
+    words = np.asarray(word_hashes, dtype=np.uint64)
+    n = len(words) - SHINGLE_WORDS + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros((len(paragraphs), 2), dtype=np.int64)
+
+    shingles = np.zeros(n, dtype=np.uint64)
+    for k, multiplier in enumerate(_SHINGLE_MULTIPLIERS):
+        shingles += words[k:k + n] * multiplier  # uint64 arithmetic wraps, which is fine for hashing
+    shingles &= np.uint64(0xFFFFFFFF)
+
+    # Shingles starting in a paragraph must also end in it
+    starts = np.asarray(offsets[:-1], dtype=np.int64)
+    ends = np.maximum(np.asarray(offsets[1:], dtype=np.int64) - SHINGLE_WORDS + 1, starts)
+    spans = np.stack([starts, np.minimum(ends, n)], axis=1)
+    spans[:, 0] = np.minimum(spans[:, 0], spans[:, 1])
+    return shingles, spans
+
+def _minhash_signatures(shingles: np.ndarray, spans: np.ndarray, candidates: list) -> dict:
+    """MinHash signatures for the paragraphs in `candidates`, computed in bounded blocks."""
+    signatures = {}
+    block = []
+    block_size = 0
+
+    def flush():
+        if not block:
+            return
+        rows = np.concatenate([shingles[spans[i, 0]:spans[i, 1]] for i in block])
+        # One row per permutation, so the per-paragraph minimum reduces over contiguous memory
+        hashed = (_PERM_A[:, None] * rows[None, :] + _PERM_B[:, None]) >> _SHIFT
+        lengths = [spans[i, 1] - spans[i, 0] for i in block]
+        mins = np.minimum.reduceat(hashed, np.cumsum([0] + lengths[:-1]), axis=1).T
+        for i, signature in zip(block, mins):
+            signatures[i] = np.ascontiguousarray(signature)
+
+    for i in candidates:
+        block.append(i)
+        block_size += spans[i, 1] - spans[i, 0]
+        if block_size >= _BLOCK_SHINGLES:
+            flush()
+            block = []
+            block_size = 0
+    flush()
+    return signatures
+
+def find_duplicate_paragraphs(paragraphs: list, threshold: float = None) -> set:
+    """
+    Returns indices of paragraphs that nearly repeat an earlier one.
+    MinHash + LSH banding finds candidates without comparing all pairs;
+    candidates are confirmed with the Jaccard similarity of their shingle sets.
+    The banding is tuned for thresholds of ~0.7 and up; lower ones miss most pairs.
+    """
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    shingles, spans = _shingle_hashes(paragraphs)
+    candidates = [
+        i for i in range(len(paragraphs))
+        if spans[i, 1] > spans[i, 0] and spans[i, 1] - spans[i, 0] >= MIN_PARAGRAPH_WORDS - SHINGLE_WORDS + 1
+    ]
+    signatures = _minhash_signatures(shingles, spans, candidates)
+
+    buckets = [{} for _ in range(BANDS)]
+    shingle_sets = {}
+    duplicates = set()
+
+    def shingle_set(i):
+        if i not in shingle_sets:
+            shingle_sets[i] = set(shingles[spans[i, 0]:spans[i, 1]].tolist())
+        return shingle_sets[i]
+
+    for i in candidates:
+        band_keys = [signatures[i][b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+        matches = set()
+        for bucket, key in zip(buckets, band_keys):
+            matches.update(bucket.get(key, ()))
+
+        is_duplicate = False
+        for j in matches:
+            a, b = shingle_set(i), shingle_set(j)
+            if len(a & b) >= threshold * len(a | b):
+                is_duplicate = True
+                break
+
+        if is_duplicate:
+            duplicates.add(i)
+        else:
+            # Only kept paragraphs are indexed, so later copies are compared against the original
+            for bucket, key in zip(buckets, band_keys):
+                bucket.setdefault(key, []).append(i)
+
+    return duplicates
+
+def deduplicate_sources(contents: list, threshold: float = None) -> list:
+    """
+    Removes near-duplicate paragraphs across (and within) sources, keeping the first occurrence.
+    Returns one {"content", "word_count", "removed_words", "removed_paragraphs"} per input text.
+    """
+    paragraphs = []
+    owners = []
+    separators = []
+    for source_index, content in enumerate(contents):
+        source_paragraphs, separator = split_paragraphs(content)
+        paragraphs.extend(source_paragraphs)
+        owners.extend([source_index] * len(source_paragraphs))
+        separators.append(separator)
+
+    duplicates = find_duplicate_paragraphs(paragraphs, threshold) if paragraphs else set()
+
+    kept = [[] for _ in contents]
+    removed_words = [0] * len(contents)
+    removed_paragraphs = [0] * len(contents)
+    for i, (paragraph, owner) in enumerate(zip(paragraphs, owners)):
+        if i in duplicates:
+            removed_words[owner] += len(paragraph.split())
+            removed_paragraphs[owner] += 1
+        else:
+            kept[owner].append(paragraph)
+
+    results = []
+    for source_index, content in enumerate(contents):
+        if removed_paragraphs[source_index]:
+            content = separators[source_index].join(kept[source_index])
+        results.append({
+            "content": content,
+            "word_count": len(content.split()),
+            "removed_words": removed_words[source_index],
+            "removed_paragraphs": removed_paragraphs[source_index],
+        })
+    return results
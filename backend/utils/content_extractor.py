@@ -1,11 +1,27 @@
+import time
+import functools
 import requests
 import trafilatura
-from PyPDF2 import PdfReader
 from docx import Document
 import io
+from .content_dedup import DEDUP_ENABLED, deduplicate_sources
+from .url_fetcher import URL_FETCH_DEADLINE, FetchTimeout, fetch_url, map_until_deadline
+from .url_cache import URLContentCache, get_url_cache, hash_body
+from .pdf_extractor import extract_pdf_text
 
-def extract_from_url(url: str) -> dict:
-    """Extracts main content from a URL using Trafilatura."""
+def _cached_result(result: dict, cached: dict) -> dict:
+    result["title"] = cached["title"]
+    result["content"] = cached["content"]
+    result["word_count"] = len(cached["content"].split())
+    result["success"] = True
+    return result
+
+def extract_from_url(url: str, deadline: float = None, use_cache: bool = None) -> dict:
+    """
+    Extracts main content from a URL using Trafilatura.
+    Cached extractions are reused when the server confirms the page is unchanged
+    (304 to a conditional GET, or an identical body). `use_cache` None follows URL_CACHE_ENABLED.
+    """
     result = {
         "source": url,
         "title": "Unknown Title",
@@ -14,10 +30,27 @@ def extract_from_url(url: str) -> dict:
         "success": False,
         "error": None
     }
+    cache = get_url_cache(force=bool(use_cache)) if use_cache is not False else None
+    cached = cache.get(url) if cache is not None else None
     
     try:
-        downloaded = trafilatura.fetch_url(url)
+        if cached and cached["fresh"]:
+            cache.record(url, "hit")
+            return _cached_result(result, cached)
+
+        response = fetch_url(url, deadline, headers=URLContentCache.conditional_headers(cached) if cached else None)
+        if cached and response.status_code == 304:
+            cache.record(url, "revalidated")
+            return _cached_result(result, cached)
+
+        downloaded = response.html if response.ok else None
         if downloaded:
+            body_hash = hash_body(downloaded)
+            if cached and cached["body_hash"] == body_hash:
+                # The server sent no validators (or ignored them), but the page has not changed
+                cache.record(url, "revalidated")
+                return _cached_result(result, cached)
+
             content = trafilatura.extract(downloaded, include_comments=False, favor_precision=True)
             if content:
                 result["content"] = content
@@ -31,17 +64,48 @@ def extract_from_url(url: str) -> dict:
                     end = downloaded.find("</title>", start)
                     if start != -1 and end != -1:
                         result["title"] = downloaded[start:end]
+
+                if cache is not None:
+                    cache.record(url, "miss")
+                    cache.put(url, body_hash, result["title"], content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
             else:
                 result["error"] = "Content extraction failed (empty content)"
         else:
-            result["error"] = "Failed to fetch URL"
+            result["error"] = f"Failed to fetch URL (HTTP {response.status_code})"
+    except (FetchTimeout, requests.Timeout):
+        result["error"] = "Failed to fetch URL (timed out)"
+    except requests.ConnectionError:
+        result["error"] = "Failed to fetch URL (connection failed)"
     except Exception as e:
         result["error"] = f"Error extracting from URL: {str(e)}"
         
     return result
 
-def extract_from_pdf(file) -> dict:
-    """Extracts text from a PDF file."""
+def extract_from_urls(urls: list[str], deadline_seconds: float = None, use_cache: bool = None) -> list[dict]:
+    """
+    Fetches and extracts URLs concurrently, returning results in input order.
+    The whole batch shares one deadline (URL_FETCH_DEADLINE by default), so a slow host
+    only costs its own result.
+    """
+    deadline = time.monotonic() + (URL_FETCH_DEADLINE if deadline_seconds is None else deadline_seconds)
+    results = map_until_deadline(functools.partial(extract_from_url, use_cache=use_cache), urls, deadline)
+    return [
+        result if result is not None else {
+            "source": url,
+            "title": "Unknown Title",
+            "content": "",
+            "word_count": 0,
+            "success": False,
+            "error": "Failed to fetch URL (request deadline exceeded)"
+        }
+        for url, result in zip(urls, results)
+    ]
+
+def extract_from_pdf(file, max_words: int = None, max_pages: int = None) -> dict:
+    """
+    Extracts text from a PDF file. Large documents are read in parallel page ranges;
+    extraction stops at `max_pages` or once `max_words` have been collected.
+    """
     result = {
         "source": file.name,
         "title": file.name,
@@ -52,15 +116,15 @@ def extract_from_pdf(file) -> dict:
     }
     
     try:
-        pdf_reader = PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+        extracted = extract_pdf_text(file, max_pages=max_pages, max_words=max_words)
+        text = extracted["text"]
             
         if text.strip():
             result["content"] = text
-            result["word_count"] = len(text.split())
+            result["word_count"] = extracted["word_count"]
             result["success"] = True
+            if extracted["truncated"]:
+                result["pages"] = f"first {extracted['pages_read']} of {extracted['total_pages']} pages"
         else:
             result["error"] = "No text found in PDF"
     except Exception as e:
@@ -120,8 +184,8 @@ def extract_from_text(file) -> dict:
         
     return result
 
-def aggregate_content(sources: list[dict]) -> dict:
-    """Aggregates content from multiple extracted sources."""
+def aggregate_content(sources: list[dict], dedup: bool = None) -> dict:
+    """Aggregates content from multiple extracted sources, dropping near-duplicate paragraphs."""
     aggregated = {
         "combined_content": "",
         "total_word_count": 0,
@@ -129,15 +193,34 @@ def aggregate_content(sources: list[dict]) -> dict:
         "valid": False,
         "error": None
     }
-    
+
+    dedup = DEDUP_ENABLED if dedup is None else dedup
+    successful = [source for source in sources if source["success"]]
+    deduped = iter(deduplicate_sources([source["content"] for source in successful]) if dedup and successful else [])
+    removed_words = 0
+    removed_paragraphs = 0
+
     for source in sources:
         if source["success"]:
-            aggregated["combined_content"] += f"\n\n--- Source: {source['title']} ---\n{source['content']}"
-            aggregated["total_word_count"] += source["word_count"]
-            aggregated["sources_summary"].append(f"✅ {source['title']} ({source['word_count']} words)")
+            content, word_count = source["content"], source["word_count"]
+            pages = f", {source['pages']}" if source.get("pages") else ""
+            summary = f"✅ {source['title']} ({word_count} words{pages})"
+            if dedup:
+                result = next(deduped)
+                if result["removed_paragraphs"]:
+                    content, word_count = result["content"], result["word_count"]
+                    summary = f"✅ {source['title']} ({word_count} words{pages}, {result['removed_words']} duplicate words removed)"
+                    removed_words += result["removed_words"]
+                    removed_paragraphs += result["removed_paragraphs"]
+            aggregated["combined_content"] += f"\n\n--- Source: {source['title']} ---\n{content}"
+            aggregated["total_word_count"] += word_count
+            aggregated["sources_summary"].append(summary)
         else:
             aggregated["sources_summary"].append(f"❌ {source['source']}: {source['error']}")
-            
+
+    if removed_paragraphs:
+        aggregated["sources_summary"].append(f"♻️ Removed {removed_words} words in {removed_paragraphs} near-duplicate paragraphs")
+
     if aggregated["total_word_count"] >= 500:
         aggregated["valid"] = True
     else:
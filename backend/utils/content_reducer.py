@@ -0,0 +1,120 @@
+import os
+import re
+import math
+from typing import Callable, Dict, List
+import numpy as np
+
+# Shrink long content to what a podcast of the requested length can use before any LLM call
+REDUCTION_ENABLED = os.getenv("CONTENT_REDUCTION_ENABLED", "1") == "1"
+# Source words kept per minute of audio; the script itself is ~200 words per minute
+SOURCE_WORDS_PER_MINUTE = int(os.getenv("CONTENT_REDUCTION_WORDS_PER_MINUTE", "800"))
+# Below this much material per minute, chunked generation beats squeezing content into one call
+MIN_SOURCE_WORDS_PER_MINUTE = 300
+
+_SOURCE_MARKER = re.compile(r"(\n*--- Source: .*? ---\n)")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"\w+")
+
+def split_sections(text: str) -> List[Dict]:
+    """Splits aggregated content into {"header", "sentences"} per `--- Source: ... ---` section."""
+    parts = _SOURCE_MARKER.split(text)
+    sections = []
+    if parts[0].strip():
+        sections.append({"header": "", "body": parts[0]})
+    for header, body in zip(parts[1::2], parts[2::2]):
+        sections.append({"header": header, "body": body})
+    for section in sections:
+        section["sentences"] = [s.strip() for s in _SENTENCE_SPLIT.split(section.pop("body")) if s.strip()]
+    return sections
+
+def score_sentences(sentences: List[str]) -> np.ndarray:
+    """
+    Cosine similarity of each sentence's TF-IDF vector to the document centroid.
+    Computed on the sparse (sentence, term) pairs, so cost is linear in the number of words.
+    """
+    tokens = [_WORD_RE.findall(sentence.lower()) for sentence in sentences]
+    lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+    if not lengths.sum():
+        return np.zeros(len(sentences))
+
+    terms, term_ids = np.unique(np.array([word for t in tokens for word in t]), return_inverse=True)
+    sentence_ids = np.repeat(np.arange(len(sentences)), lengths)
+
+    # Term frequency per distinct (sentence, term) pair
+    pairs, counts = np.unique(sentence_ids * len(terms) + term_ids, return_counts=True)
+    rows, cols = pairs // len(terms), pairs % len(terms)
+
+    document_frequency = np.bincount(cols, minlength=len(terms))
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(counts)) * idf[cols]
+
+    norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=len(sentences)))
+    centroid = np.bincount(cols, weights, minlength=len(terms)) / len(sentences)
+    scores = np.bincount(rows, weights * centroid[cols], minlength=len(sentences))
+    scores = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+
+    # Fragments (headings, page numbers, citations) rarely carry content on their own
+    return scores * np.minimum(1.0, lengths / 8)
+
+def reduce_content(text: str, max_words: int, max_tokens: int = None, count_tokens: Callable[[List[str]], List[int]] = None) -> Dict:
+    """
+    Extractive reduction: keeps the highest-scoring sentences, in their original order,
+    within `max_words` (and `max_tokens` when a token counter is given).
+    Every source keeps a share of the budget proportional to its size.
+    """
+    sections = split_sections(text)
+    sentences = [sentence for section in sections for sentence in section["sentences"]]
+    words = np.array([len(sentence.split()) for sentence in sentences], dtype=np.int64)
+    total_words = int(words.sum())
+
+    result = {"content": text, "original_words": total_words, "kept_words": total_words, "reduced": False}
+    if not sentences:
+        return result
+
+    word_fraction = max_words / max(total_words, 1)
+    tokens = np.zeros_like(words)
+    token_fraction = math.inf
+    if count_tokens and max_tokens:
+        tokens = np.array(count_tokens(sentences), dtype=np.int64)
+        # Source headers are kept too; +1 per section for rounding where a header joins a sentence
+        header_tokens = sum(count_tokens([section["header"] for section in sections])) + len(sections)
+        token_fraction = (max_tokens - header_tokens) / max(int(tokens.sum()), 1)
+    if word_fraction >= 1 and token_fraction >= 1:
+        return result
+
+    scores = score_sentences(sentences)
+    kept_parts = []
+    start = 0
+    for section in sections:
+        end = start + len(section["sentences"])
+        word_budget = word_fraction * words[start:end].sum()
+        token_budget = token_fraction * tokens[start:end].sum() if token_fraction < math.inf else math.inf
+        used_words = used_tokens = 0
+        selected = []
+        for index in start + np.argsort(-scores[start:end], kind="stable"):
+            if used_words + words[index] <= word_budget and used_tokens + tokens[index] <= token_budget:
+                selected.append(index)
+                used_words += words[index]
+                used_tokens += tokens[index]
+        if selected:
+            kept_parts.append(section["header"] + " ".join(sentences[i] for i in sorted(selected)))
+        start = end
+
+    content = "".join(kept_parts)
+    return {**result, "content": content, "kept_words": len(content.split()), "reduced": True}
+
+def reduce_for_duration(text: str, duration: int, single_call_tokens: int = None, count_tokens: Callable[[List[str]], List[int]] = None) -> Dict:
+    """
+    Reduces content to what a `duration`-minute episode can use. When the model's
+    single-call budget still leaves enough material, content is also trimmed to fit it,
+    so the script can be written in one request instead of the chunked pipeline.
+    """
+    max_words = duration * SOURCE_WORDS_PER_MINUTE
+    max_tokens = None
+    if single_call_tokens and count_tokens:
+        # Tokens per word of this text, to compare the call budget against the minimum material
+        sample = text[:20000]
+        tokens_per_word = count_tokens([sample])[0] / max(len(sample.split()), 1)
+        if single_call_tokens >= duration * MIN_SOURCE_WORDS_PER_MINUTE * tokens_per_word:
+            max_tokens = single_call_tokens
+    return reduce_content(text, max_words, max_tokens, count_tokens)
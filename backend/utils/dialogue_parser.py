@@ -0,0 +1,128 @@
+import re
+import json
+from typing import Dict, List
+
+# Only these characters change the parser state; everything else is skipped in C
+_SPECIAL_CHARS = re.compile(r'[{}"\\]')
+
+class DialogueStreamParser:
+    """
+    Incremental parser for LLM dialogue output.
+
+    Feed it text as it arrives; it returns every {"speaker", "text"} object as soon as
+    its closing brace is seen, at any nesting depth (so `{"dialogue": [...]}` wrappers work).
+    Each character is scanned once, braces inside JSON strings are ignored, and text before
+    the current top-level object is dropped, so parsing stays linear in the response size.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0            # next unscanned index in _buffer
+        self._starts = []        # indices of the currently open '{'
+        self._has_turn = []      # per open object: whether a nested turn was already emitted
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Dict]:
+        """Consumes a piece of output and returns the dialogue turns completed by it."""
+        buffer = self._buffer + text
+        i = self._pos
+        turns = []
+
+        if self._escaped and i < len(buffer):
+            # The previous piece ended on a backslash inside a string
+            self._escaped = False
+            i += 1
+
+        while True:
+            match = _SPECIAL_CHARS.search(buffer, i)
+            if match is None:
+                i = len(buffer)
+                break
+            i = match.start()
+            char = buffer[i]
+
+            if char == "\\":
+                if self._in_string:
+                    if i + 1 >= len(buffer):
+                        self._escaped = True
+                        i += 1
+                        break
+                    i += 1  # skip the escaped character
+            elif char == '"':
+                # Quotes in prose outside an object are not JSON strings
+                if self._in_string or self._starts:
+                    self._in_string = not self._in_string
+            elif self._in_string:
+                pass
+            elif char == "{":
+                self._starts.append(i)
+                self._has_turn.append(False)
+            elif self._starts:
+                start = self._starts.pop()
+                contains_turn = self._has_turn.pop()
+                # A wrapper around already-emitted turns is never a turn itself
+                turn = None if contains_turn else self._parse_turn(buffer[start:i + 1])
+                if turn:
+                    turns.append(turn)
+                if (turn or contains_turn) and self._has_turn:
+                    self._has_turn[-1] = True
+                if not self._starts:
+                    # Nothing pending: drop everything up to the end of this object
+                    buffer = buffer[i + 1:]
+                    i = -1
+            i += 1
+
+        if not self._starts:
+            # Prose between objects can be discarded
+            buffer = ""
+            i = 0
+        self._buffer = buffer
+        self._pos = i
+        return turns
+
+    def finish(self) -> List[Dict]:
+        """
+        Signals the end of output. A truncated final turn is repaired by closing its
+        open string and braces; it is returned only if it still holds a speaker and text.
+        """
+        turns = []
+        if self._starts and not self._has_turn[-1]:
+            fragment = self._buffer[self._starts[-1]:]
+            if self._escaped:
+                fragment = fragment[:-1]
+            if self._in_string:
+                fragment += '"'
+            turn = self._parse_turn(fragment.rstrip().rstrip(",") + "}")
+            if turn:
+                turns.append(turn)
+
+        self.__init__()
+        return turns
+
+    @staticmethod
+    def _parse_turn(candidate: str):
+        try:
+            obj = json.loads(candidate)
+        except ValueError:
+            return None
+        if isinstance(obj, dict) and "speaker" in obj and "text" in obj:
+            return obj
+        return None
+
+def parse_dialogue(response: str) -> List[Dict]:
+    """Parses a complete response into dialogue turns in linear time."""
+    # Fast path: a well-formed array of turns decodes in C
+    start = response.find("[")
+    if start != -1:
+        try:
+            parsed, _ = json.JSONDecoder().raw_decode(response, start)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, list) and parsed and all(
+            isinstance(obj, dict) and "speaker" in obj and "text" in obj for obj in parsed
+        ):
+            return parsed
+
+    parser = DialogueStreamParser()
+    return parser.feed(response) + parser.finish()
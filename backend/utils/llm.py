@@ -1,13 +1,18 @@
 import os
-import gc
 import subprocess
+import threading
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, AutoModel, pipeline
+from transformers import AutoTokenizer, AutoModelForCausalLM, AutoModel, pipeline, TextIteratorStreamer
 from huggingface_hub import login
+from typing import Iterator
 from dotenv import load_dotenv
 from groq import Groq
 from google import genai
 from openai import OpenAI
+from .llm_clients import get_client, call_with_retries
+from .llm_cache import get_llm_cache, make_cache_key
+from .local_batching import prepare_for_batching, generate_batch
+from .model_residency import get_model_residency
 
 load_dotenv()
 
@@ -28,67 +33,96 @@ MODEL_LOCAL_3B = "meta-llama/Llama-3.2-3B-Instruct"
 MODEL_LOCAL_1B = "meta-llama/Llama-3.2-1B-Instruct"
 MODEL_LOCAL_QWEN_1_5B = "MaziyarPanahi/Qwen2-1.5B-Instruct-GGUF"
 
-# Global cache
+# Per-call sampling settings; also part of the response cache key
+SAMPLING_PARAMS = {
+    PROVIDER_OPENAI: {"temperature": 0.7},
+    PROVIDER_GEMINI: {},
+    PROVIDER_LOCAL: {"max_new_tokens": 4096},
+    PROVIDER_GROQ: {"temperature": 1, "max_completion_tokens": 1024, "top_p": 1},
+}
+
+# The selected local model; its pipeline lives in the residency manager and may be evicted
 _LOCAL_PIPELINE = None
 _LOADED_MODEL_ID = None
 
+def _build_local_pipeline(model_id):
+    # Authenticate with Hugging Face if token is present
+    hf_token = os.getenv("HF_TOKEN")
+    if hf_token:
+        login(token=hf_token)
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    
+    if "GGUF" in model_id:
+        # Load model directly as requested for GGUF
+        model = AutoModel.from_pretrained(model_id, dtype="auto")
+    else:
+        # dynamic device map and quantization for standard models
+        model = AutoModelForCausalLM.from_pretrained(
+            model_id,
+            torch_dtype=torch.bfloat16 if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else torch.float16,
+            device_map="auto",
+        )
+    
+    pipe = pipeline(
+        "text-generation",
+        model=model,
+        tokenizer=tokenizer,
+        max_new_tokens=2048,
+        temperature=0.7,
+        top_p=0.9,
+        repetition_penalty=1.1,
+        do_sample=True,
+    )
+    
+    # Left padding and a pad token, so chunk prompts can be generated as one batch
+    return prepare_for_batching(pipe)
+
+def _forget_local_pipeline(model_id):
+    global _LOCAL_PIPELINE
+    if _LOADED_MODEL_ID == model_id:
+        _LOCAL_PIPELINE = None
+
 def get_local_model_pipeline(model_id):
-    """Loads a local model pipeline efficiently."""
+    """
+    Returns the pipeline for `model_id` and makes it the selected local model.
+    Pipelines stay resident while they fit the memory budget, so switching back is free.
+    """
     global _LOCAL_PIPELINE, _LOADED_MODEL_ID
-    
-    if _LOCAL_PIPELINE is not None and _LOADED_MODEL_ID == model_id:
-        return _LOCAL_PIPELINE
 
     try:
-        # Authenticate with Hugging Face if token is present
-        hf_token = os.getenv("HF_TOKEN")
-        if hf_token:
-            login(token=hf_token)
-        
-        tokenizer = AutoTokenizer.from_pretrained(model_id)
-        
-        if "GGUF" in model_id:
-            # Load model directly as requested for GGUF
-            model = AutoModel.from_pretrained(model_id, dtype="auto")
-        else:
-            # dynamic device map and quantization for standard models
-            model = AutoModelForCausalLM.from_pretrained(
-                model_id,
-                torch_dtype=torch.bfloat16 if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else torch.float16,
-                device_map="auto",
-            )
-        
-        pipe = pipeline(
-            "text-generation",
-            model=model,
-            tokenizer=tokenizer,
-            max_new_tokens=2048,
-            temperature=0.7,
-            top_p=0.9,
-            repetition_penalty=1.1,
-            do_sample=True,
+        pipe = get_model_residency().acquire(
+            f"llm:{model_id}",
+            lambda: _build_local_pipeline(model_id),
+            unloader=lambda _: _forget_local_pipeline(model_id),
         )
-        
-        _LOCAL_PIPELINE = pipe
-        _LOADED_MODEL_ID = model_id
-        return pipe
     except Exception as e:
         print(f"Error loading local model {model_id}: {e}")
         return None
 
+    _LOCAL_PIPELINE = pipe
+    _LOADED_MODEL_ID = model_id
+    return pipe
+
+def _active_local_pipeline():
+    """The selected local pipeline, reloaded if it was evicted to make room for other models."""
+    if _LOADED_MODEL_ID is None:
+        return _LOCAL_PIPELINE
+    return get_local_model_pipeline(_LOADED_MODEL_ID)
+
+def get_loaded_local_pipeline():
+    """Returns the currently loaded local pipeline without loading one."""
+    return _LOCAL_PIPELINE
+
 def unload_local_model():
-    """Unloads the local model from memory and clears CUDA cache."""
+    """Unloads every local LLM from memory and clears CUDA cache."""
     global _LOCAL_PIPELINE, _LOADED_MODEL_ID
     
     _LOCAL_PIPELINE = None
     _LOADED_MODEL_ID = None
     
-    # Force garbage collection
-    gc.collect()
-    
-    # Clear CUDA cache if applicable
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
+    # Evicting also runs garbage collection and clears the CUDA cache
+    get_model_residency().evict(lambda key: key.startswith("llm:"))
     
     print("Local LLM unloaded to free up memory for TTS.")
     
@@ -102,7 +136,70 @@ def unload_local_model():
     except Exception as e:
         return f"Failed to run nvidia-smi: {e}"
 
-def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str = None, local_pipeline = None) -> str:
+def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str = None, local_pipeline = None, use_cache: bool = None) -> str:
+    """
+    Unified interface for querying LLMs, fronted by the optional response cache.
+    The cache is used when LLM_CACHE_ENABLED is set or `use_cache=True`; `use_cache=False` bypasses it.
+    """
+    cache = get_llm_cache(force=bool(use_cache)) if use_cache is not False else None
+    if cache is None:
+        return _query_provider(messages, provider, model_name, api_key, local_pipeline)
+
+    cache_model = _cache_model_name(provider, model_name, local_pipeline)
+    cache_key = make_cache_key(provider, cache_model, messages, SAMPLING_PARAMS.get(provider))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    response = _query_provider(messages, provider, model_name, api_key, local_pipeline)
+    if response:
+        cache.put(cache_key, response)
+    return response
+
+def _cache_model_name(provider: str, model_name: str, local_pipeline = None) -> str:
+    if provider != PROVIDER_LOCAL:
+        return model_name
+    pipe = local_pipeline or _LOCAL_PIPELINE
+    return getattr(getattr(pipe, "model", None), "name_or_path", None) or _LOADED_MODEL_ID or model_name
+
+def query_llm_batch(messages_list: list[list[dict]], provider: str, model_name: str, api_key: str = None, local_pipeline = None, batch_size: int = None, use_cache: bool = None) -> list[str]:
+    """
+    Answers several independent prompts, returning replies in input order.
+    The local model generates them as padded batches of `batch_size` (LOCAL_LLM_BATCH_SIZE by default);
+    other providers are queried one prompt at a time. Cached prompts are not regenerated.
+    """
+    cache = get_llm_cache(force=bool(use_cache)) if use_cache is not False else None
+    cache_model = _cache_model_name(provider, model_name, local_pipeline)
+    keys = [make_cache_key(provider, cache_model, messages, SAMPLING_PARAMS.get(provider)) for messages in messages_list]
+
+    responses = [cache.get(key) for key in keys] if cache else [None] * len(messages_list)
+    pending = [i for i, response in enumerate(responses) if response is None]
+    if not pending:
+        return responses
+
+    if provider == PROVIDER_LOCAL:
+        local_pipeline = local_pipeline or _active_local_pipeline()
+        if not local_pipeline:
+            raise ValueError("Local model pipeline not initialized.")
+        try:
+            generated = generate_batch(
+                local_pipeline,
+                [messages_list[i] for i in pending],
+                batch_size=batch_size,
+                **SAMPLING_PARAMS[PROVIDER_LOCAL],
+            )
+        except Exception as e:
+            raise Exception(f"Local Model Error: {str(e)}")
+    else:
+        generated = [_query_provider(messages_list[i], provider, model_name, api_key, local_pipeline) for i in pending]
+
+    for i, response in zip(pending, generated):
+        responses[i] = response
+        if cache and response:
+            cache.put(keys[i], response)
+    return responses
+
+def _query_provider(messages: list[dict], provider: str, model_name: str, api_key: str = None, local_pipeline = None) -> str:
 # ... rest of the file ...
 
     """Unified interface for querying LLMs."""
@@ -111,13 +208,14 @@ def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str
         if not api_key:
             raise ValueError("OpenAI API Key is required.")
         
-        client = OpenAI(api_key=api_key)
+        # Retries are handled by call_with_retries, so the SDK's own are disabled
+        client = get_client(PROVIDER_OPENAI, api_key, lambda key: OpenAI(api_key=key, max_retries=0))
         try:
-            response = client.chat.completions.create(
+            response = call_with_retries(lambda: client.chat.completions.create(
                 model=model_name,
                 messages=messages,
-                temperature=0.7
-            )
+                **SAMPLING_PARAMS[PROVIDER_OPENAI]
+            ))
             return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"OpenAI API Error: {str(e)}")
@@ -127,7 +225,7 @@ def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str
             raise ValueError("Gemini API Key is required.")
         
         try:
-            client = genai.Client(api_key=api_key)
+            client = get_client(PROVIDER_GEMINI, api_key, lambda key: genai.Client(api_key=key))
             
             # Convert messages to Gemini format (simplified)
             # Assuming last message is user prompt, previous are history/system
@@ -162,10 +260,10 @@ def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str
             if system_instruction:
                 final_content = f"System Instruction: {system_instruction}\n\nUser Question: {user_message}"
 
-            response = client.models.generate_content(
+            response = call_with_retries(lambda: client.models.generate_content(
                 model=model_name,
                 contents=final_content
-            )
+            ))
             return response.text
         except Exception as e:
              raise Exception(f"Gemini API Error: {str(e)}")
@@ -173,15 +271,14 @@ def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str
     elif provider == PROVIDER_LOCAL:
         if not local_pipeline:
              # Fallback to global pipeline
-             if _LOCAL_PIPELINE:
-                 local_pipeline = _LOCAL_PIPELINE
-             else:
+             local_pipeline = _active_local_pipeline()
+             if not local_pipeline:
                  raise ValueError("Local model pipeline not initialized.")
         
         try:
             outputs = local_pipeline(
                 messages,
-                max_new_tokens=4096,
+                **SAMPLING_PARAMS[PROVIDER_LOCAL],
             )
             return outputs[0]["generated_text"][-1]["content"]
         except Exception as e:
@@ -191,20 +288,113 @@ def query_llm(messages: list[dict], provider: str, model_name: str, api_key: str
         if not api_key:
             raise ValueError("Groq API Key is required.")
         
-        client = Groq(api_key=api_key)
+        client = get_client(PROVIDER_GROQ, api_key, lambda key: Groq(api_key=key, max_retries=0))
         try:
-            response = client.chat.completions.create(
+            response = call_with_retries(lambda: client.chat.completions.create(
                 model=model_name,
                 messages=messages,
-                temperature=1,
-                max_completion_tokens=1024,
-                top_p=1,
+                **SAMPLING_PARAMS[PROVIDER_GROQ],
                 stream=False,
                 stop=None
-            )
+            ))
             return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"Groq API Error: {str(e)}")
     
     else:
         raise ValueError(f"Unknown provider: {provider}")
+
+def stream_llm(messages: list[dict], provider: str, model_name: str, api_key: str = None, local_pipeline = None) -> Iterator[str]:
+    """
+    Streams the completion as text deltas instead of waiting for the whole response.
+    Only opening the stream is retried; a failure mid-stream is raised to the caller.
+    """
+    if provider == PROVIDER_OPENAI:
+        if not api_key:
+            raise ValueError("OpenAI API Key is required.")
+
+        client = get_client(PROVIDER_OPENAI, api_key, lambda key: OpenAI(api_key=key, max_retries=0))
+        try:
+            stream = call_with_retries(lambda: client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                stream=True,
+                **SAMPLING_PARAMS[PROVIDER_OPENAI]
+            ))
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"OpenAI API Error: {str(e)}")
+
+    elif provider == PROVIDER_GEMINI:
+        if not api_key:
+            raise ValueError("Gemini API Key is required.")
+
+        try:
+            client = get_client(PROVIDER_GEMINI, api_key, lambda key: genai.Client(api_key=key))
+
+            # Same prompt flattening as _query_provider
+            user_message = messages[-1]['content']
+            system_instruction = next((m['content'] for m in messages if m['role'] == 'system'), None)
+            final_content = user_message
+            if system_instruction:
+                final_content = f"System Instruction: {system_instruction}\n\nUser Question: {user_message}"
+
+            stream = call_with_retries(lambda: client.models.generate_content_stream(
+                model=model_name,
+                contents=final_content
+            ))
+            for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            raise Exception(f"Gemini API Error: {str(e)}")
+
+    elif provider == PROVIDER_LOCAL:
+        local_pipeline = local_pipeline or _active_local_pipeline()
+        if not local_pipeline:
+            raise ValueError("Local model pipeline not initialized.")
+
+        # The pipeline blocks until generation ends, so it runs on a thread and
+        # hands decoded text back through the streamer as tokens are produced
+        streamer = TextIteratorStreamer(local_pipeline.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+
+        def generate():
+            try:
+                local_pipeline(messages, streamer=streamer, **SAMPLING_PARAMS[PROVIDER_LOCAL])
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        for text in streamer:
+            if text:
+                yield text
+        thread.join()
+        if errors:
+            raise Exception(f"Local Model Error: {str(errors[0])}")
+
+    elif provider == PROVIDER_GROQ:
+        if not api_key:
+            raise ValueError("Groq API Key is required.")
+
+        client = get_client(PROVIDER_GROQ, api_key, lambda key: Groq(api_key=key, max_retries=0))
+        try:
+            stream = call_with_retries(lambda: client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                **SAMPLING_PARAMS[PROVIDER_GROQ],
+                stream=True,
+                stop=None
+            ))
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"Groq API Error: {str(e)}")
+
+    else:
+        raise ValueError(f"Unknown provider: {provider}")
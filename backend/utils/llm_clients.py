@@ -0,0 +1,131 @@
+import os
+import time
+import random
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+
+# Provider clients idle for longer than this are closed and dropped
+CLIENT_IDLE_SECONDS = float(os.getenv("LLM_CLIENT_IDLE_SECONDS", "300"))
+
+# Shared retry policy for every provider call
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# (provider, api key hash) -> [client, last used timestamp]
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _key_hash(api_key: str) -> str:
+    # Never keep raw keys around as dict keys
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+def _close_client(client):
+    close = getattr(client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            print(f"Error closing LLM client: {e}")
+
+def get_client(provider: str, api_key: str, factory):
+    """
+    Returns a pooled client for (provider, api_key), creating it with `factory(api_key)` on first use.
+    Reusing the client keeps its HTTP connection pool (and TLS sessions) alive across calls.
+    """
+    evict_idle_clients()
+    cache_key = (provider, _key_hash(api_key))
+
+    with _CLIENTS_LOCK:
+        entry = _CLIENTS.get(cache_key)
+        if entry is None:
+            entry = [factory(api_key), time.monotonic()]
+            _CLIENTS[cache_key] = entry
+        else:
+            entry[1] = time.monotonic()
+        return entry[0]
+
+def evict_idle_clients(max_idle: float = None):
+    """Closes clients that have not been used for `max_idle` seconds."""
+    max_idle = CLIENT_IDLE_SECONDS if max_idle is None else max_idle
+    now = time.monotonic()
+    with _CLIENTS_LOCK:
+        idle = [key for key, (_, last_used) in _CLIENTS.items() if now - last_used > max_idle]
+        clients = [_CLIENTS.pop(key)[0] for key in idle]
+    for client in clients:
+        _close_client(client)
+
+def close_all_clients():
+    with _CLIENTS_LOCK:
+        clients = [client for client, _ in _CLIENTS.values()]
+        _CLIENTS.clear()
+    for client in clients:
+        _close_client(client)
+
+def _status_code(exc: Exception):
+    """Best-effort HTTP status of an SDK or urllib error."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+def _headers(exc: Exception):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        headers = getattr(exc, "headers", None)
+    return headers or {}
+
+def retry_after_seconds(exc: Exception):
+    """Parses Retry-After (seconds or HTTP date) or retry-after-ms from an error's response, if any."""
+    headers = _headers(exc)
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def is_retryable(exc: Exception) -> bool:
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    # Connection resets and timeouts surface as different classes per SDK
+    name = type(exc).__name__
+    return isinstance(exc, (ConnectionError, TimeoutError)) or "Timeout" in name or "Connection" in name
+
+def call_with_retries(fn, max_retries: int = None, base_delay: float = None, max_delay: float = None, sleep=time.sleep):
+    """
+    Calls `fn()` and retries transient failures (429, 5xx, timeouts, dropped connections)
+    with full-jitter exponential backoff. A server-provided Retry-After takes precedence.
+    """
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    base_delay = LLM_BACKOFF_BASE if base_delay is None else base_delay
+    max_delay = LLM_BACKOFF_MAX if max_delay is None else max_delay
+
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            delay = min(delay, max_delay)
+            print(f"Transient LLM error ({e.__class__.__name__}), retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+            sleep(delay)
@@ -0,0 +1,43 @@
+import os
+from typing import Dict, List
+
+# Conversations generated together per forward pass; larger batches trade memory for tokens/second
+LOCAL_LLM_BATCH_SIZE = int(os.getenv("LOCAL_LLM_BATCH_SIZE", "4"))
+
+def prepare_for_batching(pipe):
+    """
+    Configures a text-generation pipeline so prompts of different lengths can share a batch:
+    padding goes on the left (decoder-only models continue from the last position) and a
+    pad token is defined, falling back to EOS for models that ship without one.
+    """
+    tokenizer = pipe.tokenizer
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    generation_config = getattr(pipe.model, "generation_config", None)
+    if generation_config is not None and generation_config.pad_token_id is None:
+        generation_config.pad_token_id = tokenizer.pad_token_id
+    return pipe
+
+def generate_batch(pipe, conversations: List[List[Dict]], batch_size: int = None, **generate_kwargs) -> List[str]:
+    """
+    Runs every conversation through the pipeline in padded batches of `batch_size`.
+    Returns the assistant replies in input order.
+    """
+    if not conversations:
+        return []
+    batch_size = batch_size or LOCAL_LLM_BATCH_SIZE
+    prepare_for_batching(pipe)
+
+    # Batch prompts of similar length together so little compute is spent on padding
+    order = sorted(range(len(conversations)), key=lambda i: sum(len(m["content"]) for m in conversations[i]))
+    outputs = pipe([conversations[i] for i in order], batch_size=batch_size, **generate_kwargs)
+
+    replies = [None] * len(conversations)
+    for i, output in zip(order, outputs):
+        # One entry per returned sequence; only one is requested
+        if isinstance(output, list):
+            output = output[0]
+        replies[i] = output["generated_text"][-1]["content"]
+    return replies
@@ -0,0 +1,199 @@
+import os
+import gc
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+def _default_budgets() -> Dict[str, int]:
+    """Per-device byte budgets: MODEL_BUDGET_GPU_MB / MODEL_BUDGET_CPU_MB, else 90% of VRAM and 50% of RAM."""
+    budgets = {}
+
+    gpu_mb = os.getenv("MODEL_BUDGET_GPU_MB")
+    if gpu_mb:
+        budgets["cuda"] = int(float(gpu_mb) * 1024 * 1024)
+    elif torch is not None and torch.cuda.is_available():
+        budgets["cuda"] = int(torch.cuda.get_device_properties(0).total_memory * 0.9)
+
+    cpu_mb = os.getenv("MODEL_BUDGET_CPU_MB")
+    if cpu_mb:
+        budgets["cpu"] = int(float(cpu_mb) * 1024 * 1024)
+    else:
+        try:
+            budgets["cpu"] = int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") * 0.5)
+        except (ValueError, OSError, AttributeError):
+            pass
+    return budgets
+
+def measure_footprint(obj) -> Dict[str, int]:
+    """Bytes of parameters and buffers per device type for a module or a pipeline wrapping one in `.model`."""
+    if torch is None:
+        return {}
+    module = obj if isinstance(obj, torch.nn.Module) else getattr(obj, "model", None)
+    if not isinstance(module, torch.nn.Module):
+        return {}
+
+    sizes = {}
+    for tensor in list(module.parameters()) + list(module.buffers()):
+        device = tensor.device.type
+        sizes[device] = sizes.get(device, 0) + tensor.numel() * tensor.element_size()
+    return sizes
+
+def _free_device_memory():
+    gc.collect()
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+class ModelResidency:
+    """
+    Keeps loaded models resident within per-device memory budgets, evicting the least
+    recently used ones when a new model does not fit. Models that fit together stay loaded.
+    """
+
+    def __init__(self, budgets: Dict[str, int] = None, measure: Callable = measure_footprint, free_memory: Callable = _free_device_memory):
+        self.budgets = _default_budgets() if budgets is None else dict(budgets)
+        self._measure = measure
+        self._free_memory = free_memory
+        self._entries = OrderedDict()   # key -> {"model", "footprint", "unloader", "loaded_at"}
+        self._known_footprints = {}     # survives eviction, used to make room before a reload
+        self._lock = threading.Lock()
+        # Loads are serialized: they are rare, slow and the main source of memory spikes
+        self._load_lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def acquire(self, key: str, loader: Callable, unloader: Callable = None, estimate: Dict[str, int] = None):
+        """
+        Returns the resident model for `key`, loading it with `loader()` if needed.
+        `unloader(model)` runs when the model is evicted. `estimate` is used to make
+        room before the first load; later loads use the measured footprint.
+        """
+        model = self._touch(key)
+        if model is not None:
+            return model
+
+        with self._load_lock:
+            model = self._touch(key)
+            if model is not None:
+                return model
+
+            self.make_room(self._known_footprints.get(key) or estimate or {})
+            start = time.perf_counter()
+            model = loader()
+            if model is None:
+                raise RuntimeError(f"Loader for {key} returned no model")
+            footprint = self._measure(model) or dict(estimate or {})
+
+            with self._lock:
+                self._entries[key] = {"model": model, "footprint": footprint, "unloader": unloader, "loaded_at": time.time()}
+                self._known_footprints[key] = footprint
+                self.loads += 1
+            print(f"Loaded {key} in {time.perf_counter() - start:.1f}s ({self._format(footprint)})")
+
+            # The measured footprint can exceed the estimate; trim others if the budget is now exceeded
+            self.make_room({}, keep=key)
+            return model
+
+    def _touch(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry["model"]
+
+    def _usage(self) -> Dict[str, int]:
+        usage = {}
+        for entry in self._entries.values():
+            for device, size in entry["footprint"].items():
+                usage[device] = usage.get(device, 0) + size
+        return usage
+
+    def make_room(self, needed: Dict[str, int], keep: str = None) -> int:
+        """Evicts least recently used models until `needed` bytes fit on every budgeted device."""
+        evicted = []
+        with self._lock:
+            while True:
+                usage = self._usage()
+                over = [
+                    device for device, budget in self.budgets.items()
+                    if usage.get(device, 0) + needed.get(device, 0) > budget
+                ]
+                if not over:
+                    break
+                victim = next(
+                    (key for key, entry in self._entries.items()
+                     if key != keep and any(entry["footprint"].get(device) for device in over)),
+                    None,
+                )
+                if victim is None:
+                    print(f"Model budget exceeded on {over} with nothing left to evict")
+                    break
+                evicted.append((victim, self._entries.pop(victim)))
+                self.evictions += 1
+
+        count = len(evicted)
+        self._release(evicted)
+        return count
+
+    def evict(self, predicate: Callable[[str], bool]) -> int:
+        """Evicts every resident model whose key matches `predicate`."""
+        with self._lock:
+            evicted = [(key, self._entries.pop(key)) for key in list(self._entries) if predicate(key)]
+            self.evictions += len(evicted)
+        count = len(evicted)
+        self._release(evicted)
+        return count
+
+    def _release(self, evicted):
+        if not evicted:
+            return
+        for key, entry in evicted:
+            print(f"Evicting {key} ({self._format(entry['footprint'])})")
+            if entry["unloader"] is not None:
+                try:
+                    entry["unloader"](entry["model"])
+                except Exception as e:
+                    print(f"Error unloading {key}: {e}")
+        # Drop the last references before collecting, or the weights stay alive
+        entry = None
+        evicted.clear()
+        self._free_memory()
+
+    def known_footprint(self, key: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._known_footprints.get(key, {}))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budgets_mb": {device: round(size / 2**20) for device, size in self.budgets.items()},
+                "usage_mb": {device: round(size / 2**20) for device, size in self._usage().items()},
+                "resident": [
+                    {"key": key, "footprint_mb": {d: round(s / 2**20) for d, s in entry["footprint"].items()}}
+                    for key, entry in self._entries.items()
+                ],
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    @staticmethod
+    def _format(footprint: Dict[str, int]) -> str:
+        return ", ".join(f"{device} {size / 2**20:.0f} MB" for device, size in footprint.items()) or "size unknown"
+
+# Global residency manager, created on first use
+_RESIDENCY = None
+_RESIDENCY_LOCK = threading.Lock()
+
+def get_model_residency() -> ModelResidency:
+    global _RESIDENCY
+    if _RESIDENCY is None:
+        with _RESIDENCY_LOCK:
+            if _RESIDENCY is None:
+                _RESIDENCY = ModelResidency()
+    return _RESIDENCY
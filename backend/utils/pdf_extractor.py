@@ -0,0 +1,132 @@
+import os
+import atexit
+import multiprocessing
+import threading
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+from PyPDF2 import PdfReader
+
+# Worker processes for page extraction; PyPDF2 is pure Python, so threads would not help
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+# Documents shorter than this are read in-process; the pool is not worth its overhead
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "1000"))
+# Source words collected per minute of audio before extraction stops early.
+# Three times what content_reducer keeps, so it still has material to choose from.
+PDF_WORDS_PER_MINUTE = int(os.getenv("PDF_WORDS_PER_MINUTE", "2400"))
+
+def word_budget_for_duration(duration: int = None):
+    return duration * PDF_WORDS_PER_MINUTE if duration else None
+
+def _read_range(reader: PdfReader, start: int, end: int) -> List[str]:
+    texts = []
+    for index in range(start, end):
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception as e:
+            print(f"Error extracting PDF page {index + 1}: {e}")
+            texts.append("")
+    return texts
+
+# Reader cache inside each worker process, so each page range does not re-parse the
+# cross-reference table. Workers run one task at a time; the server process never uses it.
+# Keyed on (path, mtime, size): temp upload paths get reused for different documents.
+_WORKER_READERS = {}
+
+def _extract_range(path: str, start: int, end: int) -> Tuple[int, List[str]]:
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    reader = _WORKER_READERS.get(key)
+    if reader is None:
+        _WORKER_READERS.clear()
+        reader = _WORKER_READERS[key] = PdfReader(path)
+    return start, _read_range(reader, start, end)
+
+# Global worker pool, created on first use
+_PDF_POOL = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        with _PDF_POOL_LOCK:
+            if _PDF_POOL is None:
+                # spawn: forking a threaded server can deadlock on locks held by other threads
+                _PDF_POOL = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+                atexit.register(_PDF_POOL.shutdown, wait=False, cancel_futures=True)
+    return _PDF_POOL
+
+def iter_pdf_pages(path: str, max_pages: int = None, workers: int = None, reader: PdfReader = None) -> Iterator[str]:
+    """
+    Yields the text of each page in order. Large documents are split into page ranges
+    extracted by the process pool; only a few ranges run ahead of the consumer, so
+    stopping early (closing the generator) leaves the rest of the document unread.
+    Pass an already open `reader` to avoid parsing the file again in this process.
+    """
+    reader = reader or PdfReader(path)
+    pages = min(len(reader.pages), max_pages or PDF_MAX_PAGES)
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+
+    if workers <= 1 or pages < PDF_PARALLEL_MIN_PAGES:
+        for index in range(pages):
+            yield _read_range(reader, index, index + 1)[0]
+        return
+
+    pool = get_pdf_pool()
+    ranges = [(start, min(start + PDF_PAGES_PER_TASK, pages)) for start in range(0, pages, PDF_PAGES_PER_TASK)]
+    pending = []
+    next_range = 0
+    try:
+        while pending or next_range < len(ranges):
+            # Keep two ranges per worker in flight
+            while next_range < len(ranges) and len(pending) < 2 * workers:
+                pending.append(pool.submit(_extract_range, path, *ranges[next_range]))
+                next_range += 1
+            _, texts = pending.pop(0).result()
+            yield from texts
+    finally:
+        for future in pending:
+            future.cancel()
+
+def extract_pdf_text(file, max_pages: int = None, max_words: int = None, workers: int = None) -> dict:
+    """
+    Extracts a PDF (path or file object) page by page, stopping at `max_pages` or once
+    `max_words` have been collected. Returns {"text", "word_count", "pages_read", "total_pages", "truncated"}.
+    """
+    path = getattr(file, "name", file) if not isinstance(file, (bytes, bytearray)) else None
+    temp_path = None
+    if not (isinstance(path, str) and os.path.isfile(path)):
+        # Worker processes need a file they can open themselves
+        data = file if isinstance(file, (bytes, bytearray)) else file.read()
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp:
+            temp.write(data)
+        path = temp_path = temp.name
+
+    try:
+        # One reader per call: concurrent requests never share parser state
+        reader = PdfReader(path)
+        total_pages = len(reader.pages)
+        texts = []
+        word_count = 0
+        pages = iter_pdf_pages(path, max_pages, workers, reader)
+        try:
+            for text in pages:
+                texts.append(text)
+                word_count += len(text.split())
+                if max_words and word_count >= max_words:
+                    break
+        finally:
+            pages.close()
+
+        return {
+            "text": "\n".join(texts),
+            "word_count": word_count,
+            "pages_read": len(texts),
+            "total_pages": total_pages,
+            "truncated": len(texts) < total_pages,
+        }
+    finally:
+        if temp_path:
+            os.remove(temp_path)
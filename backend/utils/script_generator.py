@@ -1,7 +1,12 @@
-import re
-import json
-from typing import List, Dict, Tuple
-from .llm import query_llm
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Iterator
+from .llm import query_llm, query_llm_batch, stream_llm, get_loaded_local_pipeline, PROVIDER_OPENAI, PROVIDER_GEMINI, PROVIDER_LOCAL, PROVIDER_GROQ
+from .dialogue_parser import DialogueStreamParser, parse_dialogue
+from .chunk_planner import plan_chunks, get_token_counter, single_call_token_budget
+from .content_reducer import REDUCTION_ENABLED, reduce_for_duration
 
 SPEAKERS = [
     {"name": "Alex", "role": "Host", "personality": "curious, enthusiastic, asks clarifying questions, guides the conversation"},
@@ -10,6 +15,43 @@ SPEAKERS = [
     {"name": "Devin", "role": "Futurist", "personality": "energetic, visionary, relates topics to future possibilities and trends"}
 ]
 
+# Maximum in-flight chunk jobs per provider, shared by all requests in this process.
+# The local pipeline holds a single model, so it stays serial.
+PROVIDER_CONCURRENCY = {
+    PROVIDER_OPENAI: 8,
+    PROVIDER_GEMINI: 4,
+    PROVIDER_GROQ: 4,
+    PROVIDER_LOCAL: 1,
+}
+
+_PROVIDER_SEMAPHORES = {}
+_SEMAPHORES_LOCK = threading.Lock()
+
+@contextmanager
+def provider_slot(provider: str):
+    """Holds one of the provider's concurrency slots for the duration of the block."""
+    with _SEMAPHORES_LOCK:
+        semaphore = _PROVIDER_SEMAPHORES.get(provider)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(PROVIDER_CONCURRENCY.get(provider, 2))
+            _PROVIDER_SEMAPHORES[provider] = semaphore
+    with semaphore:
+        yield
+
+def map_with_provider_limit(fn, items: list, provider: str) -> list:
+    """Apply `fn` to every item in parallel, each call holding a provider slot. Results keep item order."""
+    if not items:
+        return []
+
+    def run(item):
+        with provider_slot(provider):
+            return fn(item)
+
+    max_workers = max(1, min(len(items), PROVIDER_CONCURRENCY.get(provider, 2)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm") as executor:
+        # map() yields results in submission order regardless of completion order
+        return list(executor.map(run, items))
+
 def get_speaker_config(num_speakers: int, custom_names: List[str] = None) -> List[Dict]:
     """Get the configuration for the requested number of speakers."""
     base_config = SPEAKERS[:max(2, min(num_speakers, 4))]
@@ -39,105 +81,21 @@ def count_words(text: str) -> int:
     return len(text.split())
 
 
-def chunk_text(text: str, max_words: int = 500) -> List[str]:
-    """
-    Split text into chunks of approximately max_words each.
-    Respects sentence boundaries to avoid mid-sentence cuts.
-    """
-    # Split into sentences (simple approach)
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    chunks = []
-    current_chunk = []
-    current_word_count = 0
-    
-    for sentence in sentences:
-        sentence_words = count_words(sentence)
-        
-        if current_word_count + sentence_words > max_words and current_chunk:
-            # Save current chunk and start new one
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [sentence]
-            current_word_count = sentence_words
-        else:
-            current_chunk.append(sentence)
-            current_word_count += sentence_words
-    
-    # Add the last chunk
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
-    print(f"Total chunks created: {len(chunks)}")
-    return chunks
-
-
 def extract_json_from_response(response: str) -> List[Dict]:
     """
-    Extract JSON content from LLM response.
-    Handles both array format and multiple object format.
+    Extract dialogue turns from LLM response in a single linear pass.
+    Handles array format, multiple object format, wrapper objects and truncated output.
     """
-    try:
-        # First try to find array format []
-        start_idx = response.find('[')
-        end_idx = response.rfind(']')
-        
-        if start_idx != -1:
-            json_str = response[start_idx:]
-            try:
-                parsed, _ = json.JSONDecoder().raw_decode(json_str)
-                return parsed
-            except:
-                # If raw_decode fails, fall back to other methods or try finding the last ]
-                pass
-                
-        if start_idx != -1 and end_idx != -1:
-            json_str = response[start_idx:end_idx + 1]
-            try:
-                return json.loads(json_str)
-            except:
-                pass
-        
-        # If no array, try to extract multiple JSON objects
-        # Look for pattern: {...}\n{...}
-        objects = []
-        lines = response.strip().split('\n')
-        current_obj = ""
-        brace_count = 0
-        
-        for line in lines:
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                current_obj += char
-                
-                if brace_count == 0 and current_obj.strip():
-                    try:
-                        obj = json.loads(current_obj.strip())
-                        if isinstance(obj, dict) and 'speaker' in obj and 'text' in obj:
-                            objects.append(obj)
-                        current_obj = ""
-                    except:
-                        current_obj = ""
-        
-        if objects:
-            return objects
-        
-        raise ValueError("No valid JSON found in response")
-        
-    except Exception as e:
-        print(f"Error extracting JSON: {e}")
-        print(f"Response was: {response[:500]}...")
-        return []
+    dialogue = parse_dialogue(response or "")
+    if not dialogue:
+        print("Error extracting JSON: No valid JSON found in response")
+        print(f"Response was: {(response or '')[:500]}...")
+    return dialogue
 
 
-def extract_topic_from_chunk(chunk: str, llm_config: dict) -> str:
-    """
-    Extract a concise topic/theme from a chunk of text using LLM.
-    Returns a short topic string (5-10 words).
-    """
-    messages = [
+def build_topic_messages(chunk: str) -> List[Dict]:
+    """Builds the prompt asking for a chunk's main topic."""
+    return [
         {
             "role": "system",
             "content": "You are a helpful assistant that extracts main topics from text."
@@ -152,6 +110,13 @@ def extract_topic_from_chunk(chunk: str, llm_config: dict) -> str:
         Respond with ONLY the topic, nothing else."""
         }
     ]
+
+def extract_topic_from_chunk(chunk: str, llm_config: dict) -> str:
+    """
+    Extract a concise topic/theme from a chunk of text using LLM.
+    Returns a short topic string (5-10 words).
+    """
+    messages = build_topic_messages(chunk)
     
     try:
         topic = query_llm(
@@ -159,7 +124,8 @@ def extract_topic_from_chunk(chunk: str, llm_config: dict) -> str:
             provider=llm_config["provider"],
             model_name=llm_config.get("model_name", ""),
             api_key=llm_config.get("api_key"),
-            local_pipeline=llm_config.get("local_pipeline")
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
         )
         return topic.strip()
     except Exception as e:
@@ -167,14 +133,11 @@ def extract_topic_from_chunk(chunk: str, llm_config: dict) -> str:
         return "General Discussion"
 
 
-def generate_chunk_dialogue(chunk: str, topic: str, llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Dict]:
-    """
-    Generate 250-300 word dialogue for a single chunk.
-    NO intro, NO outro - just the main content discussion.
-    """
+def build_chunk_dialogue_messages(chunk: str, topic: str, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Dict]:
+    """Builds the prompt for a chunk's main-content dialogue (no intro/outro)."""
     speakers_desc, json_format = get_speaker_formatting(speakers)
 
-    messages = [
+    return [
         {
             "role": "system",
             "content": f"""You are a podcast script writer. Create engaging dialogue between these hosts:
@@ -206,6 +169,13 @@ def generate_chunk_dialogue(chunk: str, topic: str, llm_config: dict, speakers:
             Remember: NO intro, NO outro. Start directly with the topic discussion. Ensure all speakers participate naturally."""
         }
     ]
+
+def generate_chunk_dialogue(chunk: str, topic: str, llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Dict]:
+    """
+    Generate 250-300 word dialogue for a single chunk.
+    NO intro, NO outro - just the main content discussion.
+    """
+    messages = build_chunk_dialogue_messages(chunk, topic, speakers, tone, custom_instructions)
     
     try:
         response = query_llm(
@@ -213,7 +183,8 @@ def generate_chunk_dialogue(chunk: str, topic: str, llm_config: dict, speakers:
             provider=llm_config["provider"],
             model_name=llm_config.get("model_name", ""),
             api_key=llm_config.get("api_key"),
-            local_pipeline=llm_config.get("local_pipeline")
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
         )
         dialogue = extract_json_from_response(response)
         print(f"Generated dialogue for topic '{topic}': {dialogue}\n\n")
@@ -276,13 +247,16 @@ def stitch_and_refine(chunk_dialogues: List[List[Dict]], llm_config: dict, speak
     ]
     
     try:
-        response = query_llm(
-            messages=messages,
-            provider=llm_config["provider"],
-            model_name=llm_config.get("model_name", ""),
-            api_key=llm_config.get("api_key"),
-            local_pipeline=llm_config.get("local_pipeline")
-        )
+        # Holds a provider slot: intro/outro generation may be running on the same model
+        with provider_slot(llm_config["provider"]):
+            response = query_llm(
+                messages=messages,
+                provider=llm_config["provider"],
+                model_name=llm_config.get("model_name", ""),
+                api_key=llm_config.get("api_key"),
+                local_pipeline=llm_config.get("local_pipeline"),
+                use_cache=llm_config.get("use_cache"),
+            )
         
         refined_dialogue = extract_json_from_response(response)
         print(f"Refined dialogue: {len(refined_dialogue)} turns")
@@ -292,18 +266,170 @@ def stitch_and_refine(chunk_dialogues: List[List[Dict]], llm_config: dict, speak
         return combined_dialogue
 
 
-def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: List[Dict], podcast_name: str) -> Tuple[List[Dict], List[Dict]]:
+def format_dialogue(turns: List[Dict]) -> str:
+    """Render turns as 'Speaker: text' lines for prompts."""
+    return "\n".join([f"{turn['speaker']}: {turn['text']}" for turn in turns])
+
+
+def refine_window(window: List[Dict], context_before: List[Dict], context_after: List[Dict], llm_config: dict, speakers: List[Dict]) -> List[Dict]:
     """
-    Generate intro and outro based on the final cohesive script.
-    Intro: 30-50 words
-    Outro: 30-50 words
+    Rewrite one window of turns for flow. Neighbouring turns are shown as read-only context.
+    Falls back to the original window if the LLM output cannot be parsed.
     """
-    # Get overview of main script
-    script_preview = "\n".join([
-        f"{turn['speaker']}: {turn['text']}"
-        for turn in main_script[:5]  # First 5 turns for context
-    ])
-    
+    speakers_desc, json_format = get_speaker_formatting(speakers)
+
+    messages = [
+        {
+            "role": "system",
+            "content": f"""You are a podcast script editor. Rewrite the provided section of a dialogue so it flows naturally.
+
+            CRITICAL RULES:
+            1. Maintain the same topics and information
+            2. Keep the conversational tone between {speakers_desc}
+            3. Rewrite ONLY the section marked SECTION; the surrounding context is for continuity only
+            4. DO NOT add intro or outro
+            5. Keep a similar number of turns and length
+            6. Output ONLY valid JSON"""
+        },
+        {
+            "role": "user",
+            "content": f"""PRECEDING CONTEXT (do not rewrite):
+            {format_dialogue(context_before) or "(start of episode)"}
+
+            SECTION (rewrite this):
+            {format_dialogue(window)}
+
+            FOLLOWING CONTEXT (do not rewrite):
+            {format_dialogue(context_after) or "(end of main discussion)"}
+
+            **Output Format (JSON):**
+            [
+                {json_format}
+            ]"""
+        }
+    ]
+
+    try:
+        response = query_llm(
+            messages=messages,
+            provider=llm_config["provider"],
+            model_name=llm_config.get("model_name", ""),
+            api_key=llm_config.get("api_key"),
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
+        )
+        refined = extract_json_from_response(response)
+        return refined if refined else window
+    except Exception as e:
+        print(f"Error refining window: {e}")
+        return window
+
+
+def smooth_boundary(left: List[Dict], right: List[Dict], llm_config: dict, speakers: List[Dict]) -> List[Dict]:
+    """Rewrite the turns around the seam between two refined windows into one smooth transition."""
+    speakers_desc, json_format = get_speaker_formatting(speakers)
+
+    messages = [
+        {
+            "role": "system",
+            "content": f"""You are a podcast script editor. The dialogue below joins two separately edited sections.
+
+            CRITICAL RULES:
+            1. Smooth the transition so the conversation flows naturally across the join
+            2. Keep the same information and roughly the same number of turns
+            3. Keep the conversational tone between {speakers_desc}
+            4. Output ONLY valid JSON"""
+        },
+        {
+            "role": "user",
+            "content": f"""END OF FIRST SECTION:
+            {format_dialogue(left)}
+
+            START OF NEXT SECTION:
+            {format_dialogue(right)}
+
+            **Output Format (JSON):**
+            [
+                {json_format}
+            ]"""
+        }
+    ]
+
+    try:
+        response = query_llm(
+            messages=messages,
+            provider=llm_config["provider"],
+            model_name=llm_config.get("model_name", ""),
+            api_key=llm_config.get("api_key"),
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
+        )
+        smoothed = extract_json_from_response(response)
+        return smoothed if smoothed else left + right
+    except Exception as e:
+        print(f"Error smoothing boundary: {e}")
+        return left + right
+
+
+def stitch_and_refine_windowed(chunk_dialogues: List[List[Dict]], llm_config: dict, speakers: List[Dict], window_size: int = 12, overlap: int = 2) -> List[Dict]:
+    """
+    Refine the combined dialogue in windows of `window_size` turns instead of one giant call.
+    Windows are refined in parallel, each seeing `overlap` neighbouring turns as context;
+    then the `overlap` turns on each side of every seam are smoothed, also in parallel.
+    Each call stays well under provider output limits, and cost grows linearly with length.
+    """
+    combined_dialogue = [turn for dialogue in chunk_dialogues if dialogue for turn in dialogue]
+    if not combined_dialogue:
+        print("Warning: No valid dialogues to stitch")
+        return []
+
+    # Seams take `overlap` turns from each side, so every window needs at least 2 * overlap turns
+    overlap = max(0, min(overlap, window_size // 4))
+    windows = [combined_dialogue[i:i + window_size] for i in range(0, len(combined_dialogue), window_size)]
+    if len(windows) > 1 and len(windows[-1]) < window_size // 2:
+        # Merge a short last window into the previous one (pop first: indices shift)
+        last = windows.pop()
+        windows[-1] = windows[-1] + last
+
+    provider = llm_config["provider"]
+    print(f"Refining {len(combined_dialogue)} turns in {len(windows)} windows")
+
+    def refine(i: int) -> List[Dict]:
+        context_before = windows[i - 1][-overlap:] if i > 0 and overlap else []
+        context_after = windows[i + 1][:overlap] if i + 1 < len(windows) and overlap else []
+        return refine_window(windows[i], context_before, context_after, llm_config, speakers)
+
+    refined = map_with_provider_limit(refine, list(range(len(windows))), provider)
+
+    if len(refined) == 1 or not overlap:
+        return [turn for window in refined for turn in window]
+
+    # A refined window may come back shorter; never let a seam eat more than half of it
+    heads = [0] + [min(overlap, len(window) // 2) for window in refined[1:]]
+    tails = [min(overlap, len(window) // 2) for window in refined[:-1]] + [0]
+
+    def smooth(i: int) -> List[Dict]:
+        left = refined[i][len(refined[i]) - tails[i]:]
+        right = refined[i + 1][:heads[i + 1]]
+        if not left or not right:
+            # A window of 0 or 1 turns gives up nothing to the seam; there is nothing to join
+            return left + right
+        return smooth_boundary(left, right, llm_config, speakers)
+
+    seams = map_with_provider_limit(smooth, list(range(len(refined) - 1)), provider)
+
+    final_dialogue = []
+    for i, window in enumerate(refined):
+        final_dialogue.extend(window[heads[i]:len(window) - tails[i]])
+        if i < len(seams):
+            final_dialogue.extend(seams[i])
+
+    print(f"Refined dialogue: {len(final_dialogue)} turns")
+    return final_dialogue
+
+
+def build_intro_outro_messages(overview: str, speakers: List[Dict], podcast_name: str) -> Tuple[List[Dict], List[Dict]]:
+    """Build the intro and outro prompts from an overview of the episode's topics."""
     speakers_desc, json_format = get_speaker_formatting(speakers)
 
     # Identify the host (assumed to be the first speaker or explicitly searched)
@@ -329,7 +455,7 @@ def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: Li
             "content": f"""Create a 50-75 word introduction for this podcast episode:
 
             Main topics discussed:
-            {script_preview}
+            {overview}
 
             **Output Format (JSON):**
             [
@@ -356,7 +482,7 @@ def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: Li
             "content": f"""Create a 30-50 word conclusion for this podcast episode:
 
             Topics covered:
-            {script_preview}
+            {overview}
 
             **Output Format (JSON):**
             [
@@ -364,6 +490,23 @@ def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: Li
             ]"""
         }
     ]
+
+    return intro_messages, outro_messages
+
+
+def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: List[Dict], podcast_name: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Generate intro and outro based on the final cohesive script.
+    Intro: 30-50 words
+    Outro: 30-50 words
+    """
+    # Get overview of main script
+    script_preview = "\n".join([
+        f"{turn['speaker']}: {turn['text']}"
+        for turn in main_script[:5]  # First 5 turns for context
+    ])
+    
+    intro_messages, outro_messages = build_intro_outro_messages(script_preview, speakers, podcast_name)
     
     try:
         intro_response = query_llm(
@@ -371,7 +514,8 @@ def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: Li
             provider=llm_config["provider"],
             model_name=llm_config.get("model_name", ""),
             api_key=llm_config.get("api_key"),
-            local_pipeline=llm_config.get("local_pipeline")
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
         )
         intro = extract_json_from_response(intro_response)
         print(f"Generated intro: {intro}")
@@ -381,7 +525,8 @@ def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: Li
             provider=llm_config["provider"],
             model_name=llm_config.get("model_name", ""),
             api_key=llm_config.get("api_key"),
-            local_pipeline=llm_config.get("local_pipeline")
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
         )
         outro = extract_json_from_response(outro_response)
         print(f"Generated outro: {outro}")
@@ -392,18 +537,103 @@ def generate_intro_outro(main_script: List[Dict], llm_config: dict, speakers: Li
         return [], []
 
 
-def generate_single_call_script(content: str, duration: int, llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Dict]:
+def generate_intro_outro_from_topics(topics: List[str], llm_config: dict, speakers: List[Dict], podcast_name: str) -> Tuple[List[Dict], List[Dict]]:
     """
-    Generate complete script (with intro and outro) in a single LLM call.
-    Used for small content (≤ 800 words).
+    Generate intro and outro from the per-chunk topic list, so they do not wait for the refined script.
+    The two calls run concurrently (within the provider's concurrency slots).
+    """
+    overview = "\n".join([f"- {topic}" for topic in topics])
+    intro_messages, outro_messages = build_intro_outro_messages(overview, speakers, podcast_name)
+
+    def generate(messages: List[Dict]) -> List[Dict]:
+        try:
+            response = query_llm(
+                messages=messages,
+                provider=llm_config["provider"],
+                model_name=llm_config.get("model_name", ""),
+                api_key=llm_config.get("api_key"),
+                local_pipeline=llm_config.get("local_pipeline"),
+                use_cache=llm_config.get("use_cache"),
+            )
+            return extract_json_from_response(response)
+        except Exception as e:
+            print(f"Error generating intro/outro: {e}")
+            return []
+
+    intro, outro = map_with_provider_limit(generate, [intro_messages, outro_messages], llm_config["provider"])
+    print(f"Generated intro: {intro}")
+    print(f"Generated outro: {outro}")
+    return intro, outro
+
+
+def process_chunk(chunk: str, llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> Tuple[str, List[Dict]]:
+    """Extract the topic of a chunk and generate its dialogue. Returns (topic, dialogue)."""
+    topic = extract_topic_from_chunk(chunk, llm_config)
+    print(f"Topic: {topic}")
+    dialogue = generate_chunk_dialogue(chunk, topic, llm_config, speakers, tone, custom_instructions)
+    return topic, dialogue
+
+
+def process_chunks_concurrently(chunks: List[str], llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Tuple[str, List[Dict]]]:
     """
+    Process independent chunks in parallel, limited by the provider's concurrency slots.
+    Results are returned in chunk order.
+    """
+    def run(indexed_chunk: Tuple[int, str]) -> Tuple[str, List[Dict]]:
+        i, chunk = indexed_chunk
+        print(f"\nProcessing chunk {i+1}/{len(chunks)}")
+        return process_chunk(chunk, llm_config, speakers, tone, custom_instructions)
+
+    return map_with_provider_limit(run, list(enumerate(chunks)), llm_config["provider"])
+
+
+def process_chunks_batched(chunks: List[str], llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Tuple[str, List[Dict]]]:
+    """
+    Local-model variant of process_chunks_concurrently: all topic prompts are generated as
+    padded batches, then all dialogue prompts. Results are returned in chunk order.
+    """
+    batch_kwargs = dict(
+        provider=llm_config["provider"],
+        model_name=llm_config.get("model_name", ""),
+        api_key=llm_config.get("api_key"),
+        local_pipeline=llm_config.get("local_pipeline"),
+        batch_size=llm_config.get("batch_size"),
+        use_cache=llm_config.get("use_cache"),
+    )
+
+    with provider_slot(llm_config["provider"]):
+        print(f"\nExtracting topics for {len(chunks)} chunks in batches...")
+        try:
+            topics = [topic.strip() for topic in query_llm_batch([build_topic_messages(chunk) for chunk in chunks], **batch_kwargs)]
+        except Exception as e:
+            print(f"Error extracting topics: {e}")
+            topics = ["General Discussion"] * len(chunks)
+
+        print(f"Generating dialogue for {len(chunks)} chunks in batches...")
+        try:
+            responses = query_llm_batch(
+                [build_chunk_dialogue_messages(chunk, topic, speakers, tone, custom_instructions) for chunk, topic in zip(chunks, topics)],
+                **batch_kwargs
+            )
+        except Exception as e:
+            print(f"Error generating chunk dialogue: {e}")
+            responses = [""] * len(chunks)
+
+    results = []
+    for topic, response in zip(topics, responses):
+        print(f"Topic: {topic}")
+        results.append((topic, extract_json_from_response(response) if response else []))
+    return results
+
+
+def build_single_call_messages(content: str, duration: int, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Dict]:
+    """Builds the prompt for writing a complete script (with intro and outro) in one call."""
     # Strict word count limit based on duration (200 words per minute)
     max_words = duration * 200
-    target_words = max_words  # Aim for the limit
     
     speakers_desc, json_format = get_speaker_formatting(speakers)
 
-    messages = [
+    return [
         {
             "role": "system",
             "content": f"""You are a podcast script writer. Create engaging dialogue between these hosts:
@@ -432,6 +662,13 @@ Include:
 ]"""
         }
     ]
+
+def generate_single_call_script(content: str, duration: int, llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> List[Dict]:
+    """
+    Generate complete script (with intro and outro) in a single LLM call.
+    Used for small content (≤ 800 words).
+    """
+    messages = build_single_call_messages(content, duration, speakers, tone, custom_instructions)
     
     try:
         response = query_llm(
@@ -439,7 +676,8 @@ Include:
             provider=llm_config["provider"],
             model_name=llm_config.get("model_name", ""),
             api_key=llm_config.get("api_key"),
-            local_pipeline=llm_config.get("local_pipeline")
+            local_pipeline=llm_config.get("local_pipeline"),
+            use_cache=llm_config.get("use_cache"),
         )
         
         dialogue = extract_json_from_response(response)
@@ -449,12 +687,100 @@ Include:
         print(f"Error generating single-call script: {e}")
         return []
 
+def reduce_content_for_episode(content: str, duration: int, llm_config: dict, local_pipeline=None, enabled: bool = None) -> str:
+    """
+    Extractively trims content to what a `duration`-minute episode can use, and to the
+    model's single-call budget when that leaves enough material. Cheap and local.
+    """
+    if not (REDUCTION_ENABLED if enabled is None else enabled):
+        return content
+    provider = llm_config["provider"]
+    model_name = llm_config.get("model_name")
+    reduction = reduce_for_duration(
+        content,
+        duration,
+        single_call_tokens=single_call_token_budget(provider, model_name, duration),
+        count_tokens=get_token_counter(provider, model_name, getattr(local_pipeline, "tokenizer", None))
+    )
+    if reduction["reduced"]:
+        print(f"Reduced content from {reduction['original_words']} to {reduction['kept_words']} words for a {duration}-minute episode")
+    return reduction["content"]
+
+def stream_single_call_script(content: str, duration: int, llm_config: dict, speakers: List[Dict], tone: str = "Fun & Engaging", custom_instructions: str = None) -> Iterator[Dict]:
+    """
+    Streaming variant of generate_single_call_script.
+    Yields each dialogue turn as soon as the model has finished writing it.
+    """
+    messages = build_single_call_messages(content, duration, speakers, tone, custom_instructions)
+    parser = DialogueStreamParser()
+    turn_count = 0
+
+    with provider_slot(llm_config["provider"]):
+        tokens = stream_llm(
+            messages=messages,
+            provider=llm_config["provider"],
+            model_name=llm_config.get("model_name", ""),
+            api_key=llm_config.get("api_key"),
+            local_pipeline=llm_config.get("local_pipeline")
+        )
+        for token in tokens:
+            for turn in parser.feed(token):
+                turn_count += 1
+                yield turn
+
+    for turn in parser.finish():
+        turn_count += 1
+        yield turn
+    print(f"Streamed single-call script: {turn_count} turns")
 
-def generate_script(content_data: dict, duration: int, llm_config: dict, num_speakers: int = 2, podcast_name: str = "Synth-FM", custom_speaker_names: List[str] = None, tone: str = "Fun & Engaging", custom_instructions: str = None) -> dict:
+def prefetch_turns(turns: Iterator[Dict], max_buffered: int = 64) -> Iterator[Dict]:
+    """
+    Drains `turns` on a background thread so the LLM stream keeps flowing while
+    the consumer (e.g. TTS) is busy. Errors from the producer are re-raised here.
+    """
+    buffer = queue.Queue(maxsize=max_buffered)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for turn in turns:
+                if stop.is_set():
+                    return
+                buffer.put(turn)
+        except Exception as e:
+            buffer.put(e)
+        finally:
+            buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Unblock a producer stuck on a full queue
+        while not buffer.empty():
+            buffer.get_nowait()
+
+
+def generate_script(content_data: dict, duration: int, llm_config: dict, num_speakers: int = 2, podcast_name: str = "Synth-FM", custom_speaker_names: List[str] = None, tone: str = "Fun & Engaging", custom_instructions: str = None, concurrent_chunks: bool = False, windowed_refinement: bool = False, intro_outro_from_topics: bool = False, extractive_reduction: bool = None) -> dict:
     """
     Main orchestrator function for script generation.
     
-    Determines whether to use single-call or multi-chunk approach based on word count.
+    Determines whether to use single-call or multi-chunk approach from the model's token limits.
+    With `concurrent_chunks`, chunks of large content are processed in parallel
+    (for the local model, as padded batches).
+    With `windowed_refinement`, the stitched script is refined in parallel windows.
+    With `intro_outro_from_topics`, intro and outro are written from the chunk topics
+    while the main body is being refined.
+    Unless `extractive_reduction` is False (None follows CONTENT_REDUCTION_ENABLED), long content
+    is first reduced to what the requested duration needs.
     Returns final script with title and dialogue.
     """
     try:
@@ -465,45 +791,82 @@ def generate_script(content_data: dict, duration: int, llm_config: dict, num_spe
         print(f"Content word count: {word_count}")
         print(f"Target duration: {duration} minutes")
         
-        # Threshold for chunking
-        CHUNK_THRESHOLD = 1200
-        
         # Get speaker configuration
         speakers = get_speaker_config(num_speakers, custom_speaker_names)
         print(f"Generating script for {num_speakers} speakers: {[s['name'] for s in speakers]}")
         print(f"Podcast Name: {podcast_name}")
 
-        if word_count <= CHUNK_THRESHOLD:
-            print("Using single LLM call approach (small content)")
+        # Size the work from the target model's context and output limits
+        local_pipeline = llm_config.get("local_pipeline") or (get_loaded_local_pipeline() if llm_config["provider"] == PROVIDER_LOCAL else None)
+        content = reduce_content_for_episode(content, duration, llm_config, local_pipeline, extractive_reduction)
+        plan = plan_chunks(
+            content,
+            provider=llm_config["provider"],
+            model_name=llm_config.get("model_name"),
+            duration=duration,
+            tokenizer=getattr(local_pipeline, "tokenizer", None)
+        )
+        print(f"Content tokens: {plan['total_tokens']} (chunk budget {plan['chunk_token_budget']})")
+
+        if plan["mode"] == "single":
+            print("Using single LLM call approach (content fits one request)")
             dialogue = generate_single_call_script(content, duration, llm_config, speakers, tone, custom_instructions)
         else:
             print("Using multi-chunk approach (large content)")
             
             # Step 1: Chunk the content
-            chunks = chunk_text(content, max_words=3000)
+            chunks = plan["chunks"]
             print(f"Created {len(chunks)} chunks")
             
             # Step 2: Generate dialogue for each chunk
             chunk_dialogues = []
-            for i, chunk in enumerate(chunks):
-                print(f"\nProcessing chunk {i+1}/{len(chunks)}")
-                
-                # Extract topic
-                topic = extract_topic_from_chunk(chunk, llm_config)
-                print(f"Topic: {topic}")
-                
-                # Generate dialogue
-                chunk_dialogue = generate_chunk_dialogue(chunk, topic, llm_config, speakers, tone, custom_instructions)
-                if chunk_dialogue:
-                    chunk_dialogues.append(chunk_dialogue)
-            
-            # Step 3: Stitch and refine
-            print("\nStitching and refining all chunks...")
-            main_script = stitch_and_refine(chunk_dialogues, llm_config, speakers)
+            topics = []
+            if concurrent_chunks:
+                if llm_config["provider"] == PROVIDER_LOCAL:
+                    chunk_results = process_chunks_batched(chunks, llm_config, speakers, tone, custom_instructions)
+                else:
+                    chunk_results = process_chunks_concurrently(chunks, llm_config, speakers, tone, custom_instructions)
+                topics = [topic for topic, _ in chunk_results]
+                chunk_dialogues = [chunk_dialogue for _, chunk_dialogue in chunk_results if chunk_dialogue]
+            else:
+                for i, chunk in enumerate(chunks):
+                    print(f"\nProcessing chunk {i+1}/{len(chunks)}")
+                    
+                    # Extract topic
+                    topic = extract_topic_from_chunk(chunk, llm_config)
+                    topics.append(topic)
+                    print(f"Topic: {topic}")
+                    
+                    # Generate dialogue
+                    chunk_dialogue = generate_chunk_dialogue(chunk, topic, llm_config, speakers, tone, custom_instructions)
+                    if chunk_dialogue:
+                        chunk_dialogues.append(chunk_dialogue)
             
-            # Step 4: Generate intro and outro
-            print("\nGenerating intro and outro...")
-            intro, outro = generate_intro_outro(main_script, llm_config, speakers, podcast_name)
+            # Intro and outro only need the topic list, so they can run alongside refinement
+            intro_outro_executor = None
+            intro_outro_future = None
+            if intro_outro_from_topics and topics:
+                print("\nGenerating intro and outro from topics...")
+                intro_outro_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intro-outro")
+                intro_outro_future = intro_outro_executor.submit(generate_intro_outro_from_topics, topics, llm_config, speakers, podcast_name)
+
+            try:
+                # Step 3: Stitch and refine
+                print("\nStitching and refining all chunks...")
+                if windowed_refinement:
+                    main_script = stitch_and_refine_windowed(chunk_dialogues, llm_config, speakers)
+                else:
+                    main_script = stitch_and_refine(chunk_dialogues, llm_config, speakers)
+                
+                # Step 4: Generate intro and outro
+                if intro_outro_future is not None:
+                    intro, outro = intro_outro_future.result()
+                else:
+                    print("\nGenerating intro and outro...")
+                    intro, outro = generate_intro_outro(main_script, llm_config, speakers, podcast_name)
+            finally:
+                if intro_outro_executor is not None:
+                    intro_outro_executor.shutdown(wait=False)
             
             # Step 5: Combine everything
             dialogue = intro + main_script + outro
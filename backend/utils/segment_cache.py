@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from importlib import metadata
+from pathlib import Path
+import numpy as np
+
+CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", "data/cache/segments"))
+CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1") == "1"
+
+KOKORO_MODEL_ID = "hexgrad/Kokoro-82M"
+
+def _kokoro_version() -> str:
+    try:
+        return metadata.version("kokoro")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+KOKORO_VERSION = _kokoro_version()
+
+def make_segment_key(text: str, voice_id: str, speed: float = 1) -> str:
+    """Content address of a rendered turn: any change to text, voice, speed or model yields a new key."""
+    payload = json.dumps(
+        [text, voice_id, float(speed), KOKORO_MODEL_ID, KOKORO_VERSION],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SegmentCache:
+    """
+    Persistent, size-bounded LRU cache of rendered float32 PCM, one .npy file per key.
+    Recency is tracked in memory and mirrored to file mtimes so it survives restarts.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def _load_index(self):
+        files = sorted(self.cache_dir.glob("*.npy"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key: str):
+        """Returns the cached audio for `key`, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            audio = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Evicted or corrupted by another worker process
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return audio
+
+    def put(self, key: str, audio) -> None:
+        path = self._path(key)
+        # Unique per write: threads of one process may store the same key at the same time
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(audio, dtype=np.float32))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing segment cache entry {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._forget(key)
+            size = path.stat().st_size
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    self._path(key).unlink()
+                except FileNotFoundError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+# Global cache instance, created on first use
+_SEGMENT_CACHE = None
+_SEGMENT_CACHE_LOCK = threading.Lock()
+
+def get_segment_cache():
+    """Returns the shared segment cache, or None when TTS_CACHE_ENABLED is off."""
+    global _SEGMENT_CACHE
+    if not CACHE_ENABLED:
+        return None
+    if _SEGMENT_CACHE is None:
+        with _SEGMENT_CACHE_LOCK:
+            if _SEGMENT_CACHE is None:
+                _SEGMENT_CACHE = SegmentCache()
+    return _SEGMENT_CACHE
@@ -0,0 +1,144 @@
+import os
+import time
+import uuid
+import threading
+from pathlib import Path
+import numpy as np
+import soundfile as sf
+
+# How many episodes' stores are kept between /synthesize-audio and /create-podcast
+MAX_LIVE_STORES = 8
+# Stores not appended to or looked up for this long are dropped
+SEGMENT_STORE_IDLE_SECONDS = int(os.getenv("SEGMENT_STORE_IDLE_SECONDS", "900"))
+# Total buffer memory across live stores; least recently used stores go first
+SEGMENT_STORE_MAX_MB = int(os.getenv("SEGMENT_STORE_MAX_MB", "1024"))
+
+class SegmentStore:
+    """
+    Holds rendered float32 PCM for one episode in a single growable buffer.
+    Each turn is indexed by segment_index -> (offset, length, speaker), so assembly
+    slices the buffer instead of round-tripping every turn through a WAV file.
+    """
+
+    def __init__(self, sample_rate: int = 24000, initial_seconds: int = 60):
+        self.sample_rate = sample_rate
+        self._buffer = np.empty(sample_rate * initial_seconds, dtype=np.float32)
+        self._length = 0
+        self._index = {}
+        self._lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    def append(self, segment_index: int, speaker: str, audio) -> None:
+        """
+        Adds a rendered turn. Turns may arrive in any order; they are read back by segment_index.
+        Appending an index again replaces the earlier turn; its samples stay unused in the buffer.
+        """
+        samples = np.asarray(audio, dtype=np.float32).reshape(-1)
+
+        with self._lock:
+            self.last_used = time.monotonic()
+            required = self._length + samples.size
+            if required > self._buffer.size:
+                # Grow geometrically so appends stay amortized O(1)
+                grown = np.empty(max(required, self._buffer.size * 2), dtype=np.float32)
+                grown[:self._length] = self._buffer[:self._length]
+                self._buffer = grown
+
+            self._buffer[self._length:required] = samples
+            self._index[segment_index] = (self._length, samples.size, speaker)
+            self._length = required
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def num_samples(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer, including unused capacity."""
+        return self._buffer.nbytes
+
+    def get(self, segment_index: int):
+        """Returns a read-only view of one turn's samples."""
+        offset, length, _ = self._index[segment_index]
+        view = self._buffer[offset:offset + length]
+        view.flags.writeable = False
+        return view
+
+    def segment_indices(self) -> list[int]:
+        return sorted(self._index)
+
+    def iter_segments(self):
+        """Yields each turn's samples in script order, as views into the buffer."""
+        for segment_index in self.segment_indices():
+            yield self.get(segment_index)
+
+    def combined(self):
+        """
+        Returns the whole episode in script order.
+        When turns were appended in order and none was replaced, this is a zero-copy view of the buffer.
+        """
+        indices = self.segment_indices()
+        offsets = [self._index[i][0] for i in indices]
+        used = sum(self._index[i][1] for i in indices)
+        if offsets == sorted(offsets) and used == self._length:
+            view = self._buffer[:self._length]
+            view.flags.writeable = False
+            return view
+        return np.concatenate([self.get(i) for i in indices])
+
+    def export_segments(self, output_dir: Path) -> list[str]:
+        """Optionally writes every turn as its own WAV, mirroring the TEMP_DIR naming."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for segment_index in self.segment_indices():
+            speaker = self._index[segment_index][2]
+            file_path = output_dir / f"segment_{segment_index}_{speaker}.wav"
+            sf.write(str(file_path), self.get(segment_index), self.sample_rate)
+            paths.append(str(file_path))
+        return paths
+
+# Live stores keyed by id
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+def _evict_stores():
+    """Drops idle stores, then least recently used ones while over the count or memory budget (lock held)."""
+    now = time.monotonic()
+    for store_id, store in list(_STORES.items()):
+        if now - store.last_used > SEGMENT_STORE_IDLE_SECONDS:
+            del _STORES[store_id]
+
+    max_bytes = SEGMENT_STORE_MAX_MB * 1024 * 1024
+    total_bytes = sum(store.nbytes for store in _STORES.values())
+    # Appends count as use, so a store still being rendered into is not the first to go.
+    # The most recent store is always kept, even when it alone exceeds the budget.
+    for store_id, store in sorted(_STORES.items(), key=lambda item: item[1].last_used)[:-1]:
+        if len(_STORES) <= MAX_LIVE_STORES and total_bytes <= max_bytes:
+            break
+        del _STORES[store_id]
+        total_bytes -= store.nbytes
+
+def create_segment_store(sample_rate: int = 24000) -> tuple[str, SegmentStore]:
+    """Creates a store that later requests can look up by id."""
+    store_id = uuid.uuid4().hex
+    store = SegmentStore(sample_rate)
+    with _STORES_LOCK:
+        _STORES[store_id] = store
+        _evict_stores()
+    return store_id, store
+
+def get_segment_store(store_id: str):
+    with _STORES_LOCK:
+        _evict_stores()
+        store = _STORES.get(store_id)
+        if store is not None:
+            store.last_used = time.monotonic()
+        return store
+
+def release_segment_store(store_id: str) -> None:
+    with _STORES_LOCK:
+        _STORES.pop(store_id, None)
@@ -0,0 +1,151 @@
+import os
+import time
+import shutil
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .audio_synthesizer import TEMP_DIR, batch_synthesize_audio
+from .audio_processor import create_podcast
+from .audio_encoder import submit_encode
+from .segment_store import SegmentStore
+
+# Episodes rendered concurrently on this host; true parallelism comes from TTS_WORKERS,
+# since in-process renders share one KPipeline and take turns on its lock
+SYNTHESIS_JOB_WORKERS = int(os.getenv("SYNTHESIS_JOB_WORKERS", "2"))
+# Jobs allowed to wait for a worker; beyond that submissions are rejected
+SYNTHESIS_JOB_QUEUE_LIMIT = int(os.getenv("SYNTHESIS_JOB_QUEUE_LIMIT", "8"))
+SYNTHESIS_JOB_RETRY_AFTER = int(os.getenv("SYNTHESIS_JOB_RETRY_AFTER", "30"))
+MAX_TRACKED_JOBS = 256
+
+JOBS_DIR = TEMP_DIR / "jobs"
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+_JOBS = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+# Covers running and queued jobs, like the API's admission semaphores
+_JOB_SLOTS = threading.BoundedSemaphore(SYNTHESIS_JOB_WORKERS + SYNTHESIS_JOB_QUEUE_LIMIT)
+
+class JobQueueFull(RuntimeError):
+    """Raised by submit_synthesis_job when every worker is busy and the queue is full."""
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=SYNTHESIS_JOB_WORKERS, thread_name_prefix="synthesis")
+    return _EXECUTOR
+
+def _update_job(job_id: str, **fields):
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+def _run_synthesis_job(job_id: str, script: dict, unique_speakers: list[str], speaker_genders: dict[str, str], options: dict):
+    _update_job(job_id, status="running", started_at=time.time())
+    output_dir = JOBS_DIR / job_id
+
+    def on_progress(done: int, total: int):
+        _update_job(job_id, completed_turns=done, total_turns=total)
+
+    try:
+        store = SegmentStore() if options["in_memory"] else None
+        audio_paths = batch_synthesize_audio(
+            script=script,
+            unique_speakers=unique_speakers,
+            speaker_genders=speaker_genders,
+            batched=options["batched"],
+            workers=options["workers"],
+            store=store,
+            export_segments=options["export_segments"] if store is not None else None,
+            output_dir=output_dir,
+            progress_callback=on_progress
+        )
+        _update_job(job_id, audio_paths=audio_paths)
+
+        final_path = None
+        encode_job_id = None
+        if options["create_final"]:
+            final_path = create_podcast(audio_paths, output_filename=f"podcast_{job_id}.wav", store=store)
+            if final_path is None:
+                raise RuntimeError("No audio was synthesized")
+            if options["output_format"] != "wav":
+                # Already a background job, so wait for an encoder slot rather than fail
+                encode_job_id = submit_encode(final_path, options["output_format"], block=True)
+
+        if final_path:
+            # The segments live on only inside the final WAV
+            shutil.rmtree(output_dir, ignore_errors=True)
+            audio_paths = []
+        _update_job(job_id, status="completed", audio_paths=audio_paths, final_audio_path=final_path, encode_job_id=encode_job_id, finished_at=time.time())
+    except Exception as e:
+        print(f"Error in synthesis job {job_id}: {e}")
+        _update_job(job_id, status="failed", error=str(e), finished_at=time.time())
+    finally:
+        with _JOBS_LOCK:
+            expired = job_id not in _JOBS
+        if expired:
+            # The record was evicted while the job ran, so nobody can ask for its segments
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+def submit_synthesis_job(script: dict, unique_speakers: list[str], speaker_genders: dict[str, str] = None, batched: bool = False, workers: int = 0, in_memory: bool = False, export_segments: bool = False, create_final: bool = True, output_format: str = "wav") -> str:
+    """
+    Queues an episode render and returns its job id immediately.
+    Segments are written under data/temp/jobs/<job_id>/ and the podcast to data/output/podcast_<job_id>.wav;
+    the segment directory is removed once the podcast exists, or when the job record expires.
+    Raises JobQueueFull when SYNTHESIS_JOB_WORKERS jobs are running and SYNTHESIS_JOB_QUEUE_LIMIT are waiting.
+    """
+    if not _JOB_SLOTS.acquire(blocking=False):
+        raise JobQueueFull("Too many synthesis jobs queued, retry later")
+
+    job_id = uuid.uuid4().hex
+    with _JOBS_LOCK:
+        _JOBS[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "completed_turns": 0,
+            "total_turns": len(script.get("dialogue", [])),
+            "audio_paths": [],
+            "final_audio_path": None,
+            "encode_job_id": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        while len(_JOBS) > MAX_TRACKED_JOBS:
+            expired_id, expired = _JOBS.popitem(last=False)
+            # Running jobs clean up after themselves once they notice the record is gone
+            if expired["status"] in ("completed", "failed"):
+                shutil.rmtree(JOBS_DIR / expired_id, ignore_errors=True)
+
+    options = {
+        "batched": batched,
+        "workers": workers,
+        "in_memory": in_memory,
+        "export_segments": export_segments,
+        "create_final": create_final,
+        "output_format": output_format,
+    }
+    try:
+        future = _get_executor().submit(_run_synthesis_job, job_id, script, unique_speakers, speaker_genders, options)
+    except RuntimeError:
+        _JOB_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _JOB_SLOTS.release())
+    return job_id
+
+def get_synthesis_job(job_id: str):
+    """Returns a snapshot of a synthesis job, or None if it is unknown."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        return dict(job) if job else None
+
+def shutdown_synthesis_jobs():
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    _EXECUTOR = None
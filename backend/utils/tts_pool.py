@@ -0,0 +1,157 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator
+from .segment_cache import get_segment_cache, make_segment_key
+
+# Number of TTS worker processes (0 keeps synthesis in the request thread)
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "0"))
+# Torch intra-op threads per worker; keep workers * threads <= physical cores
+TTS_THREADS_PER_WORKER = int(os.getenv("TTS_THREADS_PER_WORKER", "1"))
+
+# Global pool cache, rebuilt only when the worker configuration changes
+_TTS_POOL = None
+_TTS_POOL_CONFIG = None
+_TTS_POOL_LOCK = threading.Lock()
+
+def _init_worker(threads_per_worker: int):
+    """Runs once in every worker: pin torch threads and load that worker's own KPipeline."""
+    import torch
+    from . import audio_synthesizer, segment_cache
+
+    # The parent owns the segment cache (see pool_render_turns); a cache per worker would
+    # multiply the disk budget and hide the workers' hits from /cache-stats
+    segment_cache.CACHE_ENABLED = False
+
+    torch.set_num_threads(threads_per_worker)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Interop threads can only be set before any parallel work has started
+        pass
+
+    audio_synthesizer.get_kokoro_pipeline()
+
+def _render_turn(segment_index: int, text: str, voice_id: str) -> list[tuple[int, object]]:
+    from .audio_synthesizer import render_segment_kokoro
+    try:
+        audio = render_segment_kokoro(text, voice_id)
+    except Exception as e:
+        print(f"Error synthesizing segment {segment_index} (Kokoro): {e}")
+        return []
+    return [(segment_index, audio)] if audio is not None else []
+
+def _render_group(turns: list[tuple[int, str, str]], voice_id: str, batch_size: int) -> list[tuple[int, object]]:
+    from .audio_synthesizer import render_voice_group_kokoro
+    return list(render_voice_group_kokoro(turns, voice_id, batch_size))
+
+def _warm_worker() -> int:
+    from .audio_synthesizer import render_segment_kokoro, FEMALE_VOICES
+    # The first forward pass initializes kernels and the g2p stack
+    render_segment_kokoro("Warming up.", FEMALE_VOICES[0])
+    return os.getpid()
+
+def get_tts_pool(workers: int = None, threads_per_worker: int = None) -> ProcessPoolExecutor:
+    """Returns the shared TTS process pool, starting it on first use."""
+    global _TTS_POOL, _TTS_POOL_CONFIG
+
+    workers = workers or TTS_WORKERS or os.cpu_count() or 1
+    threads_per_worker = threads_per_worker or TTS_THREADS_PER_WORKER
+    config = (workers, threads_per_worker)
+
+    with _TTS_POOL_LOCK:
+        if _TTS_POOL is not None and _TTS_POOL_CONFIG == config:
+            return _TTS_POOL
+
+        _shutdown_locked()
+
+        # spawn avoids inheriting torch/OpenMP state from the server process. Workers import
+        # only this module and audio_synthesizer (the package init is lazy), not the LLM stack.
+        _TTS_POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,),
+        )
+        _TTS_POOL_CONFIG = config
+        print(f"Started TTS pool with {workers} workers x {threads_per_worker} torch threads.")
+        return _TTS_POOL
+
+def warm_tts_pool(workers: int = None, threads_per_worker: int = None) -> int:
+    """
+    Starts the pool and runs a dummy render on each worker, so the first episode pays
+    neither the KPipeline load nor kernel initialization. Returns the number of workers warmed.
+    """
+    workers = workers or TTS_WORKERS or os.cpu_count() or 1
+    pool = get_tts_pool(workers, threads_per_worker)
+    warmed = set()
+    # The pool picks which worker runs a task, so retry a few rounds until every pid has rendered
+    for _ in range(3):
+        futures = [pool.submit(_warm_worker) for _ in range(workers - len(warmed))]
+        warmed.update(future.result() for future in futures)
+        if len(warmed) >= workers:
+            break
+    return len(warmed)
+
+def _shutdown_locked():
+    global _TTS_POOL, _TTS_POOL_CONFIG
+
+    if _TTS_POOL is not None:
+        _TTS_POOL.shutdown(wait=True, cancel_futures=True)
+    _TTS_POOL = None
+    _TTS_POOL_CONFIG = None
+
+def shutdown_tts_pool():
+    """Stops the TTS worker processes, if any are running."""
+    with _TTS_POOL_LOCK:
+        _shutdown_locked()
+
+def pool_render_turns(turns: list[tuple[int, str, str, str]], workers: int = None, threads_per_worker: int = None, batched: bool = False, batch_size: int = 8) -> Iterator[tuple[int, object]]:
+    """
+    Fans (segment_index, speaker, text, voice_id) turns out to the TTS pool.
+    With `batched=True` each task is a same-voice group of turns instead of a single turn.
+    Yields (segment_index, float32 audio) as tasks complete, so callers can store
+    results without holding the whole episode; order by segment_index if needed.
+    Cached turns are served here in the parent and only the misses reach the workers.
+    """
+    cache = get_segment_cache()
+    keys = {}
+    if cache:
+        misses = []
+        for turn in turns:
+            segment_index, _, text, voice_id = turn
+            keys[segment_index] = make_segment_key(text, voice_id)
+            cached_audio = cache.get(keys[segment_index])
+            if cached_audio is not None:
+                yield segment_index, cached_audio
+            else:
+                misses.append(turn)
+        turns = misses
+        if not turns:
+            return
+
+    pool = get_tts_pool(workers, threads_per_worker)
+    futures = []
+
+    if batched:
+        groups = {}
+        for segment_index, speaker, text, voice_id in turns:
+            groups.setdefault(voice_id, []).append((segment_index, speaker, text))
+        for voice_id, group in groups.items():
+            for start in range(0, len(group), batch_size):
+                futures.append(pool.submit(_render_group, group[start:start + batch_size], voice_id, batch_size))
+    else:
+        for segment_index, _, text, voice_id in turns:
+            futures.append(pool.submit(_render_turn, segment_index, text, voice_id))
+
+    for future in as_completed(futures):
+        try:
+            rendered = future.result()
+        except Exception as e:
+            print(f"Error in TTS worker: {e}")
+            continue
+        for segment_index, audio in rendered:
+            if cache:
+                cache.put(keys[segment_index], audio)
+            yield segment_index, audio
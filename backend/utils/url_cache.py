@@ -0,0 +1,174 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from urllib.parse import urldefrag
+
+# Reuse extracted articles across requests; entries are revalidated with conditional GETs
+URL_CACHE_ENABLED = os.getenv("URL_CACHE_ENABLED", "1") == "1"
+URL_CACHE_PATH = Path(os.getenv("URL_CACHE_PATH", "data/cache/url_content.sqlite3"))
+# Entries not confirmed current by the server for this long are dropped
+URL_CACHE_TTL_SECONDS = float(os.getenv("URL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Within this many seconds of the last validation the entry is used without contacting the server
+URL_CACHE_FRESH_SECONDS = float(os.getenv("URL_CACHE_FRESH_SECONDS", "0"))
+URL_CACHE_MAX_ENTRIES = int(os.getenv("URL_CACHE_MAX_ENTRIES", "2000"))
+URL_CACHE_MAX_MB = float(os.getenv("URL_CACHE_MAX_MB", "200"))
+
+def normalize_url(url: str) -> str:
+    return urldefrag(url.strip())[0]
+
+def hash_body(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8", errors="replace")).hexdigest()
+
+class URLContentCache:
+    """
+    SQLite cache of extracted page text keyed by URL, with the validators (ETag,
+    Last-Modified, body hash) needed to revalidate it. TTL expiry plus LRU eviction
+    beyond `max_entries` or `max_bytes` of stored text.
+    """
+
+    def __init__(self, path: Path = URL_CACHE_PATH, ttl_seconds: float = URL_CACHE_TTL_SECONDS, fresh_seconds: float = URL_CACHE_FRESH_SECONDS,
+                 max_entries: int = URL_CACHE_MAX_ENTRIES, max_bytes: int = int(URL_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.fresh_seconds = fresh_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT NOT NULL,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        self._conn.commit()
+
+    def get(self, url: str):
+        """
+        Returns the cached entry as a dict (with "fresh" set when it may be used without
+        revalidation), or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body_hash, title, content, validated_at FROM pages WHERE url = ?",
+                (normalize_url(url),),
+            ).fetchone()
+            if row is None or now - row[5] > self.ttl_seconds:
+                return None
+            self._conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (now, normalize_url(url)))
+            self._conn.commit()
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "body_hash": row[2],
+            "title": row[3],
+            "content": row[4],
+            "fresh": now - row[5] <= self.fresh_seconds,
+        }
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, url: str, outcome: str) -> None:
+        """
+        Counts a lookup outcome: "hit" (fresh entry used as is), "revalidated" (server answered
+        304 or sent an unchanged body; restarts the TTL) or "miss" (page had to be extracted).
+        """
+        with self._lock:
+            if outcome == "revalidated":
+                self._conn.execute("UPDATE pages SET validated_at = ? WHERE url = ?", (time.time(), normalize_url(url)))
+                self._conn.commit()
+                self.revalidated += 1
+            elif outcome == "hit":
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, url: str, body_hash: str, title: str, content: str, etag: str = None, last_modified: str = None) -> None:
+        now = time.time()
+        size = len(content.encode("utf-8")) + len(title.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO pages (url, etag, last_modified, body_hash, title, content, size, validated_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (normalize_url(url), etag, last_modified, body_hash, title, content, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM pages WHERE validated_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            """DELETE FROM pages WHERE url IN (
+                SELECT url FROM pages ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,),
+        )
+        # Keep the most recently used entries whose sizes add up to max_bytes
+        self._conn.execute(
+            """DELETE FROM pages WHERE url IN (
+                SELECT url FROM (
+                    SELECT url, SUM(size) OVER (ORDER BY last_used DESC, url) AS running FROM pages
+                ) WHERE running > ?
+            )""",
+            (self.max_bytes,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "entries": entries,
+                "size_mb": round(size / 2**20, 2),
+                "max_entries": self.max_entries,
+                "max_mb": round(self.max_bytes / 2**20, 2),
+                "ttl_seconds": self.ttl_seconds,
+                "fresh_seconds": self.fresh_seconds,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            }
+
+# Global cache instance, created on first use
+_URL_CACHE = None
+_URL_CACHE_LOCK = threading.Lock()
+
+def get_url_cache(force: bool = False):
+    """Returns the shared URL cache, or None when caching is disabled and not forced."""
+    global _URL_CACHE
+    if not (URL_CACHE_ENABLED or force):
+        return None
+    with _URL_CACHE_LOCK:
+        if _URL_CACHE is None:
+            _URL_CACHE = URLContentCache()
+    return _URL_CACHE
@@ -0,0 +1,124 @@
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, List
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connect / read timeouts per request, and the deadline for a whole /extract-urls call
+URL_CONNECT_TIMEOUT = float(os.getenv("URL_CONNECT_TIMEOUT", "5"))
+URL_READ_TIMEOUT = float(os.getenv("URL_READ_TIMEOUT", "15"))
+URL_FETCH_DEADLINE = float(os.getenv("URL_FETCH_DEADLINE", "30"))
+# URLs fetched at once per request, and at most this many against any single host
+URL_FETCH_WORKERS = int(os.getenv("URL_FETCH_WORKERS", "8"))
+URL_PER_HOST_LIMIT = int(os.getenv("URL_PER_HOST_LIMIT", "2"))
+# Pages larger than this are cut off; articles are far smaller
+URL_MAX_BYTES = int(os.getenv("URL_MAX_BYTES", str(10 * 1024 * 1024)))
+
+USER_AGENT = "Mozilla/5.0 (compatible; Synth-FM/1.0; +https://github.com/SG-Akshay10/synth-fm)"
+
+class FetchTimeout(Exception):
+    pass
+
+# Global pooled session, created on first use; keep-alive connections are reused across requests
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_HOST_SLOTS = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(URL_FETCH_WORKERS, URL_PER_HOST_LIMIT), max_retries=1)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"})
+                _SESSION = session
+    return _SESSION
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _HOST_SLOTS_LOCK:
+        if host not in _HOST_SLOTS:
+            _HOST_SLOTS[host] = threading.BoundedSemaphore(URL_PER_HOST_LIMIT)
+        return _HOST_SLOTS[host]
+
+def _remaining(deadline: float) -> float:
+    return float("inf") if deadline is None else deadline - time.monotonic()
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+
+def _sniff_encoding(body: bytes, response: requests.Response) -> str:
+    """Header charset, then a <meta> charset near the top of the page, then UTF-8 if the body is valid UTF-8, else windows-1252."""
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return response.encoding
+    match = _META_CHARSET.search(body[:4096])
+    if match:
+        return match.group(1).decode("ascii")
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        # Legacy page without any declaration: windows-1252 is the HTML standard's default.
+        # Statistical detection (response.apparent_encoding) misreads short Western pages.
+        return "cp1252"
+
+def _decode(body: bytes, response: requests.Response) -> str:
+    # requests falls back to ISO-8859-1 for text/* without a charset, which ignores <meta charset>
+    try:
+        return body.decode(_sniff_encoding(body, response), errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def fetch_url(url: str, deadline: float = None, headers: dict = None) -> requests.Response:
+    """
+    GETs `url` through the shared session, at most URL_PER_HOST_LIMIT at a time per host.
+    The body is read in pieces so `deadline` (a time.monotonic() value) and URL_MAX_BYTES
+    are enforced even against servers that trickle data. The decoded page is in `response.html`.
+    Raises FetchTimeout when the deadline passes, requests exceptions for network errors.
+    """
+    slot = _host_slot(url)
+    if not slot.acquire(timeout=max(0, min(_remaining(deadline), 3600))):
+        raise FetchTimeout("Request deadline exceeded while waiting for the host")
+    try:
+        remaining = _remaining(deadline)
+        if remaining <= 0:
+            raise FetchTimeout("Request deadline exceeded")
+        timeout = (min(URL_CONNECT_TIMEOUT, remaining), min(URL_READ_TIMEOUT, remaining))
+
+        with get_http_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+            body = bytearray()
+            for piece in response.iter_content(64 * 1024):
+                body += piece
+                if len(body) >= URL_MAX_BYTES:
+                    print(f"Truncated {url} at {URL_MAX_BYTES} bytes")
+                    break
+                if _remaining(deadline) <= 0:
+                    raise FetchTimeout("Request deadline exceeded while downloading")
+            response.html = _decode(bytes(body), response)
+            return response
+    finally:
+        slot.release()
+
+def map_until_deadline(fn: Callable, items: List, deadline: float, workers: int = None) -> List:
+    """
+    Runs fn(item, deadline) concurrently and returns results in input order.
+    Items still running at the deadline come back as None; their threads are left to
+    finish on their own (fetch_url stops reading at the deadline).
+    """
+    if not items:
+        return []
+    executor = ThreadPoolExecutor(max_workers=min(workers or URL_FETCH_WORKERS, len(items)), thread_name_prefix="url-fetch")
+    try:
+        futures = [executor.submit(fn, item, deadline) for item in items]
+        done, _ = wait(futures, timeout=max(0, _remaining(deadline)))
+        return [future.result() if future in done else None for future in futures]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
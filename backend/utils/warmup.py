@@ -0,0 +1,118 @@
+import os
+import time
+import threading
+
+# Opt-in: preload models at startup so the first request does not pay for it
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0") == "1"
+# Optional local LLM (HF model id or frontend alias such as "local_1b") to preload too
+WARMUP_LOCAL_LLM = os.getenv("WARMUP_LOCAL_LLM")
+
+_STATE_LOCK = threading.Lock()
+_STATE = {
+    "status": "idle",  # idle -> warming -> ready | failed
+    "started_at": None,
+    "warmup_seconds": None,
+    "models": {},
+}
+
+def _set_model_state(name: str, **fields):
+    with _STATE_LOCK:
+        _STATE["models"].setdefault(name, {}).update(fields)
+
+def _timed(name: str, fn):
+    """Runs one warm-up step, recording its state and duration under `name`."""
+    _set_model_state(name, state="loading")
+    start = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as e:
+        _set_model_state(name, state="failed", error=str(e), seconds=round(time.perf_counter() - start, 3))
+        raise
+    _set_model_state(name, state="ready", seconds=round(time.perf_counter() - start, 3))
+    return result
+
+def _warm_kokoro():
+    from .audio_synthesizer import KOKORO_LOCK, get_kokoro_pipeline, kokoro_results, prepare_tts, FEMALE_VOICES, MALE_VOICES
+    from .tts_pool import TTS_WORKERS, warm_tts_pool
+
+    pipeline = _timed("kokoro", get_kokoro_pipeline)
+    # Requests may already be rendering with the same pipeline, so take turns with them
+    def load_voice(voice_id: str):
+        with KOKORO_LOCK:
+            return pipeline.load_voice(voice_id)
+
+    for voice_id in FEMALE_VOICES + MALE_VOICES:
+        _timed(f"voice:{voice_id}", lambda: load_voice(voice_id))
+
+    # A first forward pass initializes kernels and the g2p stack
+    def dummy_inference():
+        for _ in kokoro_results(pipeline, "Warming up.", voice=FEMALE_VOICES[0], speed=1):
+            pass
+    _timed("kokoro:first_inference", dummy_inference)
+
+    # Episode renders run in the TTS pool when it is enabled; each worker loads its own copy
+    if TTS_WORKERS > 0:
+        prepare_tts(TTS_WORKERS)
+        warmed = _timed("kokoro:pool", lambda: warm_tts_pool(TTS_WORKERS))
+        _set_model_state("kokoro:pool", workers=TTS_WORKERS, warmed_workers=warmed)
+
+def _warm_local_llm(model_id: str):
+    from .llm import get_local_model_pipeline
+
+    def load():
+        pipe = get_local_model_pipeline(model_id)
+        if pipe is None:
+            raise RuntimeError(f"Failed to load local model {model_id}")
+        return pipe
+
+    pipe = _timed(f"llm:{model_id}", load)
+    _timed(f"llm:{model_id}:first_inference", lambda: pipe([{"role": "user", "content": "Hi"}], max_new_tokens=1))
+
+def run_warmup(local_llm_model: str = None) -> dict:
+    """
+    Preloads the Kokoro pipeline, every voice pack, the TTS pool workers (when
+    TTS_WORKERS > 0) and optionally a local LLM, then runs a dummy inference on
+    each (Sync). Returns the readiness snapshot.
+    """
+    with _STATE_LOCK:
+        _STATE["status"] = "warming"
+        _STATE["started_at"] = time.time()
+    start = time.perf_counter()
+
+    try:
+        _warm_kokoro()
+        if local_llm_model:
+            _warm_local_llm(local_llm_model)
+        status = "ready"
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        status = "failed"
+
+    with _STATE_LOCK:
+        _STATE["status"] = status
+        _STATE["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    print(f"Warm-up {status} in {_STATE['warmup_seconds']}s")
+    return get_readiness()
+
+def start_warmup_thread(local_llm_model: str = None) -> threading.Thread:
+    """Runs the warm-up in the background so the server can start accepting liveness checks."""
+    with _STATE_LOCK:
+        _STATE["status"] = "warming"
+    thread = threading.Thread(target=run_warmup, args=(local_llm_model,), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def get_readiness() -> dict:
+    """
+    Snapshot of warm-up state. `ready` is True once warm-up finished,
+    or always when warm-up is not enabled.
+    """
+    with _STATE_LOCK:
+        snapshot = {
+            "status": _STATE["status"],
+            "warmup_enabled": WARMUP_ON_STARTUP,
+            "warmup_seconds": _STATE["warmup_seconds"],
+            "models": {name: dict(state) for name, state in _STATE["models"].items()},
+        }
+    snapshot["ready"] = snapshot["status"] == "ready" or (not WARMUP_ON_STARTUP and snapshot["status"] == "idle")
+    return snapshot
@@ -105,6 +105,7 @@ export const PodcastGenerator = () => {
             if (files.length > 0) {
                 const formData = new FormData()
                 files.forEach(file => formData.append('files', file))
+                formData.append('duration', config.duration)
                 const res = await axios.post(`${API_BASE_URL}/content/extract-files`, formData, {
                     headers: { 'Content-Type': 'multipart/form-data' }
                 })